@@ -0,0 +1,157 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+import playerAI
+from transposition import TranspositionTable
+
+class AIWorker:
+    """Calcula as jogadas da IA em uma thread separada, para que o laço de eventos da interface não trave.
+
+    Uso: start() inicia a busca e retorna um Future; enquanto ela roda, 'progress' informa a profundidade e os
+    nós visitados. poll() retorna a coluna quando a busca termina. cancel() interrompe a busca em andamento.
+
+    Com ponder(), a IA continua pensando na vez do adversário: busca de antemão sua resposta para cada jogada
+    provável dele. Se a jogada real já tiver sido analisada, start() responde na hora; se não, a busca começa
+    com a tabela de transposição aquecida pelo que foi calculado.
+    """
+    def __init__(self, config = None, **searchOptions):
+        """
+        Parameters
+        ----------
+        config: engineConfig.EngineConfig | str, optional
+            Configuração ou perfil da IA (ver engineConfig.getConfig). Se fornecida, as buscas são feitas por um
+            engineConfig.Engine próprio do worker e 'searchOptions' é ignorado.
+        **searchOptions
+            Opções repassadas a playerAI.iterativeDeepening (timeLimit, maxDepth, engine, table...).
+            Se maxDepth não for fornecido, usa playerAI.MAX_DEPTH. Se table não for fornecida, o worker cria a sua,
+            compartilhada entre as buscas normais e as feitas durante a vez do adversário. Uma tabela persistente
+            (TranspositionTable.open) guarda o que foi calculado para as próximas partidas.
+        """
+        self.engine = None
+        if config is not None:
+            from engineConfig import Engine
+            self.engine = Engine(config)
+            searchOptions = {'table': self.engine.table}
+        self.searchOptions = {'maxDepth': playerAI.MAX_DEPTH, **searchOptions}
+        if self.searchOptions.get('table') is None:
+            self.searchOptions['table'] = TranspositionTable(playerAI.TT_BYTES)
+        self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'ai')
+        self._future = None
+        self._stopEvent = None
+        self._ponderFuture = None
+        self._ponderStop = None
+        self._pondered = {}         # (Chave canônica da posição após a jogada do adversário, ficha) -> SearchResult
+        self.ponderHits = 0         # Jogadas respondidas diretamente com o resultado calculado na vez do adversário
+        self.progress = (0, 0)      # (profundidade, nós) da busca atual
+
+    @property
+    def thinking(self):
+        """True enquanto houver uma busca em andamento (ou concluída e ainda não consumida por poll())."""
+        return self._future is not None
+
+    def start(self, board, aiChipNum):
+        """Inicia a busca da jogada de 'aiChipNum' em 'board' (o tabuleiro é copiado; pode ser alterado depois).
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolve para um playerAI.SearchResult. Se a busca for cancelada, o resultado é descartado por poll().
+        """
+        self.cancel(ponder = False)
+        self._stopPondering()
+        pondered = self._pondered.pop((board.key, aiChipNum), None)
+        self._pondered.clear()      # Os demais ramos não aconteceram
+        if pondered is not None:
+            pondered = pondered._replace(column = board.orientMove(pondered.column))
+            self.ponderHits += 1
+            self.progress = (pondered.depth, pondered.nodes)
+            self._future = Future()
+            self._future.set_result(pondered)
+            return self._future
+        self.progress = (0, 0)
+        self._stopEvent = threading.Event()
+        self._future = self._executor.submit(self._search, board.copy(), aiChipNum, self._stopEvent, self._onProgress)
+        return self._future
+
+    def _search(self, board, aiChipNum, stopEvent, onProgress = None):
+        if self.engine is not None:
+            return self.engine.search(board, aiChipNum, stopEvent = stopEvent, onProgress = onProgress)
+        return playerAI.iterativeDeepening(board, aiChipNum, stopEvent = stopEvent, onProgress = onProgress,
+                                           **self.searchOptions)
+
+    def _onProgress(self, depth, nodes):
+        self.progress = (depth, nodes)
+
+    def poll(self):
+        """Retorna a coluna escolhida se a busca terminou (liberando o worker para a próxima) ou None se não.
+
+        Returns
+        -------
+        int | None
+        """
+        if self._future is None or not self._future.done():
+            return None
+        future, self._future = self._future, None
+        return future.result().column
+
+    def ponder(self, board, aiChipNum):
+        """Começa a pensar, em segundo plano, nas respostas da IA às jogadas prováveis do adversário em 'board'.
+        As jogadas são analisadas da mais para a menos provável (melhor jogada do adversário por uma busca rasa e
+        depois as colunas mais centrais). O trabalho é interrompido por start(), cancel() ou outro ponder().
+        """
+        self._stopPondering()
+        self._pondered.clear()
+        if self.engine is not None and self.engine.config.workers != 1:
+            return      # A busca em vários processos não pode ser interrompida quando o adversário joga
+        self._ponderStop = threading.Event()
+        self._ponderFuture = self._executor.submit(self._ponder, board.copy(), aiChipNum, self._ponderStop)
+
+    def _ponder(self, board, aiChipNum, stopEvent):
+        foeChipNum = 3 - aiChipNum
+        replies = [c for c in board.centerOrder if board.canPlay(c)]
+        weights = self.engine.config.weights if self.engine is not None else self.searchOptions.get('weights')
+        # Palpite raso, sem livro nem resolvedor; como as demais buscas do ponder, para quando stopEvent é ativado
+        likely = playerAI.iterativeDeepening(board, foeChipNum, maxDepth = 2, table = self.searchOptions['table'],
+                                             stopEvent = stopEvent, book = False, endgameThreshold = 0,
+                                             weights = weights).column
+        if likely is not None:
+            replies.remove(likely)
+            replies.insert(0, likely)
+        for reply in replies:
+            if stopEvent.is_set():
+                return
+            board.pushMove(reply, foeChipNum)
+            # Respostas espelhadas (em posições simétricas) levam à mesma chave e já foram analisadas
+            if (board.key, aiChipNum) not in self._pondered and not board.checkWinner() and not board.isFull():
+                result = self._search(board, aiChipNum, stopEvent)
+                if not stopEvent.is_set():      # Busca interrompida: o resultado é parcial
+                    # A coluna é guardada na orientação da chave canônica e convertida de volta em start()
+                    self._pondered[(board.key, aiChipNum)] = result._replace(column = board.orientMove(result.column))
+            board.popMove()
+
+    def _stopPondering(self):
+        """Interrompe o ponder em andamento e espera a thread ficar livre. Todas as buscas do ponder recebem o evento
+        de parada (a busca o consulta a cada 1024 nós e o resolvedor de finais a cada 4096), então a espera é curta.
+        """
+        if self._ponderFuture is not None:
+            self._ponderStop.set()
+            self._ponderFuture.result()
+            self._ponderFuture = None
+
+    def cancel(self, *, ponder = True):
+        """Interrompe a busca em andamento, se houver. O resultado dela é descartado.
+        Se 'ponder' for True, também interrompe o ponder e descarta o que foi calculado nele.
+        """
+        if self._future is not None:
+            if self._stopEvent is not None:
+                self._stopEvent.set()
+            self._future = None
+        if ponder:
+            self._stopPondering()
+            self._pondered.clear()
+
+    def shutdown(self):
+        """Cancela a busca em andamento e encerra a thread (e os processos da configuração, se houver)."""
+        self.cancel()
+        self._executor.shutdown(wait = True)
+        if self.engine is not None:
+            self.engine.close()
@@ -0,0 +1,152 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import playerAI
+from playerAI import SearchResult, MoveOrdering, MAX_DEPTH, TT_BYTES
+from bitboard import BitBoard, Position
+from transposition import TranspositionTable
+
+_worker = {}    # Tabela de transposição e ordenação de cada processo, mantidas entre posições
+
+def _openTable(ttBytes, cachePath):
+    """Tabela própria do processo ou, com 'cachePath', a tabela persistente compartilhada por todos."""
+    if cachePath is None:
+        return TranspositionTable(ttBytes)
+    return TranspositionTable.open(cachePath, ttBytes)
+
+def _initWorker(ttBytes, cachePath):
+    _worker['table'] = _openTable(ttBytes, cachePath)
+    _worker['ordering'] = MoveOrdering()
+
+def toBitBoard(position):
+    """Converte uma posição para BitBoard.
+
+    Parameters
+    ----------
+    position: str | BitBoard | Position | Board | numpy.2darray | list[list[int]]
+        Sequência de jogadas (colunas a partir de 1, ex.: "4453"), um tabuleiro ou uma matriz no formato de Board.cells.
+
+    Returns
+    -------
+    BitBoard
+    """
+    if isinstance(position, str):
+        return BitBoard.fromMoves(position)
+    if isinstance(position, BitBoard):
+        return position
+    if isinstance(position, Position):
+        return position.toBitBoard()
+    if hasattr(position, 'cells'):
+        return BitBoard.fromCells(position.cells)
+    return BitBoard.fromCells(position)
+
+def analyzePosition(position, *, depth = MAX_DEPTH, timeLimit = None, maxNodes = None, engine = 'pvs', table = None,
+                    ordering = None):
+    """Calcula a melhor jogada de uma posição para o jogador que está na vez.
+
+    Parameters
+    ----------
+    position: str | BitBoard | Board | numpy.2darray | list[list[int]]
+        Posição a ser analisada (ver toBitBoard).
+    depth: int, default MAX_DEPTH
+        Profundidade da busca. Com timeLimit/maxNodes, é a profundidade máxima do aprofundamento iterativo.
+    timeLimit: float, optional
+        Orçamento de tempo em milissegundos por posição.
+    maxNodes: int, optional
+        Orçamento de nós por posição.
+    engine: "alphabeta" | "pvs", default "pvs"
+        Motor de busca.
+    table: TranspositionTable, optional
+        Tabela de transposição (reaproveitada entre posições por quem chama).
+    ordering: MoveOrdering, optional
+        Ordenação de jogadas (reaproveitada entre posições por quem chama).
+
+    Returns
+    -------
+    SearchResult
+        Coluna None se a partida já terminou na posição.
+    """
+    board = toBitBoard(position)
+    aiChipNum = board.nextPlayer()
+    if board.checkWinner() or board.isFull():
+        return SearchResult(None, board.getScore(False, aiChipNum, win = board.checkWinner(), draw = board.isFull()), 0, 0)
+    if timeLimit is not None or maxNodes is not None:
+        return playerAI.iterativeDeepening(board, aiChipNum, timeLimit, maxNodes = maxNodes, maxDepth = depth, table = table,
+                                           ordering = ordering, engine = engine)
+    return playerAI.search(board, aiChipNum, depth, table, ordering = ordering, engine = engine)
+
+def _analyzeChunk(positions, options):
+    """Tarefa do pool: analisa um bloco de posições com a tabela e a ordenação do processo."""
+    return [tuple(analyzePosition(p, table = _worker['table'], ordering = _worker['ordering'], **options)) for p in positions]
+
+def _chunks(positions, chunkSize):
+    """Agrupa as posições em listas de até 'chunkSize' elementos, convertendo matrizes em listas e tabuleiros em
+    Position (menores para enviar e rápidas de reconstruir no processo).
+    """
+    chunk = []
+    for position in positions:
+        if hasattr(position, 'tolist'):
+            position = position.tolist()
+        elif isinstance(position, BitBoard):
+            position = position.toPosition()
+        elif hasattr(position, 'cells'):
+            position = toBitBoard(position).toPosition()
+        chunk.append(position)
+        if len(chunk) == chunkSize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def analyzeBatch(positions, *, depth = MAX_DEPTH, timeLimit = None, maxNodes = None, engine = 'pvs', workers = None,
+                 chunkSize = 64, ttBytes = TT_BYTES, cachePath = None):
+    """Analisa várias posições, distribuindo-as entre processos. Os resultados são gerados na ordem de entrada.
+
+    As posições são consumidas aos poucos (no máximo 4 blocos por processo em andamento), então 'positions' pode ser
+    um gerador sobre um arquivo muito grande. Cada processo mantém sua tabela de transposição e ordenação entre
+    posições, aproveitando transposições entre posições de uma mesma partida. Com 'cachePath', todos os processos
+    usam uma única tabela persistente (TranspositionTable.open), que também aproveita o trabalho de execuções anteriores.
+
+    Parameters
+    ----------
+    positions: iterable
+        Posições aceitas por toBitBoard, por exemplo um numpy.ndarray N x nRows x nCols ou uma lista de strings de jogadas.
+    depth, timeLimit, maxNodes, engine
+        Como em analyzePosition.
+    workers: int, optional
+        Número de processos. Se não fornecido, usa os.cpu_count(). Com 1, tudo é feito no processo atual.
+    chunkSize: int, default 64
+        Quantidade de posições enviadas por tarefa (diminui o custo de comunicação por posição).
+    ttBytes: int, default TT_BYTES
+        Orçamento de memória da tabela de transposição de cada processo (ou do arquivo de cache, ao criá-lo).
+    cachePath: str, optional
+        Arquivo da tabela de transposição persistente compartilhada pelos processos.
+
+    Yields
+    ------
+    SearchResult
+    """
+    options = {'depth': depth, 'timeLimit': timeLimit, 'maxNodes': maxNodes, 'engine': engine}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        table = _openTable(ttBytes, cachePath)
+        ordering = MoveOrdering()
+        try:
+            for position in positions:
+                yield analyzePosition(position, table = table, ordering = ordering, **options)
+        finally:
+            table.close()
+        return
+
+    if cachePath is not None:
+        _openTable(ttBytes, cachePath).close()     # Cria o arquivo antes de os processos o abrirem
+    with ProcessPoolExecutor(workers, initializer = _initWorker, initargs = (ttBytes, cachePath)) as pool:
+        pending = deque()
+        for chunk in _chunks(positions, chunkSize):
+            pending.append(pool.submit(_analyzeChunk, chunk, options))
+            if len(pending) >= 4 * workers:
+                for result in pending.popleft().result():
+                    yield SearchResult(*result)
+        while pending:
+            for result in pending.popleft().result():
+                yield SearchResult(*result)
@@ -0,0 +1,201 @@
+import sys, json, time, timeit, argparse, platform
+import numpy as np
+import playerAI
+from board import Board
+from bitboard import BitBoard
+from transposition import TranspositionTable
+
+# Posições fixas (sequências de jogadas a partir de 1, o jogador 1 começa), tiradas de partidas entre IAs.
+# As de vitória e derrota forçadas foram conferidas com o EndgameSolver
+CORPUS = {
+    'opening': ['', '4', '44', '4453', '3445'],
+    'midgame': ['2577341424462255', '5363472333112111', '771111177712435642', '74747742354446555'],
+    'endgame': ['231645111122233444532455', '25524312223441553314431151', '7711111777124356424445223332'],
+    'forcedWin': ['2577341424462255266525544', '757177342535563335357111712', '5363472333112111515553522267'],
+    'forcedLoss': ['757177342535563335357111', '25773414244622552665255446', '53634723331121115155535222676'],
+}
+DEFAULT_DEPTHS = (2, 4, 6)
+MICRO_POSITION = '5363472333112111'     # Posição (meio de jogo) usada nos micro-benchmarks
+
+def _percentile(values, p):
+    """Percentil 'p' (0-100) pelo método do posto mais próximo."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+def benchmarkSearch(depths = DEFAULT_DEPTHS, *, engine = 'alphabeta', repeat = 3, warmup = 1,
+                    ttBytes = playerAI.TT_BYTES, endgameThreshold = None):
+    """Roda playerAI.search em todas as posições de CORPUS, em cada profundidade.
+
+    Cada busca começa com as tabelas de transposição (da busca e do resolvedor de finais) vazias e uma ordenação
+    nova, então a contagem de nós é reproduzível e só muda quando o algoritmo muda. Antes das medições, cada busca roda
+    'warmup' vezes sem ser cronometrada (caches frios e tabelas montadas sob demanda); o tempo considerado é o menor
+    entre as 'repeat' execuções seguintes, e só elas entram nas latências p50/p95/p99.
+
+    Parameters
+    ----------
+    depths: iterable[int], default DEFAULT_DEPTHS
+        Profundidades (mesma convenção de MAX_DEPTH).
+    engine: "alphabeta" | "pvs", default "alphabeta"
+        Motor de busca.
+    repeat: int, default 3
+        Quantas vezes cada busca é medida.
+    warmup: int, default 1
+        Execuções de aquecimento de cada busca, descartadas.
+    ttBytes: int, default TT_BYTES
+        Orçamento de memória da tabela de transposição.
+    endgameThreshold: int, optional
+        Repassado a playerAI.search (0 mede apenas a busca limitada, sem o resolvedor de finais).
+
+    Returns
+    -------
+    dict
+        'positions': uma entrada por (posição, profundidade) com coluna, pontuação, nós, tempo (ms), nós por segundo
+        e fator de ramificação efetivo; 'depths': totais e latências p50/p95/p99 (ms) de cada profundidade.
+    """
+    table = TranspositionTable(ttBytes)
+    solverTable = playerAI.getDefaultSolver().table
+    positions = []
+    summary = {}
+    for depth in depths:
+        latencies = []
+        totalNodes = totalTime = 0
+        for category, movesList in CORPUS.items():
+            for moves in movesList:
+                board = BitBoard.fromMoves(moves)
+                times = []
+                for run in range(warmup + repeat):
+                    table.clear()
+                    solverTable.clear()
+                    start = time.perf_counter()
+                    result = playerAI.search(board, board.nextPlayer(), depth, table, engine = engine,
+                                             endgameThreshold = endgameThreshold)
+                    if run >= warmup:
+                        times.append(time.perf_counter() - start)
+                elapsed = min(times)
+                latencies.extend(t * 1000 for t in times)
+                totalNodes += result.nodes
+                totalTime += elapsed
+                positions.append({
+                    'category': category, 'moves': moves, 'depth': depth, 'column': result.column,
+                    'score': result.score, 'nodes': result.nodes, 'ms': round(elapsed * 1000, 3),
+                    'nps': round(result.nodes / elapsed) if elapsed else 0,
+                    # Fator b tal que b^plies = nós (a profundidade 'depth' corresponde a depth + 1 jogadas)
+                    'branching': round(result.nodes ** (1 / (depth + 1)), 3) if result.nodes else 0.0,
+                })
+        summary[str(depth)] = {
+            'nodes': totalNodes, 'ms': round(totalTime * 1000, 3),
+            'nps': round(totalNodes / totalTime) if totalTime else 0,
+            'p50': round(_percentile(latencies, 50), 3), 'p95': round(_percentile(latencies, 95), 3),
+            'p99': round(_percentile(latencies, 99), 3),
+        }
+    return {'positions': positions, 'depths': summary}
+
+def benchmarkMicro(number = 20000):
+    """Mede o custo por chamada (em nanossegundos) das operações básicas de Board e BitBoard.
+
+    Parameters
+    ----------
+    number: int, default 20000
+        Chamadas por medição (é usado o menor de 5 tempos).
+
+    Returns
+    -------
+    dict[str, float]
+    """
+    bitboard = BitBoard.fromMoves(MICRO_POSITION)
+    board = Board(np.array(bitboard.toCells(), dtype = np.int8))
+    player = bitboard.nextPlayer()
+
+    def bitboardDrop():
+        bitboard.pushMove(3, player)
+        bitboard.popMove()
+
+    cases = {
+        'Board.checkWinner': board.checkWinner,
+        'Board.checkAlmostWin': lambda: board.checkAlmostWin(player),
+        'Board.getFreeColumns': board.getFreeColumns,
+        'Board.simDropChip': lambda: board.simDropChip(3, player),
+        'BitBoard.checkWinner': bitboard.checkWinner,
+        'BitBoard.checkAlmostWin': lambda: bitboard.checkAlmostWin(player),
+        'BitBoard.getFreeColumns': bitboard.getFreeColumns,
+        'BitBoard.pushMove+popMove': bitboardDrop,     # Equivalente de simDropChip na busca sobre BitBoard
+    }
+    return {name: round(min(timeit.repeat(func, number = number, repeat = 5)) / number * 1e9, 1)
+            for name, func in cases.items()}
+
+def runBenchmarks(depths = DEFAULT_DEPTHS, *, engine = 'alphabeta', repeat = 3, warmup = 1, micro = True,
+                  endgameThreshold = None):
+    """Roda os benchmarks de busca (e, se 'micro' for True, os micro-benchmarks) e retorna um dicionário serializável em JSON."""
+    report = {
+        'python': platform.python_version(), 'machine': platform.machine(), 'engine': engine,
+        'search': benchmarkSearch(depths, engine = engine, repeat = repeat, warmup = warmup,
+                                  endgameThreshold = endgameThreshold),
+    }
+    if micro:
+        report['micro'] = benchmarkMicro()
+    return report
+
+def compare(report, baseline, tolerance = 0.1):
+    """Compara um relatório com o de referência.
+
+    Contagens de nós e jogadas escolhidas devem ser idênticas (a busca é determinística); tempos são comparados
+    pela razão atual / referência e só são listados se variarem mais que 'tolerance'.
+
+    Returns
+    -------
+    list[str]
+        Uma linha por diferença encontrada (vazia se nada mudou).
+    """
+    lines = []
+    old = {(p['moves'], p['depth']): p for p in baseline['search']['positions']}
+    for p in report['search']['positions']:
+        before = old.get((p['moves'], p['depth']))
+        if before is None:
+            continue
+        if before['nodes'] != p['nodes'] or before['column'] != p['column']:
+            lines.append(f'"{p["moves"]}" prof. {p["depth"]}: nós {before["nodes"]} -> {p["nodes"]}, '
+                         f'coluna {before["column"]} -> {p["column"]}')
+    for depth, stats in report['search']['depths'].items():
+        before = baseline['search']['depths'].get(depth)
+        if before is None:
+            continue
+        for metric in ('nps', 'p50', 'p95', 'p99'):
+            if before[metric] and abs(stats[metric] / before[metric] - 1) > tolerance:
+                lines.append(f'prof. {depth} {metric}: {before[metric]} -> {stats[metric]} '
+                             f'({stats[metric] / before[metric] - 1:+.0%})')
+    for name, ns in report.get('micro', {}).items():
+        before = baseline.get('micro', {}).get(name)
+        if before and abs(ns / before - 1) > tolerance:
+            lines.append(f'{name}: {before} ns -> {ns} ns ({ns / before - 1:+.0%})')
+    return lines
+
+def _printReport(report):
+    print(f'{"prof.":>5} {"nós":>10} {"ms":>10} {"nós/s":>10} {"p50":>9} {"p95":>9} {"p99":>9}')
+    for depth, s in report['search']['depths'].items():
+        print(f'{depth:>5} {s["nodes"]:>10} {s["ms"]:>10.1f} {s["nps"]:>10} {s["p50"]:>9.2f} {s["p95"]:>9.2f} {s["p99"]:>9.2f}')
+    for name, ns in report.get('micro', {}).items():
+        print(f'{name:<28} {ns:>10.1f} ns')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Benchmarks da busca e das operações do tabuleiro.')
+    parser.add_argument('-depths', type = int, nargs = '+', default = list(DEFAULT_DEPTHS), help = 'profundidades da busca')
+    parser.add_argument('-engine', choices = playerAI.ENGINES, default = 'alphabeta', help = 'motor de busca')
+    parser.add_argument('-repeat', type = int, default = 3, help = 'repetições medidas de cada busca')
+    parser.add_argument('-warmup', type = int, default = 1, help = 'execuções de aquecimento (não medidas) de cada busca')
+    parser.add_argument('-endgame', type = int, default = None, help = 'limite do resolvedor de finais (0 desativa)')
+    parser.add_argument('-nomicro', action = 'store_true', help = 'não roda os micro-benchmarks')
+    parser.add_argument('-out', default = None, help = 'arquivo JSON onde o relatório é gravado')
+    parser.add_argument('-baseline', default = None, help = 'relatório JSON de referência para comparação')
+    parser.add_argument('-tolerance', type = float, default = 0.1, help = 'variação de tempo tolerada na comparação')
+    args = parser.parse_args(sys.argv[1:])
+    report = runBenchmarks(args.depths, engine = args.engine, repeat = args.repeat, warmup = args.warmup,
+                           micro = not args.nomicro, endgameThreshold = args.endgame)
+    _printReport(report)
+    if args.out:
+        with open(args.out, 'w', encoding = 'utf-8') as file:
+            json.dump(report, file, indent = 1)
+    if args.baseline:
+        with open(args.baseline, encoding = 'utf-8') as file:
+            differences = compare(report, json.load(file), args.tolerance)
+        print('\n'.join(differences) if differences else 'Sem diferenças em relação à referência.')
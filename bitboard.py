@@ -0,0 +1,606 @@
+import random
+
+ALMOST_WIN_SCORE = 30   # Pontos por grupo de 4 células com 3 fichas de um mesmo jogador
+WIN_SCORE = 1000        # Pontos de uma vitória (negativos para uma derrota)
+
+# Player 1 = Red
+# Player 2 = Yellow
+
+_tableCache = {}    # (nRows, nCols) -> tabelas pré-calculadas de _buildTables
+
+def _buildTables(nRows, nCols):
+    """Pré-calcula as máscaras e tabelas de um tamanho de tabuleiro (ver BitBoard._initTables)."""
+    h1 = nRows + 1
+    bottomMask = 0
+    for c in range(nCols):
+        bottomMask |= 1 << (c * h1)
+    center = (nCols - 1) / 2
+    # Chaves de Zobrist (63 bits) para cada par (ficha, bit). A semente fixa garante chaves iguais entre execuções
+    rng = random.Random(nRows * 1000 + nCols)
+    nBits = nCols * h1
+    zobrist = [[0] * nBits] + [[rng.getrandbits(63) for _ in range(nBits)] for _ in range(2)]
+    # Chave de cada (ficha, bit) na posição espelhada (coluna c -> nCols - 1 - c)
+    mirrorBits = [(nCols - 1 - b // h1) * h1 + b % h1 for b in range(nBits)]
+    mirrorZobrist = [[keys[m] for m in mirrorBits] for keys in zobrist]
+    # Todos os grupos de 4 células em linha (69 no tabuleiro 7x6)
+    windows = []
+    for c in range(nCols):
+        for r in range(nRows):
+            for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                if 0 <= c + 3*dc < nCols and 0 <= r + 3*dr < nRows:
+                    window = 0
+                    for k in range(4):
+                        window |= 1 << ((c + k*dc) * h1 + r + k*dr)
+                    windows.append(window)
+    # Grupos dos quais cada célula (bit) participa
+    cellWindows = [[] for _ in range(nBits)]
+    for w, window in enumerate(windows):
+        for bit in range(nBits):
+            if window >> bit & 1:
+                cellWindows[bit].append(w)
+    return {
+        '_shifts': (1, h1, h1 + 1, h1 - 1),     # Vertical, horizontal, diagonal /, diagonal \
+        '_topBits': [1 << (c * h1 + nRows - 1) for c in range(nCols)],
+        '_bottomMask': bottomMask,
+        '_boardMask': bottomMask * ((1 << nRows) - 1),
+        'centerOrder': tuple(sorted(range(nCols), key = lambda c: abs(c - center))),  # Das centrais para as das bordas
+        '_zobrist': zobrist,
+        '_mirrorZobrist': mirrorZobrist,
+        '_windows': windows,
+        '_cellWindows': [tuple(ws) for ws in cellWindows],
+    }
+
+def _moveColumns(moves, nCols):
+    """Percorre uma sequência de jogadas, gerando (jogada, coluna a partir de 0 ou None se não for uma coluna).
+
+    Em uma string, cada caractere é uma coluna numerada a partir de 1, o que só representa tabuleiros de até
+    9 colunas; nos maiores, as jogadas devem ser uma sequência de inteiros a partir de 0.
+    """
+    if isinstance(moves, str):
+        if nCols > 9:
+            raise ValueError(f'Jogadas em texto só representam tabuleiros de até 9 colunas (use uma lista de colunas '
+                             f'a partir de 0 no tabuleiro de {nCols})')
+        for char in moves:
+            yield char, int(char) - 1 if char.isdigit() else None
+    else:
+        for move in moves:
+            yield move, move if isinstance(move, int) and not isinstance(move, bool) else None
+
+class BitBoard:
+    """Representa o tabuleiro por meio de bitboards (um inteiro por jogador).
+
+    Cada coluna ocupa nRows + 1 bits consecutivos (o bit extra é uma sentinela sempre vazia, que evita que
+    os deslocamentos "vazem" de uma coluna para a outra). O bit 0 é a célula de baixo da coluna 0.
+    Oferece os mesmos métodos públicos de Board (dropChip, checkWinner, getFreeColumns, getScore...),
+    podendo substituí-lo tanto na interface quanto na busca.
+    """
+    selfCheck = False   # Se True, checkAlmostWin confere cada resultado com a implementação escalar de Board (lento, só para depuração)
+    # Pesos da avaliação. Podem ser trocados por tabuleiro (a busca os ajusta na sua cópia, ver playerAI.search)
+    almostWinScore = ALMOST_WIN_SCORE
+    winScore = WIN_SCORE
+
+    def __init__(self, nRows = 6, nCols = 7):
+        """
+        Parameters
+        ----------
+        nRows: int, default 6
+            Número de linhas do tabuleiro.
+        nCols: int, default 7
+            Número de colunas do tabuleiro. Qualquer tamanho é aceito (os inteiros do Python não têm limite de
+            bits), mas acima de 63 bits (nCols * (nRows + 1)) as máscaras deixam de caber em uma palavra da máquina.
+        """
+        if nRows < 1 or nCols < 1:
+            raise ValueError(f'Tamanho de tabuleiro inválido: {nRows}x{nCols}')
+        self.nRows = nRows
+        self.nCols = nCols
+        self.masks = [0, 0, 0]      # Índice = número da ficha (o índice 0 não é usado)
+        self.heights = [c * (nRows + 1) for c in range(nCols)]     # Próximo bit livre de cada coluna
+        self.nChips = 0
+        # Hash de Zobrist da posição e da posição espelhada, atualizados a cada jogada. 'key' é o menor dos dois,
+        # de modo que uma posição e sua espelhada compartilham as entradas de tabelas, livro e caches.
+        # 'mirrored' indica que a chave canônica é a da espelhada: colunas gravadas sob 'key' devem passar por orientMove
+        self._rawKey = 0
+        self._mirrorKey = 0
+        self.key = 0
+        self.mirrored = False
+        self.moves = []             # Pilha com as colunas jogadas via pushMove
+        self._initTables()
+        # Avaliação incremental: fichas de cada jogador em cada grupo de 4 células e quantos grupos têm exatamente 3
+        self.windowCounts = [None, [0] * len(self._windows), [0] * len(self._windows)]
+        self.threes = [0, 0, 0]
+
+    def _initTables(self):
+        """Obtém as máscaras que dependem apenas das dimensões do tabuleiro, calculadas uma única vez por tamanho."""
+        shape = (self.nRows, self.nCols)
+        tables = _tableCache.get(shape)
+        if tables is None:
+            tables = _tableCache[shape] = _buildTables(self.nRows, self.nCols)
+        self.__dict__.update(tables)
+
+    @classmethod
+    def fromCells(cls, cells):
+        """Cria um BitBoard a partir de uma matriz de células no formato de Board.cells.
+
+        Parameters
+        ----------
+        cells: numpy.2darray | list[list[int]]
+            Matriz nRows x nCols (linha 0 no topo) com 0 para células vazias e 1/2 para as fichas.
+
+        Returns
+        -------
+        BitBoard
+        """
+        nRows = len(cells)
+        nCols = len(cells[0])
+        h1 = nRows + 1
+        masks = [0, 0, 0]
+        for c in range(nCols):
+            for r in range(nRows - 1, -1, -1):     # De baixo pra cima
+                chip = int(cells[r][c])
+                if chip == 0:
+                    break
+                masks[chip] |= 1 << (c * h1 + nRows - 1 - r)
+        return cls._fromMasks(masks[1], masks[2], nRows, nCols)
+
+    @classmethod
+    def _fromMasks(cls, mask1, mask2, nRows, nCols):
+        """Cria um BitBoard diretamente das máscaras dos jogadores (sem histórico de jogadas). As contagens da
+        avaliação incremental são calculadas de uma vez, por grupo, em vez de ficha por ficha.
+        """
+        board = cls(nRows, nCols)
+        h1 = nRows + 1
+        occupied = mask1 | mask2
+        column = (1 << h1) - 1
+        board.masks = [0, mask1, mask2]
+        board.heights = [c * h1 + (occupied >> (c * h1) & column).bit_length() for c in range(nCols)]
+        board.nChips = occupied.bit_count()
+        rawKey = mirrorKey = 0
+        for player, mask in ((1, mask1), (2, mask2)):
+            zobrist, mirrorZobrist = board._zobrist[player], board._mirrorZobrist[player]
+            bits = mask
+            while bits:
+                low = bits & -bits
+                bit = low.bit_length() - 1
+                rawKey ^= zobrist[bit]
+                mirrorKey ^= mirrorZobrist[bit]
+                bits ^= low
+            counts = [(window & mask).bit_count() for window in board._windows]
+            board.windowCounts[player] = counts
+            board.threes[player] = counts.count(3)
+        board._setKeys(rawKey, mirrorKey)
+        return board
+
+    @classmethod
+    def fromMoves(cls, moves, nRows = 6, nCols = 7):
+        """Cria um BitBoard jogando a sequência 'moves' a partir do tabuleiro vazio (o jogador 1 começa).
+
+        Parameters
+        ----------
+        moves: str | iterable[int]
+            Colunas jogadas: uma por caractere, numeradas a partir de 1 (ex.: "4453", só em tabuleiros de até
+            9 colunas), ou inteiros a partir de 0 (ex.: [3, 3, 4, 2]).
+        nRows: int, default 6
+            Número de linhas do tabuleiro.
+        nCols: int, default 7
+            Número de colunas do tabuleiro.
+
+        Returns
+        -------
+        BitBoard
+        """
+        board = cls(nRows, nCols)
+        player = 1
+        for move, column in _moveColumns(moves, nCols):
+            if column is None or not 0 <= column < nCols or board.pushMove(column, player) is None:
+                raise ValueError(f'Jogada inválida em "{moves}": {move}')
+            player = 3 - player
+        return board
+
+    def nextPlayer(self):
+        """Retorna a ficha de quem joga agora, supondo que o jogador 1 começou a partida."""
+        return 1 if self.masks[1].bit_count() == self.masks[2].bit_count() else 2
+
+    def toCells(self):
+        """Converte o tabuleiro para uma matriz de células no formato de Board.cells.
+
+        Returns
+        -------
+        list[list[int]]
+        """
+        h1 = self.nRows + 1
+        cells = [[0] * self.nCols for _ in range(self.nRows)]
+        for chip in (1, 2):
+            for c in range(self.nCols):
+                for r in range(self.nRows):
+                    if self.masks[chip] >> (c * h1 + r) & 1:
+                        cells[self.nRows - 1 - r][c] = chip
+        return cells
+
+    def toPosition(self):
+        """Converte o tabuleiro para uma Position (compacta, sem as tabelas e contagens da busca)."""
+        return Position(self.masks[1], self.masks[1] | self.masks[2], self.nRows, self.nCols)
+
+    def copy(self):
+        """Retorna uma cópia independente do tabuleiro (as tabelas pré-calculadas são compartilhadas)."""
+        new = object.__new__(BitBoard)
+        new.__dict__.update(self.__dict__)
+        new.masks = self.masks[:]
+        new.heights = self.heights[:]
+        new.moves = self.moves[:]
+        new.windowCounts = [None, self.windowCounts[1][:], self.windowCounts[2][:]]
+        new.threes = self.threes[:]
+        return new
+
+    def dropChip(self, column, currentPlayer):
+        """Insere uma ficha do jogador 'currentPlayer' na primeira posição livre da coluna 'column'.
+        Caso a coluna esteja cheia, não altera o tabuleiro.
+
+        Parameters
+        ----------
+        column: int
+            Índice da coluna onde será inserido a ficha.
+        currentPlayer: int
+            Número representando o jogador atual (1 -> vermelho, 2 -> amarelo).
+
+        Returns
+        -------
+        int | None
+            Índice da posição (mesma convenção de Board.dropChip) ou None caso a coluna esteja cheia.
+        """
+        height = self._place(column, currentPlayer)
+        if height is None:
+            return None
+        return self.nRows - (height - column * (self.nRows + 1))
+
+    def undoChip(self, column):
+        """Remove a última ficha inserida na coluna 'column' (desfaz dropChip em O(1))."""
+        self._remove(column)
+
+    def pushMove(self, column, currentPlayer):
+        """Igual a dropChip, mas registra a jogada na pilha de jogadas para poder ser desfeita com popMove/undoTo.
+
+        Returns
+        -------
+        int | None
+            Índice da posição ou None caso a coluna esteja cheia (nada é empilhado).
+        """
+        height = self._place(column, currentPlayer)
+        if height is None:
+            return None
+        self.moves.append(column)
+        return self.nRows - (height - column * (self.nRows + 1))
+
+    def popMove(self):
+        """Desfaz a última jogada registrada na pilha.
+
+        Returns
+        -------
+        int
+            Coluna da jogada desfeita.
+        """
+        column = self.moves.pop()
+        self._remove(column)
+        return column
+
+    def _place(self, column, player):
+        """Coloca uma ficha no topo da coluna, atualizando máscaras, chave e contagens. Retorna o bit ocupado ou None."""
+        height = self.heights[column]
+        bit = 1 << height
+        if bit & self._topBits[column] << 1:   # Chegou na sentinela -> coluna cheia
+            return None
+        self.masks[player] |= bit
+        self._setKeys(self._rawKey ^ self._zobrist[player][height], self._mirrorKey ^ self._mirrorZobrist[player][height])
+        self.heights[column] = height + 1
+        self.nChips += 1
+        counts = self.windowCounts[player]
+        threes = 0
+        for w in self._cellWindows[height]:
+            count = counts[w] + 1
+            counts[w] = count
+            if count == 3:
+                threes += 1
+            elif count == 4:
+                threes -= 1
+        self.threes[player] += threes
+        return height
+
+    def _remove(self, column):
+        """Retira a ficha do topo da coluna, desfazendo _place."""
+        height = self.heights[column] - 1
+        bit = 1 << height
+        player = 1 if self.masks[1] & bit else 2
+        self.masks[player] ^= bit
+        self._setKeys(self._rawKey ^ self._zobrist[player][height], self._mirrorKey ^ self._mirrorZobrist[player][height])
+        self.heights[column] = height
+        self.nChips -= 1
+        counts = self.windowCounts[player]
+        threes = 0
+        for w in self._cellWindows[height]:
+            count = counts[w]
+            if count == 3:
+                threes -= 1
+            elif count == 4:
+                threes += 1
+            counts[w] = count - 1
+        self.threes[player] += threes
+
+    def _setKeys(self, rawKey, mirrorKey):
+        self._rawKey = rawKey
+        self._mirrorKey = mirrorKey
+        self.mirrored = mirrorKey < rawKey
+        self.key = mirrorKey if self.mirrored else rawKey
+
+    def orientMove(self, column):
+        """Converte uma coluna entre a orientação do tabuleiro e a da chave canônica (a conversão é a própria inversa).
+        Colunas negativas (NO_MOVE) são mantidas.
+        """
+        if self.mirrored and column >= 0:
+            return self.nCols - 1 - column
+        return column
+
+    def isSymmetric(self):
+        """Retorna True se a posição for igual à sua espelhada (as jogadas c e nCols - 1 - c são equivalentes)."""
+        return self._rawKey == self._mirrorKey
+
+    def undoTo(self, nMoves):
+        """Desfaz jogadas até que restem apenas 'nMoves' jogadas na pilha."""
+        while len(self.moves) > nMoves:
+            self.popMove()
+
+    def isFull(self):
+        """Retorna True se todas as células estiverem ocupadas (empate caso não haja ganhador)."""
+        return self.nChips == self.nRows * self.nCols
+
+    def isWinner(self, player):
+        """Verifica, por deslocamentos e máscaras, se o jogador 'player' tem 4 fichas em linha.
+
+        Returns
+        -------
+        bool
+        """
+        mask = self.masks[player]
+        for shift in self._shifts:
+            pairs = mask & (mask >> shift)
+            if pairs & (pairs >> 2*shift):
+                return True
+        return False
+
+    def checkWinner(self):
+        """Procura se há algum ganhador no jogo.
+
+        Returns
+        -------
+        bool
+            True se houve algum ganhador, False se não.
+        """
+        return self.isWinner(1) or self.isWinner(2)
+
+    def getTotalChips(self):
+        """Retorna o total de fichas presentes no tabuleiro."""
+        return self.nChips
+
+    def playableMask(self):
+        """Retorna a máscara com a próxima célula livre de cada coluna que não está cheia."""
+        return (self.masks[1] | self.masks[2]) + self._bottomMask & self._boardMask
+
+    def canPlay(self, column):
+        """Retorna True se a coluna 'column' não estiver cheia."""
+        return not (self.masks[1] | self.masks[2]) & self._topBits[column]
+
+    def winningMask(self, player):
+        """Retorna a máscara das células vazias que completariam 4 em linha para 'player' (jogáveis agora ou não)."""
+        mask = self.masks[player]
+        threats = (mask << 1) & (mask << 2) & (mask << 3)     # Vertical: só as 3 fichas de baixo
+        for shift in self._shifts[1:]:
+            pairs = (mask << shift) & (mask << 2*shift)       # As 2 células à esquerda (no sentido da direção)
+            threats |= pairs & ((mask << 3*shift) | (mask >> shift))
+            pairs = (mask >> shift) & (mask >> 2*shift)       # As 2 células à direita
+            threats |= pairs & ((mask >> 3*shift) | (mask << shift))
+        return threats & (self._boardMask ^ (self.masks[1] | self.masks[2]))
+
+    def immediateWins(self, player):
+        """Retorna as colunas em que 'player' vence com uma única jogada.
+
+        Returns
+        -------
+        list[int]
+        """
+        wins = self.winningMask(player) & self.playableMask()
+        return [c for c, height in enumerate(self.heights) if wins >> height & 1]
+
+    def mustBlock(self, player):
+        """Retorna as colunas em que 'player' precisa jogar para impedir a vitória imediata do adversário.
+        Com duas ou mais, bloquear uma não impede a derrota.
+
+        Returns
+        -------
+        list[int]
+        """
+        return self.immediateWins(3 - player)
+
+    def nonLosingMask(self, player):
+        """Retorna a máscara das jogadas de 'player' que não perdem na resposta do adversário: se o adversário
+        ameaça vencer, só o bloqueio; e nunca uma jogada logo abaixo de uma célula em que o adversário vence.
+        Supõe que 'player' não tem vitória imediata. 0 se toda jogada perde.
+        """
+        playable = self.playableMask()
+        foeWins = self.winningMask(3 - player)
+        forced = playable & foeWins
+        if forced:
+            if forced & (forced - 1):   # Duas ameaças: não dá para bloquear as duas
+                return 0
+            playable = forced
+        return playable & ~(foeWins >> 1)
+
+    def threats(self, player):
+        """Ameaças de 'player' por coluna: linhas (a partir de 1, de baixo para cima) das células vazias que
+        completariam 4 em linha. Perto do fim da partida, ameaças em linhas ímpares favorecem o jogador 1 e em
+        linhas pares o jogador 2 (quem é obrigado a jogar logo abaixo delas é o adversário).
+
+        Returns
+        -------
+        list[list[int]]
+        """
+        wins = self.winningMask(player)
+        h1 = self.nRows + 1
+        return [[r + 1 for r in range(self.nRows) if wins >> (c * h1 + r) & 1] for c in range(self.nCols)]
+
+    def getFreeColumns(self):
+        """Retorna as colunas que não estão cheias.
+
+        Returns
+        -------
+        list[int]
+        """
+        occupied = self.masks[1] | self.masks[2]
+        return [c for c, top in enumerate(self._topBits) if not occupied & top]
+
+    def checkAlmostWin(self, aiChipNum):
+        """Calcula os pontos em situação de quase vitória (3 fichas de mesma cor em um grupo de 4 células).
+        Quase vitórias da IA valem +almostWinScore (30) e do adversário -almostWinScore, acumulando entre os grupos.
+        Usa as contagens por grupo mantidas a cada jogada, então custa O(1).
+
+        Parameters
+        ----------
+        aiChipNum: int
+            Número da ficha do jogador atual.
+
+        Returns
+        -------
+        int
+            Pontuação do jogador na rodada.
+        """
+        score = self.almostWinScore * (self.threes[aiChipNum] - self.threes[3 - aiChipNum])
+        if self.selfCheck:
+            from board import Board
+            import numpy as np
+            reference = Board(np.array(self.toCells(), dtype = np.int8), self.nRows, self.nCols)
+            reference.almostWinScore = self.almostWinScore
+            expected = reference._checkAlmostWinReference(aiChipNum)
+            if score != expected:
+                raise AssertionError(f'checkAlmostWin divergente: {score} (incremental) != {expected} (Board)')
+        return score
+
+    def getScore(self, isAIsTurn, aiChipNum, *, draw = False, win = False):
+        """Função de utilidade (medida do quão bem a AI foi na partida). Mesma semântica de Board.getScore.
+
+        Parameters
+        ----------
+        isAIsTurn : bool
+            Se True, a última jogada foi da IA (para determinar se a IA venceu ou perdeu).
+        aiChipNum: int
+            Número da ficha do jogador atual.
+        draw: bool, optional
+            Se True, significa que houve empate na rodada.
+        win: bool, optional
+            Se True, significa que houve vitória na rodada.
+
+        Returns
+        -------
+        int
+            Pontuação da função de utilidade (quanto maior, melhor)
+        """
+        if draw:
+            score = 0
+        elif win:
+            score = self.winScore if isAIsTurn else -self.winScore
+        else:
+            score = self.checkAlmostWin(aiChipNum)
+        return score - self.nChips     # Quanto mais turnos tiver passado, menor a pontuação
+
+class Position:
+    """Posição compacta: só as fichas do jogador 1 e as células ocupadas, cada uma em um inteiro no formato de BitBoard.
+
+    Serve para guardar e transportar posições (por exemplo, enviá-las a outros processos) sem o custo de um BitBoard,
+    que precisa das tabelas do tamanho do tabuleiro e das contagens da avaliação incremental. Criar uma Position
+    a partir de uma sequência de jogadas ou do inteiro de pack() não consulta tabela nenhuma.
+    """
+    __slots__ = ('mask', 'occupied', 'nRows', 'nCols')
+
+    def __init__(self, mask = 0, occupied = 0, nRows = 6, nCols = 7):
+        """
+        Parameters
+        ----------
+        mask: int, default 0
+            Células com fichas do jogador 1 (bits no formato de BitBoard).
+        occupied: int, default 0
+            Células ocupadas.
+        nRows: int, default 6
+            Número de linhas do tabuleiro.
+        nCols: int, default 7
+            Número de colunas do tabuleiro.
+        """
+        self.mask = mask
+        self.occupied = occupied
+        self.nRows = nRows
+        self.nCols = nCols
+
+    @classmethod
+    def fromMoves(cls, moves, nRows = 6, nCols = 7):
+        """Cria a posição jogando 'moves' a partir do tabuleiro vazio (o jogador 1 começa).
+
+        Parameters
+        ----------
+        moves: str | iterable[int]
+            Colunas numeradas a partir de 1 em uma string (ex.: "4453", só em tabuleiros de até 9 colunas) ou
+            inteiros a partir de 0.
+        """
+        h1 = nRows + 1
+        heights = [c * h1 for c in range(nCols)]
+        mask = occupied = 0
+        first = True
+        for move, column in _moveColumns(moves, nCols):
+            if column is None or not 0 <= column < nCols or heights[column] == column * h1 + nRows:
+                raise ValueError(f'Jogada inválida em "{moves}": {move}')
+            bit = 1 << heights[column]
+            heights[column] += 1
+            occupied |= bit
+            if first:
+                mask |= bit
+            first = not first
+        return cls(mask, occupied, nRows, nCols)
+
+    @classmethod
+    def fromPacked(cls, packed, nRows = 6, nCols = 7):
+        """Cria a posição a partir do inteiro retornado por pack()."""
+        h1 = nRows + 1
+        column = (1 << h1) - 1
+        mask = occupied = 0
+        for c in range(nCols):
+            bits = packed >> (c * h1) & column
+            top = 1 << (bits.bit_length() - 1)      # Marcador logo acima da última ficha da coluna
+            occupied |= (top - 1) << (c * h1)
+            mask |= (bits ^ top) << (c * h1)
+        return cls(mask, occupied, nRows, nCols)
+
+    def pack(self):
+        """Codifica a posição em um único inteiro (nCols * (nRows + 1) bits, 49 no tabuleiro 7x6).
+
+        Em cada coluna ficam as fichas do jogador 1 e um bit marcador logo acima da última ficha, o que torna
+        a codificação única: o inteiro também serve de chave exata da posição.
+        """
+        h1 = self.nRows + 1
+        bottom = sum(1 << (c * h1) for c in range(self.nCols))
+        return self.mask + self.occupied + bottom
+
+    @property
+    def nChips(self):
+        return self.occupied.bit_count()
+
+    def nextPlayer(self):
+        """Retorna a ficha de quem joga agora, supondo que o jogador 1 começou a partida."""
+        return 1 if self.nChips % 2 == 0 else 2
+
+    def toBitBoard(self):
+        """Cria o BitBoard da posição (sem histórico de jogadas)."""
+        return BitBoard._fromMasks(self.mask, self.occupied ^ self.mask, self.nRows, self.nCols)
+
+    def __eq__(self, other):
+        return (isinstance(other, Position) and (self.mask, self.occupied, self.nRows, self.nCols)
+                == (other.mask, other.occupied, other.nRows, other.nCols))
+
+    def __hash__(self):
+        return hash((self.mask, self.occupied, self.nRows, self.nCols))
+
+    def __repr__(self):
+        return f'Position.fromPacked({self.pack()}, {self.nRows}, {self.nCols})'
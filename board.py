@@ -1,28 +1,76 @@
 import numpy as np
+from bitboard import ALMOST_WIN_SCORE, WIN_SCORE
 
 # Player 1 = Red
 # Player 2 = Yellow
 
+_windowCache = {}   # (nRows, nCols) -> índices dos grupos de 4 células
+
+def getWindowIndices(nRows = 6, nCols = 7):
+    """Retorna os índices (na matriz de células achatada, linha 0 no topo) de todos os grupos de 4 células em linha.
+    O resultado é calculado uma única vez por tamanho de tabuleiro.
+
+    Returns
+    -------
+    numpy.2darray
+        Matriz nGrupos x 4 (69 x 4 no tabuleiro 7x6).
+    """
+    shape = (nRows, nCols)
+    if shape not in _windowCache:
+        windows = []
+        for r in range(nRows):
+            for c in range(nCols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                    if 0 <= r + 3*dr < nRows and 0 <= c + 3*dc < nCols:
+                        windows.append([(r + k*dr) * nCols + c + k*dc for k in range(4)])
+        indices = np.array(windows, dtype = np.intp).reshape(-1, 4)
+        indices.flags.writeable = False
+        _windowCache[shape] = indices
+    return _windowCache[shape]
+
+def hasFour(cells, windows):
+    """Versão NumPy da busca por vencedor: se algum dos grupos 'windows' (de getWindowIndices) tem 4 fichas iguais."""
+    windows = np.asarray(cells).ravel()[windows]
+    return bool(np.any((windows[:, 0] != 0) & np.all(windows == windows[:, :1], axis = 1)))
+
+def countThrees(cells, windows, aiChipNum):
+    """Versão NumPy da contagem de quase vitórias: grupos com exatamente 3 fichas da IA e com exatamente 3 do adversário.
+
+    Returns
+    -------
+    tuple[int, int]
+    """
+    windows = np.asarray(cells).ravel()[windows]
+    aiThrees = np.count_nonzero(np.count_nonzero(windows == aiChipNum, axis = 1) == 3)
+    foeThrees = np.count_nonzero(np.count_nonzero(windows == 3 - aiChipNum, axis = 1) == 3)
+    return int(aiThrees), int(foeThrees)
+
 class Board:
     """Representa o tabuleiro e seus métodos de modificação/verificação."""
+    almostWinScore = ALMOST_WIN_SCORE   # Pesos da avaliação (os mesmos de BitBoard)
+    winScore = WIN_SCORE
+
     def __init__(self, cells = None, nRows = 6, nCols = 7):
         """
         Parameters
         ----------
         cells: numpy.2darray, optional
             Valor inicial das células do tabuleirio. Se não fornecida, será criado um tabuleiro vazio.
-            Deve ter as dimensões nRows x nCols.
+            Se fornecida, as dimensões do tabuleiro são as de 'cells' (nRows e nCols são ignorados).
         nRows: int, default 6
             Número de linhas do tabuleiro.
         nCols: int, default 7
             Número de colunas do tabuleiro.
         """
-        self.nRows = nRows 
-        self.nCols = nCols  
         if cells is None:
             self.cells = np.zeros((nRows, nCols), dtype=np.int8)
         else:
             self.cells = cells
+            nRows, nCols = np.shape(cells)
+        self.nRows = nRows 
+        self.nCols = nCols  
+        self._windows = getWindowIndices(nRows, nCols)
+        self.moves = []     # Pilha com as colunas jogadas via pushMove
         
     def dropChip(self, column, currentPlayer):
         """Procura a primeira posição livre (de baixo pra cima) na coluna 'column'.
@@ -49,6 +97,39 @@ class Board:
                 self.cells[i][column] = currentPlayer
                 return self.nRows + 1 + i
 
+    def pushMove(self, column, currentPlayer):
+        """Igual a dropChip, mas registra a jogada na pilha de jogadas para poder ser desfeita com popMove/undoTo.
+
+        Returns
+        -------
+        int | None
+            Índice da posição ou None caso a coluna esteja cheia (nada é empilhado).
+        """
+        position = self.dropChip(column, currentPlayer)
+        if position is not None:
+            self.moves.append(column)
+        return position
+
+    def popMove(self):
+        """Desfaz a última jogada registrada na pilha, esvaziando a célula mais alta da coluna.
+
+        Returns
+        -------
+        int
+            Coluna da jogada desfeita.
+        """
+        column = self.moves.pop()
+        for i in range(self.nRows):     # Itera de cima pra baixo
+            if self.cells[i][column] != 0:
+                self.cells[i][column] = 0
+                break
+        return column
+
+    def undoTo(self, nMoves):
+        """Desfaz jogadas até que restem apenas 'nMoves' jogadas na pilha."""
+        while len(self.moves) > nMoves:
+            self.popMove()
+
     def simDropChip(self, column, currentPlayer):
         """Procura a primeira posição livre (de baixo pra cima) na coluna 'column'.
         Retorna uma cópia de 'cells' com a posição encontrada ocupada pelo jogador 'currentPlayer'.
@@ -85,26 +166,7 @@ class Board:
         bool
             True se houve algum ganhador, False se não.
         """
-        # 4 elementos na horizontal
-        for i in range(self.nRows):
-            for j in range(self.nCols - 3):
-                if self.cells[i][j] == self.cells[i][j+1] == self.cells[i][j+2] == self.cells[i][j+3] and self.cells[i][j] != 0:
-                    return True
-        # 4 elementos na vertical
-        for i in range(self.nRows - 3):
-            for j in range(self.nCols):
-                if self.cells[i][j] == self.cells[i+1][j] == self.cells[i+2][j] == self.cells[i+3][j] and self.cells[i][j] != 0:
-                    return True
-        # 4 elementos na diagonal
-        for i in range(self.nRows - 3):
-            for j in range(self.nCols - 3):
-                if self.cells[i][j] == self.cells[i+1][j+1] == self.cells[i+2][j+2] == self.cells[i+3][j+3] and self.cells[i][j] != 0:
-                    return True
-        for i in range(3, self.nRows):
-            for j in range(self.nCols - 3):
-                if self.cells[i][j] == self.cells[i-1][j+1] == self.cells[i-2][j+2] == self.cells[i-3][j+3] and self.cells[i][j] != 0:
-                    return True
-        return False
+        return hasFour(self.cells, self._windows)
 
     def getTotalChips(self):
         """Calcula o total de fichas presentes no tabuleiro.
@@ -114,18 +176,18 @@ class Board:
         int
             Quantidade de fichas presentes no tabuleiro.
         """
-        total = 0
-        for row in self.cells:
-            for cell in row:
-                if cell != 0:
-                    total += 1
-        return total
+        return int(np.count_nonzero(self.cells))
 
     def checkAlmostWin(self, aiChipNum):
         """Calcula os pontos em situação de quase vitória.
         Uma condição de quase vitória ocorre caso haja 3 fichas de mesmo cor em um grupo de 4 células na horizontal/vertical/horizontal.
         Quase vitórias para o jogador atual resultam em pontos positivos. Para o jogador adversário, resultam em pontos negativos.
         Caso haja mais de uma condição de quase vitória, a pontuação total é acumulada.
+
+        Cada grupo de 4 células é contado separadamente. A versão original (anterior a BitBoard) não zerava as
+        contagens entre os grupos de uma mesma linha, coluna ou diagonal e levava as fichas do adversário de uma
+        diagonal para a seguinte, somando pontos sem nenhuma quase vitória no tabuleiro (-90 para a IA 1 depois de
+        "1747", por exemplo). Essa correção muda a avaliação e, portanto, algumas jogadas da IA em relação à original.
         
         Parameters
         ----------
@@ -137,11 +199,43 @@ class Board:
         int
             Pontuação do jogador na rodada.
         """
+        aiThrees, foeThrees = countThrees(self.cells, self._windows, aiChipNum)
+        return int(self.almostWinScore * (aiThrees - foeThrees))
+
+    def _checkWinnerReference(self):
+        """Implementação escalar original de checkWinner, mantida como referência para as conferências."""
+        # 4 elementos na horizontal
+        for i in range(self.nRows):
+            for j in range(self.nCols - 3):
+                if self.cells[i][j] == self.cells[i][j+1] == self.cells[i][j+2] == self.cells[i][j+3] and self.cells[i][j] != 0:
+                    return True
+        # 4 elementos na vertical
+        for i in range(self.nRows - 3):
+            for j in range(self.nCols):
+                if self.cells[i][j] == self.cells[i+1][j] == self.cells[i+2][j] == self.cells[i+3][j] and self.cells[i][j] != 0:
+                    return True
+        # 4 elementos na diagonal
+        for i in range(self.nRows - 3):
+            for j in range(self.nCols - 3):
+                if self.cells[i][j] == self.cells[i+1][j+1] == self.cells[i+2][j+2] == self.cells[i+3][j+3] and self.cells[i][j] != 0:
+                    return True
+        for i in range(3, self.nRows):
+            for j in range(self.nCols - 3):
+                if self.cells[i][j] == self.cells[i-1][j+1] == self.cells[i-2][j+2] == self.cells[i-3][j+3] and self.cells[i][j] != 0:
+                    return True
+        return False
+
+    def _checkAlmostWinReference(self, aiChipNum):
+        """Implementação escalar de checkAlmostWin, independente dos grupos de getWindowIndices. É a varredura da
+        versão original com as contagens zeradas a cada grupo (a correção descrita em checkAlmostWin), e não a versão
+        original em si. Usada como referência por evaluation.selfCheck e por BitBoard.checkAlmostWin (com
+        BitBoard.selfCheck).
+        """
         # 3 elementos na horizontal
         score = 0
         for i in range(self.nRows):
-            aiChips = foeChips = 0
             for j in range(self.nCols - 3):
+                aiChips = foeChips = 0    # Contagem de cada grupo de 4 células
                 if self.cells[i][j] != 0:
                     if self.cells[i][j] == aiChipNum:
                         aiChips += 1
@@ -163,14 +257,14 @@ class Board:
                     else:
                         foeChips += 1
                 if aiChips == 3:
-                    score += 30
+                    score += self.almostWinScore
                 elif foeChips == 3:
-                    score -= 30
+                    score -= self.almostWinScore
 
         # 3 elementos na vertical
         for i in range(self.nRows - 3):
-            aiChips = foeChips = 0
             for j in range(self.nCols):
+                aiChips = foeChips = 0    # Contagem de cada grupo de 4 células
                 if self.cells[i][j] != 0:
                     if self.cells[i][j] == aiChipNum:
                         aiChips += 1
@@ -192,15 +286,15 @@ class Board:
                     else:
                         foeChips += 1
                 if aiChips == 3:
-                    score += 30
+                    score += self.almostWinScore
                 elif foeChips == 3:
-                    score -= 30
+                    score -= self.almostWinScore
 
 
         # 3 elementos na diagonal
         for i in range(self.nRows - 3):
-            aiChips = 0
             for j in range(self.nCols - 3):
+                aiChips = foeChips = 0    # Contagem de cada grupo de 4 células
                 if self.cells[i][j] != 0:
                     if self.cells[i][j] == aiChipNum:
                         aiChips += 1
@@ -222,13 +316,13 @@ class Board:
                     else:
                         foeChips += 1
                 if aiChips == 3:
-                    score += 30
+                    score += self.almostWinScore
                 elif foeChips == 3:
-                    score -= 30
+                    score -= self.almostWinScore
 
         for i in range(3, self.nRows):
-            aiChips = 0
             for j in range(self.nCols - 3):
+                aiChips = foeChips = 0    # Contagem de cada grupo de 4 células
                 if self.cells[i][j] != 0:
                     if self.cells[i][j] == aiChipNum:
                         aiChips += 1
@@ -250,9 +344,9 @@ class Board:
                     else:
                         foeChips += 1
                 if aiChips == 3:
-                    score += 30
+                    score += self.almostWinScore
                 elif foeChips == 3:
-                    score -= 30              
+                    score -= self.almostWinScore              
         return score
 
     def getFreeColumns(self):
@@ -262,12 +356,8 @@ class Board:
         -------
         list[int]
         """
-        indexes = []
-        # Itera sobre as colunas
-        for i, col in enumerate(list(np.transpose(self.cells))):
-            if 0 in col:
-                indexes.append(i)
-        return indexes
+        # Uma coluna está livre enquanto a célula do topo estiver vazia
+        return np.flatnonzero(np.asarray(self.cells)[0] == 0).tolist()
 
     def getScore(self, isAIsTurn, aiChipNum, *, draw = False, win = False):
         """Função de utilidade (medida do quão bem a AI foi na partida)
@@ -292,10 +382,10 @@ class Board:
             score += 0
         # Se a IA ganhou
         elif isAIsTurn and win:
-            score += 1000
+            score += self.winScore
         # Se a IA perdeu
         elif not isAIsTurn and win:
-            score -= 1000
+            score -= self.winScore
         else:
             score += self.checkAlmostWin(aiChipNum)
         
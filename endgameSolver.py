@@ -0,0 +1,194 @@
+import time
+from collections import namedtuple
+from bitboard import BitBoard
+from transposition import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+
+SOLVER_TT_BYTES = 8 * 2**20    # Orçamento de memória da tabela de transposição do resolvedor
+_CHECK_INTERVAL = 4096          # A cada quantos nós o prazo e o evento de parada são consultados
+
+Solution = namedtuple('Solution', ['column', 'result', 'distance', 'score', 'nodes'])
+Solution.__doc__ = """Resultado exato de uma posição para quem está na vez: coluna a jogar, resultado (1 vitória, 0 empate,
+-1 derrota), número de jogadas até o fim da partida com jogo perfeito, pontuação exata e nós visitados."""
+
+class _Interrupted(Exception):
+    """Lançada dentro da recursão quando o prazo da resolução vence ou ela é interrompida."""
+
+class EndgameSolver:
+    """Resolve posições exatamente (vitória/empate/derrota), buscando até o fim da partida.
+
+    As pontuações seguem a convenção usual dos resolvedores de Connect 4: 0 é empate e, para quem vence,
+    quanto mais cedo a vitória, maior a pontuação ((células + 1 - fichas no tabuleiro antes da jogada vencedora) // 2).
+    O valor exato é encontrado por uma sequência de buscas de janela nula (só respondem "pelo menos x?"), que
+    podam muito mais que uma busca com janela aberta. A tabela de transposição é própria do resolvedor e é
+    mantida entre chamadas, já que os valores exatos não dependem de profundidade.
+    """
+    def __init__(self, ttBytes = SOLVER_TT_BYTES):
+        """
+        Parameters
+        ----------
+        ttBytes: int, default SOLVER_TT_BYTES
+            Orçamento de memória da tabela de transposição.
+        """
+        self.table = TranspositionTable(ttBytes)
+        self.nodes = 0
+        self._deadline = None
+        self._stopEvent = None
+        self._nextCheck = _CHECK_INTERVAL
+
+    def solve(self, board, *, deadline = None, stopEvent = None):
+        """Resolve a posição de 'board' para o jogador que está na vez.
+
+        Parameters
+        ----------
+        board: BitBoard
+            Posição sem vencedor. Não é alterada.
+        deadline: float, optional
+            Instante (time.perf_counter) a partir do qual a resolução é abandonada.
+        stopEvent: threading.Event | multiprocessing.Event, optional
+            Quando ativado (por outra thread ou processo), a resolução é abandonada.
+
+        Returns
+        -------
+        Solution | None
+            Coluna None se o tabuleiro estiver cheio. None se a resolução foi abandonada pelo prazo ou pelo evento
+            (o que já foi calculado fica na tabela e acelera uma nova tentativa).
+        """
+        board = board.copy()
+        self.nodes = 0
+        self._deadline = deadline
+        self._stopEvent = stopEvent
+        self._nextCheck = _CHECK_INTERVAL
+        try:
+            return self._solve(board)
+        except _Interrupted:
+            return None
+
+    def _solve(self, board):
+        player = board.nextPlayer()
+        size = board.nRows * board.nCols
+        nChips = board.nChips
+        if nChips == size:
+            return Solution(None, 0, 0, 0, 0)
+        # Busca binária sobre o valor, cada passo com uma janela nula
+        low, high = -(size - nChips) // 2, (size + 1 - nChips) // 2
+        while low < high:
+            mid = low + (high - low) // 2
+            if mid <= 0 and low // 2 < mid:
+                mid = low // 2
+            elif mid >= 0 and high // 2 > mid:
+                mid = high // 2
+            score = self._negamax(board, mid, mid + 1, player)
+            if score <= mid:
+                high = score
+            else:
+                low = score
+        score = low
+        return Solution(self._bestMove(board, score, player), (score > 0) - (score < 0),
+                        self._distance(score, nChips, size), score, self.nodes)
+
+    def _bestMove(self, board, score, player):
+        """Encontra uma jogada que garante 'score' (com a tabela já preenchida, cada teste é barato)."""
+        moves = self._order(board, NO_MOVE)
+        if board.isSymmetric():
+            moves = [c for c in moves if c <= board.nCols - 1 - c]
+        for column in moves:
+            board.pushMove(column, player)
+            if board.isWinner(player):
+                childScore = (board.nRows * board.nCols + 2 - board.nChips) // 2
+            else:
+                childScore = -self._negamax(board, -score, -score + 1, 3 - player)
+            board.popMove()
+            if childScore >= score:
+                return column
+        raise AssertionError('nenhuma jogada atinge a pontuação calculada')
+
+    def _checkBudget(self):
+        """Lança _Interrupted se o prazo venceu ou o evento de parada foi ativado."""
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _Interrupted()
+        if self._stopEvent is not None and self._stopEvent.is_set():
+            raise _Interrupted()
+        self._nextCheck = self.nodes + _CHECK_INTERVAL
+
+    @staticmethod
+    def _distance(score, nChips, size):
+        """Converte a pontuação exata no número de jogadas até o fim da partida."""
+        if score == 0:
+            return size - nChips
+        # Fichas no tabuleiro antes da jogada vencedora: tem a paridade de quem vence
+        before = size + 1 - 2 * abs(score)
+        if (before - nChips) % 2 != (score < 0):
+            before -= 1
+        return before - nChips + 1
+
+    def _order(self, board, ttMove):
+        """Colunas livres, começando pela da tabela e depois das centrais para as das bordas."""
+        moves = [c for c in board.centerOrder if board.canPlay(c)]
+        if ttMove in moves:
+            moves.remove(ttMove)
+            moves.insert(0, ttMove)
+        return moves
+
+    def _negamax(self, board, alpha, beta, player):
+        """Negamax com poda alfa-beta sobre pontuações exatas, do ponto de vista de 'player' (quem joga)."""
+        self.nodes += 1
+        if self.nodes >= self._nextCheck:
+            self._checkBudget()
+        size = board.nRows * board.nCols
+        nChips = board.nChips
+        if nChips == size:
+            return 0
+        if board.winningMask(player) & board.playableMask():    # Vitória imediata
+            return (size + 1 - nChips) // 2
+        safe = board.nonLosingMask(player)
+        if not safe:    # Toda jogada permite a vitória do adversário na resposta
+            return -((size - nChips) // 2)
+        if nChips >= size - 2:  # Sem vitória de ninguém nas duas últimas jogadas
+            return 0
+
+        # Sem vitória imediata, o melhor possível é vencer na próxima jogada; o pior, perder duas jogadas depois
+        high = (size - 1 - nChips) // 2
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+        low = -((size - 2 - nChips) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+
+        key = board.key
+        table = self.table
+        entry = table.probe(key)
+        ttMove = NO_MOVE
+        if entry is not None:
+            ttScore, _, ttFlag, ttMove = entry
+            ttMove = board.orientMove(ttMove)   # A tabela guarda a jogada na orientação da chave canônica
+            if ttFlag == EXACT:
+                return ttScore
+            if ttFlag == LOWER:
+                alpha = max(alpha, ttScore)
+            else:
+                beta = min(beta, ttScore)
+            if alpha >= beta:
+                return ttScore
+
+        alphaOrig = alpha
+        bestMove = NO_MOVE
+        remaining = size - nChips
+        heights = board.heights
+        for column in self._order(board, ttMove):
+            if not safe >> heights[column] & 1:     # Perde na resposta: nunca é melhor que as jogadas seguras
+                continue
+            board.pushMove(column, player)
+            score = -self._negamax(board, -beta, -alpha, 3 - player)
+            board.popMove()
+            if score >= beta:
+                table.store(key, score, remaining, LOWER, board.orientMove(column))
+                return score
+            if score > alpha:
+                alpha = score
+                bestMove = column
+        table.store(key, alpha, remaining, EXACT if alpha > alphaOrig else UPPER, board.orientMove(bestMove))
+        return alpha
@@ -0,0 +1,196 @@
+import os, time
+from collections import namedtuple
+import playerAI
+from bitboard import ALMOST_WIN_SCORE, WIN_SCORE
+from endgameSolver import EndgameSolver, SOLVER_TT_BYTES
+from transposition import TranspositionTable
+
+DEFAULT_PRESET = 'default'
+MAX_WIN_SCORE = 2**16   # Limite de winScore: as pontuações da busca precisam caber na tabela de transposição
+
+_FIELDS = ('depth', 'timeLimit', 'engine', 'almostWinScore', 'winScore', 'ttBytes', 'solverBytes', 'workers', 'book',
+           'bookPly', 'endgameThreshold')
+
+class EngineConfig(namedtuple('EngineConfig', _FIELDS,
+                              defaults = (playerAI.MAX_DEPTH, None, 'alphabeta', ALMOST_WIN_SCORE, WIN_SCORE,
+                                          playerAI.TT_BYTES, SOLVER_TT_BYTES, 1, None, None, playerAI.ENDGAME_THRESHOLD))):
+    """Configuração completa de uma IA. Os valores padrão reproduzem o comportamento de playerAI.minimax.
+
+    depth: profundidade máxima (mesma convenção de MAX_DEPTH) ou None para aprofundar enquanto houver tempo.
+    timeLimit: orçamento de tempo de cada jogada em ms, ou None para buscar sempre até 'depth'.
+    engine: motor de busca ("alphabeta" ou "pvs").
+    almostWinScore, winScore: pesos da avaliação (ALMOST_WIN_SCORE e WIN_SCORE).
+    ttBytes, solverBytes: orçamentos de memória das tabelas de transposição da busca e do resolvedor de finais.
+    workers: processos da busca. 1 busca na própria thread; None ou mais de 1 usa parallelSearch (None: um por núcleo).
+    book: arquivo do livro de aberturas, ou None para o padrão (playerAI.setDefaultBook).
+    bookPly: consulta o livro só em posições com até essa quantidade de fichas (None: todas; 0 desativa o livro).
+    endgameThreshold: células vazias a partir das quais a posição é resolvida exatamente (0 desativa o resolvedor).
+    Todos os campos numéricos são inteiros (ver validate), e winScore vai no máximo até MAX_WIN_SCORE.
+    """
+    __slots__ = ()
+
+    @property
+    def weights(self):
+        """Pesos da avaliação no formato aceito pelas buscas de playerAI (quase vitória, vitória)."""
+        return (self.almostWinScore, self.winScore)
+
+    def validate(self):
+        """Lança ValueError se a configuração não puder ser usada. Retorna a própria configuração."""
+        for field, minimum, optional in _INT_FIELDS:
+            value = getattr(self, field)
+            if value is None and optional:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+                raise ValueError(f'{field} deve ser um inteiro maior ou igual a {minimum}'
+                                 + (' ou none' if optional else '') + f' (recebido: {value!r})')
+        if self.depth is None and self.timeLimit is None:
+            raise ValueError('A configuração precisa de uma profundidade (depth) ou de um orçamento de tempo (timeLimit)')
+        if self.engine not in playerAI.ENGINES:
+            raise ValueError(f'Motor de busca desconhecido: {self.engine}')
+        if not self.almostWinScore < self.winScore <= MAX_WIN_SCORE:
+            raise ValueError(f'Os pesos devem satisfazer 0 <= almostWinScore < winScore <= {MAX_WIN_SCORE}')
+        if self.book is not None and not isinstance(self.book, str):
+            raise ValueError(f'book deve ser o caminho de um arquivo ou none (recebido: {self.book!r})')
+        return self
+
+# Campos inteiros: (campo, menor valor aceito, se aceita None)
+_INT_FIELDS = (('depth', 0, True), ('timeLimit', 1, True), ('almostWinScore', 0, False), ('winScore', 1, False),
+               ('ttBytes', 0, False), ('solverBytes', 0, False), ('workers', 1, True), ('bookPly', 0, True),
+               ('endgameThreshold', 0, False))
+
+# Perfis nomeados, do mais rápido ao mais forte. "default" é a IA de sempre (MAX_DEPTH, sem limite de tempo).
+# Cada limite do resolvedor deixa a resolução bem dentro da metade do orçamento de tempo que ela pode usar. Em posições
+# de partidas entre IAs, ela leva até ~20 ms com 16 células vazias, ~100 ms com 18, ~250 ms com 20 e vários segundos com 24
+PRESETS = {
+    'easy': EngineConfig(depth = 2, bookPly = 0, endgameThreshold = 0, ttBytes = 2**20),
+    'blitz': EngineConfig(depth = None, timeLimit = 100, engine = 'pvs', ttBytes = 4 * 2**20,
+                          solverBytes = 2 * 2**20, endgameThreshold = 10),
+    'default': EngineConfig(),
+    'strong': EngineConfig(depth = None, timeLimit = 1000, engine = 'pvs', ttBytes = 64 * 2**20,
+                           solverBytes = 32 * 2**20, endgameThreshold = 18),
+    'analysis': EngineConfig(depth = None, timeLimit = 5000, engine = 'pvs', ttBytes = 256 * 2**20,
+                             solverBytes = 64 * 2**20, workers = None, endgameThreshold = 20),
+}
+
+def _parseValue(text):
+    """Converte o valor de uma opção escrita na linha de comando ("none", inteiro, número ou texto)."""
+    if text.lower() == 'none':
+        return None
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+def getConfig(spec = DEFAULT_PRESET):
+    """Obtém uma configuração a partir do nome de um perfil, opcionalmente seguido de ajustes.
+
+    Parameters
+    ----------
+    spec: str | EngineConfig, default DEFAULT_PRESET
+        Nome de um perfil de PRESETS, com ajustes opcionais separados por vírgula
+        (ex.: "strong", "blitz,timeLimit=50" ou "default,depth=6,almostWinScore=40"). Uma EngineConfig
+        é apenas validada.
+
+    Returns
+    -------
+    EngineConfig
+    """
+    if isinstance(spec, EngineConfig):
+        return spec.validate()
+    name, *overrides = spec.split(',')
+    if name not in PRESETS:
+        raise ValueError(f'Perfil desconhecido: {name} (disponíveis: {", ".join(PRESETS)})')
+    changes = {}
+    for override in overrides:
+        field, sep, value = override.partition('=')
+        if not sep or field not in EngineConfig._fields:
+            raise ValueError(f'Ajuste inválido: {override} (campos: {", ".join(EngineConfig._fields)})')
+        changes[field] = _parseValue(value)
+    return PRESETS[name]._replace(**changes).validate()
+
+class Engine:
+    """IA pronta para jogar segundo uma EngineConfig: mantém a tabela de transposição, o resolvedor de finais,
+    o livro e, se a configuração pedir mais de um processo, o pool de parallelSearch entre as jogadas.
+
+    Cada Engine tem os seus recursos, então duas IAs com configurações diferentes (por exemplo, os dois lados
+    de uma partida entre IAs) nunca misturam pontuações calculadas com pesos diferentes.
+    """
+    def __init__(self, config = None):
+        """
+        Parameters
+        ----------
+        config: EngineConfig | str, optional
+            Configuração ou perfil (ver getConfig). Se não fornecida, usa DEFAULT_PRESET.
+        """
+        self.config = config = getConfig(DEFAULT_PRESET if config is None else config)
+        self.table = TranspositionTable(config.ttBytes)
+        self.solver = EndgameSolver(config.solverBytes)
+        self.book = None
+        if config.book:
+            from openingBook import OpeningBook
+            self.book = OpeningBook(config.book)
+        self._parallel = None
+        if config.workers != 1:
+            from parallelSearch import ParallelSearcher     # Importado só quando usado (cria processos)
+            self._parallel = ParallelSearcher(config.workers, mode = 'lazySMP', ttBytes = config.ttBytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search(self, board: object, aiChipNum: int, *, stopEvent = None, onProgress = None):
+        """Calcula a jogada de 'aiChipNum' em 'board' (consultando antes o livro e o resolvedor).
+
+        Com um único processo, faz aprofundamento iterativo até 'depth' ou até esgotar 'timeLimit'; 'stopEvent' e
+        'onProgress' são os de playerAI.iterativeDeepening. Com vários processos, só o resolvedor de finais pode ser
+        interrompido por 'stopEvent'; a busca termina pelo orçamento da configuração.
+
+        Returns
+        -------
+        playerAI.SearchResult
+        """
+        config = self.config
+        book = self.book
+        if config.bookPly is not None and board.getTotalChips() > config.bookPly:
+            book = False
+        options = {'book': book, 'endgameThreshold': config.endgameThreshold, 'solver': self.solver,
+                   'weights': config.weights}
+        if self._parallel is None:
+            return playerAI.iterativeDeepening(board, aiChipNum, config.timeLimit, maxDepth = config.depth,
+                                               table = self.table, engine = config.engine, stopEvent = stopEvent,
+                                               onProgress = onProgress, **options)
+        # Como em iterativeDeepening, o resolvedor usa no máximo metade do orçamento e a busca fica com o restante
+        start = time.perf_counter()
+        timeLimit = config.timeLimit
+        shortcut = playerAI.shortcutMove(board, aiChipNum, timeLimit = timeLimit and timeLimit / 2,
+                                         stopEvent = stopEvent, **options)
+        if shortcut is not None:
+            return shortcut
+        if timeLimit is not None:
+            timeLimit = max(timeLimit - (time.perf_counter() - start) * 1000, 1)
+        return self._parallel.search(board, aiChipNum, config.depth, engine = config.engine,
+                                     timeLimit = timeLimit, weights = config.weights)
+
+    def newGame(self):
+        """Esquece as buscas da partida anterior (a tabela do resolvedor, com valores exatos, é mantida)."""
+        self.table.clear()
+
+    def close(self):
+        """Encerra os processos de busca e fecha o livro, se houver."""
+        if self._parallel is not None:
+            self._parallel.close()
+        if self.book is not None:
+            self.book.close()
+
+def presetHelp():
+    """Resumo dos perfis disponíveis, para as mensagens de ajuda das linhas de comando."""
+    return '; '.join(f'{name}: ' + (f'{config.timeLimit:g} ms' if config.timeLimit else f'profundidade {config.depth}')
+                     for name, config in PRESETS.items())
+
+if __name__ == '__main__':
+    for name, config in PRESETS.items():
+        print(f'{name:>9}  ' + ', '.join(f'{field}={value}' for field, value in zip(EngineConfig._fields, config)))
@@ -0,0 +1,50 @@
+import numpy as np
+from board import Board, getWindowIndices
+from bitboard import ALMOST_WIN_SCORE
+
+def almostWinScores(cells, aiChipNum):
+    """Versão vetorizada de Board.checkAlmostWin para um ou vários tabuleiros de uma vez.
+
+    Parameters
+    ----------
+    cells: numpy.ndarray
+        Um tabuleiro (nRows x nCols) ou uma pilha de tabuleiros (N x nRows x nCols) no formato de Board.cells.
+    aiChipNum: int
+        Número da ficha do jogador do ponto de vista do qual a pontuação é calculada.
+
+    Returns
+    -------
+    int | numpy.ndarray
+        Pontuação de cada tabuleiro (um inteiro se 'cells' for um único tabuleiro).
+    """
+    cells = np.asarray(cells)
+    nRows, nCols = cells.shape[-2:]
+    flat = cells.reshape(-1, nRows * nCols)
+    windows = flat[:, getWindowIndices(nRows, nCols)]       # N x nGrupos x 4
+    aiThrees = np.count_nonzero(np.count_nonzero(windows == aiChipNum, axis = 2) == 3, axis = 1)
+    foeThrees = np.count_nonzero(np.count_nonzero(windows == 3 - aiChipNum, axis = 2) == 3, axis = 1)
+    scores = ALMOST_WIN_SCORE * (aiThrees - foeThrees)
+    if cells.ndim == 2:
+        return int(scores[0])
+    return scores
+
+def selfCheck(cells, aiChipNum):
+    """Confere almostWinScores com a implementação escalar de referência (Board._checkAlmostWinReference).
+
+    Parameters
+    ----------
+    cells: numpy.ndarray
+        Um tabuleiro ou uma pilha de tabuleiros no formato de Board.cells.
+    aiChipNum: int
+        Número da ficha da IA.
+
+    Returns
+    -------
+    list[int]
+        Índices dos tabuleiros em que as pontuações divergem (vazia se todas coincidirem).
+    """
+    cells = np.asarray(cells)
+    stack = cells.reshape(-1, *cells.shape[-2:])
+    scores = np.atleast_1d(almostWinScores(stack, aiChipNum))
+    nRows, nCols = stack.shape[1:]
+    return [i for i, board in enumerate(stack) if Board(board, nRows, nCols)._checkAlmostWinReference(aiChipNum) != scores[i]]
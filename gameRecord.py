@@ -0,0 +1,206 @@
+import sys, json, struct, argparse
+from collections import namedtuple, Counter
+from bitboard import BitBoard
+
+DRAW = 0
+UNFINISHED = 3  # Partida interrompida antes do fim (0 empate, 1 e 2 vitória do jogador)
+_MAGIC = b'C4GR'
+_VERSION = 1
+_FILE_HEADER = struct.Struct('<4sB')    # Assinatura, versão
+_GAME_HEADER = struct.Struct('<BBBH')   # nRows, nCols, resultado, número de jogadas
+# Byte com duas jogadas (a primeira nos 4 bits de baixo) -> as duas jogadas, para decodificar um byte por consulta
+_NIBBLE_PAIRS = [bytes((byte & 0xF, byte >> 4)) for byte in range(256)]
+
+GameRecord = namedtuple('GameRecord', ['moves', 'result', 'nRows', 'nCols'])
+GameRecord.__doc__ = """Partida gravada: jogadas (bytes com as colunas a partir de 0, o jogador 1 começa), resultado
+(DRAW, 1, 2 ou UNFINISHED) e dimensões do tabuleiro."""
+
+def _toColumns(moves, nCols):
+    """Converte uma sequência de jogadas (colunas a partir de 1, ex.: "4453", ou inteiros a partir de 0) em bytes.
+
+    A string tem um caractere por jogada e por isso só vale em tabuleiros de até 9 colunas.
+    """
+    if isinstance(moves, str) and nCols > 9:
+        raise ValueError(f'Jogadas em texto só representam tabuleiros de até 9 colunas: {moves!r}')
+    try:
+        if isinstance(moves, str):
+            return bytes(int(c) - 1 for c in moves)
+        return bytes(moves)
+    except ValueError:
+        raise ValueError(f'Jogadas inválidas: {moves!r}') from None
+
+def _result(moves, nRows, nCols):
+    """Reproduz a partida para descobrir o resultado (também confere que as jogadas são válidas)."""
+    board = BitBoard(nRows, nCols)
+    player = 1
+    for i, column in enumerate(moves):
+        if not 0 <= column < nCols or board.pushMove(column, player) is None:
+            raise ValueError(f'Jogada inválida na coluna {column} (jogada {i + 1})')
+        if board.isWinner(player):
+            if i != len(moves) - 1:
+                raise ValueError(f'A partida continua depois da vitória do jogador {player}')
+            return player
+        player = 3 - player
+    return DRAW if board.isFull() else UNFINISHED
+
+class GameWriter:
+    """Grava partidas uma a uma no formato compacto lido por readGames.
+
+    O arquivo tem um cabeçalho de 5 bytes e, para cada partida, 5 bytes (dimensões, resultado e número de jogadas)
+    seguidos das jogadas: duas por byte (4 bits cada) em tabuleiros de até 15 colunas, uma por byte nos maiores.
+    Uma partida de 42 jogadas ocupa 26 bytes. Cada write() grava só a partida dada, então o escritor pode ficar
+    aberto durante um torneio ou uma sessão na interface.
+    """
+    def __init__(self, path, *, append = True):
+        """
+        Parameters
+        ----------
+        path: str
+            Arquivo de saída.
+        append: bool, default True
+            Acrescenta as partidas ao fim de um arquivo existente. Se False, o arquivo é sobrescrito.
+        """
+        self.path = path
+        self._file = open(path, 'ab' if append else 'wb')
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION))
+        else:
+            with open(path, 'rb') as file:
+                _readFileHeader(file)
+        self.count = 0      # Partidas gravadas por este escritor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, moves, result = None, nRows = 6, nCols = 7):
+        """Grava uma partida.
+
+        Parameters
+        ----------
+        moves: str | iterable[int]
+            Jogadas em ordem: inteiros a partir de 0 (como em BitBoard.moves e selfPlay) ou string de colunas a
+            partir de 1 (só em tabuleiros de até 9 colunas).
+        result: int, optional
+            DRAW, 1, 2 ou UNFINISHED. Se não fornecido, é calculado reproduzindo a partida.
+        nRows: int, default 6
+            Número de linhas do tabuleiro.
+        nCols: int, default 7
+            Número de colunas do tabuleiro.
+        """
+        moves = _toColumns(moves, nCols)
+        if result is None:
+            result = _result(moves, nRows, nCols)
+        elif moves and max(moves) >= nCols:     # Sem a reprodução, confere ao menos que as colunas cabem no formato
+            column = max(moves)
+            raise ValueError(f'Jogada inválida na coluna {column} (jogada {moves.index(column) + 1})')
+        self._file.write(_GAME_HEADER.pack(nRows, nCols, result, len(moves)))
+        if nCols <= 15:
+            padded = moves + b'\0' if len(moves) % 2 else moves
+            moves = bytes(a | b << 4 for a, b in zip(padded[::2], padded[1::2]))
+        self._file.write(moves)
+        self.count += 1
+
+    def flush(self):
+        """Garante que as partidas gravadas até agora estão no arquivo (para leitores em outros processos)."""
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def _readFileHeader(file):
+    header = file.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size or _FILE_HEADER.unpack(header) != (_MAGIC, _VERSION):
+        raise ValueError(f'{file.name} não é um arquivo de partidas válido')
+
+def readGames(path):
+    """Lê as partidas de um arquivo gravado por GameWriter, uma de cada vez (o arquivo nunca é lido inteiro).
+
+    Yields
+    ------
+    GameRecord
+    """
+    with open(path, 'rb', buffering = 1 << 16) as file:
+        _readFileHeader(file)
+        read = file.read
+        headerSize = _GAME_HEADER.size
+        unpack = _GAME_HEADER.unpack
+        pairs = _NIBBLE_PAIRS
+        while True:
+            header = read(headerSize)
+            if not header:
+                return
+            if len(header) < headerSize:
+                raise ValueError(f'{path}: partida incompleta no fim do arquivo')
+            nRows, nCols, result, nMoves = unpack(header)
+            packed = nCols <= 15
+            size = (nMoves + 1) // 2 if packed else nMoves
+            moves = read(size)
+            if len(moves) < size:
+                raise ValueError(f'{path}: partida incompleta no fim do arquivo')
+            if packed:
+                moves = b''.join(map(pairs.__getitem__, moves))[:nMoves]
+            yield GameRecord(moves, result, nRows, nCols)
+
+def replay(record):
+    """Reproduz uma partida, gerando cada posição antes de uma jogada.
+
+    O tabuleiro gerado é o mesmo objeto a cada passo, alterado pela jogada seguinte; use board.copy() para guardá-lo
+    (ou board.toCells() para uma matriz no formato de Board.cells).
+
+    Yields
+    ------
+    tuple[BitBoard, int]
+        Posição e a coluna jogada nela (a partir de 0). O jogador da vez é board.nextPlayer().
+    """
+    board = BitBoard(record.nRows, record.nCols)
+    player = 1
+    for column in record.moves:
+        yield board, column
+        board.pushMove(column, player)
+        player = 3 - player
+
+def convertJsonl(source, path, nRows = 6, nCols = 7):
+    """Converte as partidas gravadas em JSON por selfPlay.runMatch (uma por linha) para o formato compacto.
+
+    Parameters
+    ----------
+    source: str
+        Arquivo JSONL de selfPlay.
+    path: str
+        Arquivo de partidas a criar (substituído se já existir).
+    nRows: int, default 6
+        Número de linhas das partidas que não o gravam (arquivos de versões antigas de selfPlay).
+    nCols: int, default 7
+        Número de colunas das partidas que não o gravam.
+
+    Returns
+    -------
+    int
+        Número de partidas convertidas.
+    """
+    with open(source, encoding = 'utf-8') as file, GameWriter(path, append = False) as writer:
+        for line in file:
+            game = json.loads(line)
+            writer.write(game['moves'], game['winner'], game.get('nRows', nRows), game.get('nCols', nCols))
+        return writer.count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Resume um arquivo de partidas ou converte os resultados de selfPlay.')
+    parser.add_argument('path', help = 'arquivo de partidas')
+    parser.add_argument('-fromjsonl', default = None, help = 'arquivo JSONL de selfPlay a converter para "path"')
+    parser.add_argument('-rows', type = int, default = 6, help = 'linhas das partidas do JSONL que não as gravam')
+    parser.add_argument('-cols', type = int, default = 7, help = 'colunas das partidas do JSONL que não as gravam')
+    args = parser.parse_args(sys.argv[1:])
+    if args.fromjsonl:
+        print(f'{convertJsonl(args.fromjsonl, args.path, args.rows, args.cols)} partidas convertidas')
+    results = Counter()
+    moves = 0
+    for record in readGames(args.path):
+        results[record.result] += 1
+        moves += len(record.moves)
+    games = sum(results.values())
+    print(f'{games} partidas, {moves} jogadas. Vitórias do jogador 1: {results[1]}, do jogador 2: {results[2]}, '
+          f'empates: {results[DRAW]}, interrompidas: {results[UNFINISHED]}')
@@ -1,31 +1,68 @@
 import os, sys, random
 import pygame as pg
-from board import Board
-from playerAI import minimax
+from bitboard import BitBoard
+from aiWorker import AIWorker
+from openingBook import OpeningBook, DEFAULT_PATH as BOOK_PATH
+from gameRecord import GameWriter, DRAW, UNFINISHED
+from engineConfig import getConfig
+import playerAI
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 LIGHT_GRAY =  (190, 190, 190)
 RED = (145, 17, 17)
 YELLOW = (200, 209, 23)
+FPS = 60    # Limite de quadros por segundo do laço de eventos (libera a CPU para a thread da IA)
+_TEXT_CACHE_SIZE = 64   # Máximo de textos renderizados mantidos em cache
 
 class Game:
     _xMargin = 5        # Tamanho da margem entre o tabuleiro e a borda da janela (eixo X)
     _topMargin = 140    # Tamanho da margem entre o tabuleiro e a borda da janela (eixo Y, cima)
     _botMargin = 84     # Tamanho da margem entre o tabuleiro e a borda da janela (eixo Y, baixo)
-    _cellSize = 84      # Tamanho de cada célula. O tabuleiro é dividido em 7 células horizontais e 6 verticais.
+    _cellSize = 84      # Tamanho de cada célula. O tabuleiro é dividido em nCols células horizontais e nRows verticais.
     player1Turn = True  # Player 1 == True: vermelho. Player 1 == False: amarelo
     gameOver = False
-    board = Board()     # Objeto contendo as informações e métodos do tabuleiro
+    board = None        # Objeto contendo as informações e métodos do tabuleiro (BitBoard)
 
-    def __init__(self, size: tuple[int]):
+    def __init__(self, size: tuple[int] = None, *, nRows: int = 6, nCols: int = 7, records: str = None,
+                 red = None, yellow = None):
+        """
+        Parameters
+        ----------
+        size: tuple[int], optional
+            Tamanho da janela. Se não fornecido, é calculado a partir das dimensões do tabuleiro (600x700 no 7x6).
+        nRows: int, default 6
+            Número de linhas do tabuleiro.
+        nCols: int, default 7
+            Número de colunas do tabuleiro.
+        records: str, optional
+            Arquivo onde cada partida é acrescentada ao terminar (formato de gameRecord).
+        red: engineConfig.EngineConfig | str, optional
+            Configuração ou perfil da IA vermelha (só em startAuto). Se não fornecida, usa a IA padrão.
+        yellow: engineConfig.EngineConfig | str, optional
+            Configuração ou perfil da IA amarela.
+        """
+        if size is None:
+            size = (nCols * self._cellSize + 2 * self._xMargin + 2, self._topMargin + nRows * self._cellSize + 56)
+        self.board = BitBoard(nRows, nCols)
         pg.init()
         pg.display.set_caption('Connect 4')
         self.screen = pg.display.set_mode(size)
         self.screen.fill(WHITE)
+        self._dirty = [self.screen.get_rect()]    # Regiões da tela alteradas desde o último pg.display.update
+        self._fonts = {}            # Tamanho -> pg.font.Font
+        self._texts = {}            # (texto, tamanho, cor, fundo) -> superfície renderizada
+        self._arrowStates = []      # Flecha desenhada em cada coluna ("small" | "big")
+        self._cursor = None
+        self._thinkingText = ''
 
         self.width, self.height = size
         self.turns = 0
+        self.moves = []     # Colunas jogadas, em ordem (gravadas no arquivo de partidas)
+        self.clock = pg.time.Clock()
+        self.configs = {1: red, 2: yellow}
+        self.ais = {}       # Ficha -> AIWorker, que calcula as jogadas da IA sem bloquear o laço de eventos
+        self.recorder = GameWriter(records) if records else None
         self.imgs = {
             'board': pg.image.load(os.path.join('img', 'board.png')).convert_alpha(),       # Tabuleiro
             'sArrow': pg.image.load(os.path.join('img', 'arrow_s.png')).convert_alpha(),    # Seta pequenoa
@@ -33,16 +70,68 @@ class Game:
             'yChip': pg.image.load(os.path.join('img', 'chip_y.png')).convert_alpha(),      # Ficha amarela
             'rChip': pg.image.load(os.path.join('img', 'chip_r.png')).convert_alpha()       # Ficha vermelha
         }
+        self.imgs['board'] = self.buildBoardImage(self.imgs['board'], nRows, nCols)
         self.rects = {
             'sArrows': [],   # Pequeno
             'lArrows': [],    # Grande
             'rstButtom': None
         }
         self.screen.blit(self.imgs['board'], (self._xMargin, self._topMargin))
-        for i in range(7):      # 7 colunas
+        for i in range(nCols):
             self.rects['sArrows'].append(pg.Rect(i*self._cellSize + self._xMargin + 10, 110, self.imgs['sArrow'].get_width(), self.imgs['sArrow'].get_height()))
             self.rects['lArrows'].append(pg.Rect(i*self._cellSize + self._xMargin, 110, self.imgs['lArrow'].get_width(), self.imgs['lArrow'].get_height()))
-            self.drawArrow(i, 'small')        
+            self._arrowStates.append(None)
+            self.drawArrow(i, 'small')
+
+    def getFont(self, size: int):
+        """Retorna a fonte padrão no tamanho 'size', criada apenas no primeiro uso."""
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pg.font.Font(None, size)
+        return font
+
+    def renderText(self, text: str, size: int, color: tuple, background: tuple = WHITE):
+        """Renderiza 'text', reaproveitando a superfície se o mesmo texto já foi renderizado com a mesma fonte e cores."""
+        key = (text, size, color, background)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) >= _TEXT_CACHE_SIZE:
+                self._texts.clear()
+            surface = self._texts[key] = self.getFont(size).render(text, True, color, background)
+        return surface
+
+    def refresh(self):
+        """Atualiza na janela apenas as regiões da tela alteradas desde a última chamada."""
+        if self._dirty:
+            pg.display.update(self._dirty)
+            self._dirty.clear()
+
+    def setCursor(self, cursor):
+        """Muda o cursor do mouse, se ele ainda não for 'cursor'."""
+        if cursor != self._cursor:
+            pg.mouse.set_cursor(cursor)
+            self._cursor = cursor
+
+    def buildBoardImage(self, image, nRows: int, nCols: int):
+        """
+        Monta a imagem de um tabuleiro nRows x nCols a partir da imagem do tabuleiro 7x6, repetindo suas faixas
+        de células (a primeira e a última coluna/linha mantêm as bordas). Retorna a própria imagem no 7x6.
+        """
+        if (nRows, nCols) == (6, 7):
+            return image
+        cell = self._cellSize
+        legs = image.get_height() - 6 * cell           # Faixa de baixo (pés do tabuleiro)
+        rightEdge = image.get_width() - 7 * cell        # Borda direita, além da última coluna
+        surface = pg.Surface((nCols * cell + rightEdge, nRows * cell + legs), pg.SRCALPHA)
+        # Coluna/linha de origem de cada coluna/linha de destino: as das pontas vêm das pontas, as demais do meio
+        srcCols = [0 if c == 0 else 6 if c == nCols - 1 else 1 + (c - 1) % 5 for c in range(nCols)]
+        srcRows = [round(r * 5 / (nRows - 1)) if nRows > 1 else 0 for r in range(nRows)]
+        for c, srcCol in enumerate(srcCols):
+            width = cell + (rightEdge if c == nCols - 1 else 0)
+            for r, srcRow in enumerate(srcRows):
+                surface.blit(image, (c * cell, r * cell), pg.Rect(srcCol * cell, srcRow * cell, width, cell))
+            surface.blit(image, (c * cell, nRows * cell), pg.Rect(srcCol * cell, 6 * cell, width, legs))
+        return surface
 
     def drawArrow(self, column: int, arrowType: str):
         """
@@ -55,31 +144,40 @@ class Game:
             self.screen.blit(self.imgs['sArrow'], self.rects['sArrows'][column]) 
         elif arrowType == 'big':
             self.screen.blit(self.imgs['lArrow'], self.rects['lArrows'][column])
+        self._arrowStates[column] = arrowType
+        self._dirty.append(self.rects['lArrows'][column])
+
+    def redrawArrows(self):
+        """Redesenha todas as flechas no estado atual (depois de a área delas ter sido apagada)."""
+        for i, arrowType in enumerate(self._arrowStates):
+            self.drawArrow(i, arrowType or 'small')
 
     def checkMouseCollision(self):
         """ 
         Verifica se o mouse está sobreposto a caixa de colisão de alguma das setas de inserção de ficha.
         Se sim, redesenha a seta sobreposta para uma maior, muda o cursor para "mão" e retorna a coluna da seta (começando em 0).
         Se não, muda o cursor para flecha e retorna None.
+        Apenas as setas que mudaram de estado são redesenhadas.
         """
         mousePos = pg.mouse.get_pos()
         hovering = {'arrow': None, 'reset': False}    # Para determinar se o cursor deve mudar ou não
         # Setas
         for i, arrow in enumerate(self.rects['sArrows']):
+            arrowType = 'small'
             if arrow.collidepoint(mousePos):
-                pg.mouse.set_cursor(pg.SYSTEM_CURSOR_HAND)
                 hovering['arrow'] = i
-                self.drawArrow(i, 'big')
-            else:
-                self.drawArrow(i, 'small')
+                arrowType = 'big'
+            if self._arrowStates[i] != arrowType:
+                self.drawArrow(i, arrowType)
         # Botão de reset
         if self.gameOver:
             if self.rects['rstButtom'].collidepoint(mousePos):
-                pg.mouse.set_cursor(pg.SYSTEM_CURSOR_HAND)
                 hovering['reset'] = True
 
         if hovering['arrow'] == None and not hovering['reset']: 
-            pg.mouse.set_cursor(pg.SYSTEM_CURSOR_ARROW)
+            self.setCursor(pg.SYSTEM_CURSOR_ARROW)
+        else:
+            self.setCursor(pg.SYSTEM_CURSOR_HAND)
         return hovering
 
     def dropChip(self, column: int):
@@ -91,31 +189,52 @@ class Game:
         positionInserted = self.board.dropChip(column, 1 if self.player1Turn else 2)
         if positionInserted != None:
             self.turns += 1
-            self.screen.blit(
+            self.moves.append(column)
+            self._dirty.append(self.screen.blit(
                 self.imgs['rChip'] if self.player1Turn else self.imgs['yChip'],
                 (self._xMargin + (self._cellSize * column), self._topMargin + (self._cellSize * positionInserted) - self._botMargin)
-            )
+            ))
             if self.board.checkWinner():
                 mode = 'win'
                 self.gameOver = True
-            elif self.turns >= 42:
+                self.saveGame(1 if self.player1Turn else 2)
+            elif self.board.isFull():
                 mode = 'draw'
                 self.gameOver = True
+                self.saveGame(DRAW)
             else:
                 mode = 'turn'    
                 self.player1Turn = not self.player1Turn     # Troca o jogador atual
             self.genText(mode)
             
 
+    def saveGame(self, result: int):
+        """Grava a partida atual no arquivo de partidas, se houver um."""
+        if self.recorder is not None and self.moves:
+            self.recorder.write(self.moves, result, self.board.nRows, self.board.nCols)
+            self.recorder.flush()
+
+    def quit(self):
+        """Encerra a thread da IA e fecha o arquivo de partidas (gravando a partida atual como interrompida)."""
+        for ai in self.ais.values():
+            ai.shutdown()
+        if self.recorder is not None:
+            if not self.gameOver:
+                self.saveGame(UNFINISHED)
+            self.recorder.close()
+
     def genText(self, mode: str):
         """
         Limpa a parte superior da tela e escreve o texto informativo na tela
         'mode' = "turn" | "win" | "draw"
         Para os modos win e draw, também gera um botão de reiniciar jogo
         """
-        font = pg.font.Font(None, 48)
+        font = self.getFont(48)
         blankRect = pg.Rect(0, 0, self.width, self._topMargin)
         pg.draw.rect(self.screen, WHITE, blankRect)
+        self._dirty.append(blankRect)
+        self._thinkingText = ''
+        self.redrawArrows()     # A área apagada inclui as setas
         if self.player1Turn:
             playerName = 'vermelho'
             color = RED
@@ -128,10 +247,10 @@ class Game:
             textSize = font.size(f'Vez do jogador {playerName}.')
         else:
             # Botão de reset
-            rstFont = pg.font.Font(None, 36)
+            rstFont = self.getFont(36)
             rstText = 'Reiniciar'
             rstTextSize = rstFont.size('Reiniciar')
-            rstTextBox = rstFont.render(rstText, True, BLACK, LIGHT_GRAY)
+            rstTextBox = self.renderText(rstText, 36, BLACK, LIGHT_GRAY)
             self.rects['rstButtom'] = pg.Rect(
                 self.width/2 - rstTextSize[0]/2,
                 self._topMargin/2 - rstTextSize[1] + 25,
@@ -147,18 +266,60 @@ class Game:
                 color = BLACK
             self.screen.blit(rstTextBox, self.rects['rstButtom'])
 
-        textBox = font.render(text, True, color, WHITE)
+        textBox = self.renderText(text, 48, color)
         self.screen.blit(textBox, (self.width/2 - textSize[0]/2, self._topMargin/2 - textSize[1]))
 
+    def drawThinking(self):
+        """Escreve abaixo do texto informativo se a IA está pensando, com a profundidade e os nós visitados até agora.
+        Não faz nada se o texto não mudou desde a última chamada.
+        """
+        text = ''
+        ai = self.ais.get(1 if self.player1Turn else 2)
+        if ai is not None and ai.thinking:
+            depth, nodes = ai.progress
+            text = f'IA pensando... profundidade {depth}, {nodes} nós'
+        if text == self._thinkingText:
+            return
+        self._thinkingText = text
+        blankRect = pg.Rect(0, 78, self.width, 26)     # Entre o texto informativo e as setas
+        pg.draw.rect(self.screen, WHITE, blankRect)
+        self._dirty.append(blankRect)
+        if text:
+            # O número de nós muda a cada atualização: o texto não vai para o cache
+            textBox = self.getFont(24).render(text, True, BLACK, WHITE)
+            self.screen.blit(textBox, (self.width/2 - textBox.get_width()/2, 82))
+
+    def playAI(self, aiChipNum: int, *, ponder = False):
+        """Inicia a busca da jogada da IA em segundo plano ou, se ela já terminou, insere a ficha escolhida.
+        Se 'ponder' for True, a IA continua pensando nas respostas às jogadas prováveis do adversário.
+        """
+        ai = self.getAI(aiChipNum)
+        if not ai.thinking:
+            ai.start(self.board, aiChipNum)
+            return
+        col = ai.poll()
+        if col != None:
+            self.dropChip(col)
+            if ponder and not self.gameOver:
+                ai.ponder(self.board, aiChipNum)
+
+    def getAI(self, aiChipNum: int):
+        """Retorna o AIWorker da IA com a ficha 'aiChipNum', criado na primeira jogada dela com a sua configuração."""
+        if aiChipNum not in self.ais:
+            config = self.configs[aiChipNum]
+            self.ais[aiChipNum] = AIWorker(config) if config is not None else AIWorker()
+        return self.ais[aiChipNum]
+
     def start(self):
         """Inicia a rotina de jogo e mantém o controle dos eventos"""
         running = True
         self.genText('turn')
         while running:
-            pg.display.update()
             if not self.player1Turn and not self.gameOver:
-                col = minimax(self.board, 2)
-                self.dropChip(col)
+                self.playAI(2, ponder = True)
+            if not self.gameOver:
+                self.drawThinking()
+            self.refresh()
             hovering = self.checkMouseCollision()
             for event in pg.event.get():
                 if event.type == pg.QUIT:
@@ -167,6 +328,8 @@ class Game:
                     self.dropChip(hovering['arrow'])
                 if event.type == pg.MOUSEBUTTONUP and hovering['reset']:
                     self.restart()
+            self.clock.tick(FPS)
+        self.quit()
     
     def startAuto(self):
         """Inicia a rotina de jogo para duas IAs"""
@@ -176,28 +339,31 @@ class Game:
         self.dropChip(random.randrange(0, self.board.nCols))
         self.dropChip(random.randrange(0, self.board.nCols))
         while running:
-            pg.display.update()
-            if self.player1Turn and not self.gameOver:
-                col = minimax(self.board, 1)
-                self.dropChip(col)
-            pg.display.update()
-            if not self.player1Turn and not self.gameOver:
-                col = minimax(self.board, 2)
-                self.dropChip(col)
+            if not self.gameOver:
+                self.playAI(1 if self.player1Turn else 2)
+            if not self.gameOver:
+                self.drawThinking()
+            self.refresh()
             hovering = self.checkMouseCollision()
             for event in pg.event.get():
                 if event.type == pg.QUIT:
                     running = False
                 if event.type == pg.MOUSEBUTTONUP and hovering['reset']:
                     self.restart(autoMode=True)
+            self.clock.tick(FPS)
+        self.quit()
 
     def restart(self, *, autoMode = False):
         """Retorna o jogo ao estado inicial"""
+        for ai in self.ais.values():
+            ai.cancel()         # Descarta a busca em andamento, se houver
         self.player1Turn = True
         self.turns = 0
-        self.board = Board()    # Limpar o tabuleiro == criar outro
+        self.moves = []
+        self.board = BitBoard(self.board.nRows, self.board.nCols) # Limpar o tabuleiro == criar outro
         self.screen.fill(WHITE)
         self.screen.blit(self.imgs['board'], (self._xMargin, self._topMargin))
+        self._dirty.append(self.screen.get_rect())
         self.genText('turn')
         if(autoMode):
             # Aleatoriza a primeira jogada de cada IA
@@ -205,14 +371,33 @@ class Game:
             self.dropChip(random.randrange(0, self.board.nCols))
         self.gameOver = False
 
-autoMode = False
-if len(sys.argv) > 1:
-    for arg in sys.argv:
-        if arg.startswith('-auto'):
-            autoMode = True
-
-jogo = Game((600, 700))
-if autoMode:
-    jogo.startAuto()
-else:
-    jogo.start()
\ No newline at end of file
+if __name__ == '__main__':
+    autoMode = False
+    nRows, nCols = 6, 7
+    records = None
+    configs = {'red': None, 'yellow': None}
+    if len(sys.argv) > 1:
+        for arg in sys.argv:
+            if arg.startswith('-auto'):
+                autoMode = True
+            elif arg.startswith('-rows='):
+                nRows = int(arg[len('-rows='):])
+            elif arg.startswith('-cols='):
+                nCols = int(arg[len('-cols='):])
+            elif arg.startswith('-records='):
+                records = arg[len('-records='):]
+            elif arg.startswith('-ai='):      # IA do jogo contra humano (amarela)
+                configs['yellow'] = getConfig(arg[len('-ai='):])
+            elif arg.startswith(('-red=', '-yellow=')):   # Cada IA do modo -auto
+                side, spec = arg[1:].split('=', 1)
+                configs[side] = getConfig(spec)
+
+    # Livro de aberturas gerado por openingBook.py (opcional). O arquivo é apenas mapeado em memória
+    if os.path.exists(BOOK_PATH):
+        playerAI.setDefaultBook(OpeningBook(BOOK_PATH))
+
+    jogo = Game(nRows = nRows, nCols = nCols, records = records, **configs)
+    if autoMode:
+        jogo.startAuto()
+    else:
+        jogo.start()
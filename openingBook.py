@@ -0,0 +1,156 @@
+import os, sys, mmap, struct, argparse
+from bitboard import BitBoard
+
+DEFAULT_PATH = 'book.bin'
+_MAGIC = b'C4BK'
+_VERSION = 2
+_HEADER = struct.Struct('<4sBBBBI')     # Assinatura, versão, nRows, nCols, maxPly, número de posições
+_RECORD = struct.Struct('<QhBB')        # Chave de Zobrist, pontuação, coluna, profundidade (12 bytes)
+_KEY = struct.Struct('<Q')
+
+class OpeningBook:
+    """Livro de aberturas gerado por buildBook e lido diretamente do arquivo mapeado em memória.
+
+    O arquivo é uma lista de registros de tamanho fixo ordenada pela chave de Zobrist da posição, então abrir o livro
+    não lê nada além do cabeçalho e cada consulta é uma busca binária de ~20 leituras no mapeamento.
+    A chave é a canônica (BitBoard.key): uma posição e sua espelhada ocupam um único registro.
+    """
+    def __init__(self, path = DEFAULT_PATH):
+        """
+        Parameters
+        ----------
+        path: str, default DEFAULT_PATH
+            Arquivo gerado por buildBook.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, version, self.nRows, self.nCols, self.maxPly, self.count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f'{path} não é um livro de aberturas válido')
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._mmap.close()
+
+    def lookup(self, board):
+        """Procura a posição de 'board' no livro.
+
+        Parameters
+        ----------
+        board: BitBoard
+            Posição a ser procurada. A jogada do livro é sempre para o jogador que está na vez.
+
+        Returns
+        -------
+        tuple[int, int, int] | None
+            (coluna, pontuação do ponto de vista de quem joga, profundidade da busca) ou None se a posição não estiver no livro.
+        """
+        if board.nRows != self.nRows or board.nCols != self.nCols or board.getTotalChips() > self.maxPly:
+            return None
+        key = board.key
+        mm = self._mmap
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _KEY.unpack_from(mm, _HEADER.size + mid * _RECORD.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            recordKey, score, column, depth = _RECORD.unpack_from(mm, _HEADER.size + lo * _RECORD.size)
+            if recordKey == key:
+                return board.orientMove(column), score, depth
+        return None
+
+def enumeratePositions(maxPly, nRows = 6, nCols = 7):
+    """Gera todas as posições distintas (sem vencedor e sem empate, e sem repetir espelhadas) com até 'maxPly' fichas.
+
+    Yields
+    ------
+    tuple[str, int]
+        Sequência de jogadas que leva à posição (colunas a partir de 1) e a chave de Zobrist dela.
+    """
+    board = BitBoard(nRows, nCols)
+    seen = set()
+    stack = [0]     # Próxima coluna a tentar em cada nível
+    yield '', board.key
+    seen.add(board.key)
+    while stack:
+        column = stack[-1]
+        if column == nCols or len(board.moves) == maxPly:
+            stack.pop()
+            if board.moves:
+                board.popMove()
+            continue
+        stack[-1] += 1
+        if board.pushMove(column, board.nextPlayer()) is None:
+            continue
+        if board.key in seen or board.checkWinner() or board.isFull():
+            board.popMove()
+            continue
+        seen.add(board.key)
+        yield ''.join(str(c + 1) for c in board.moves), board.key
+        stack.append(0)
+
+def buildBook(path = DEFAULT_PATH, maxPly = 6, *, depth = 10, engine = 'pvs', workers = None, nRows = 6, nCols = 7,
+              cachePath = None):
+    """Gera o livro de aberturas buscando, com profundidade 'depth', todas as posições com até 'maxPly' fichas.
+
+    Parameters
+    ----------
+    path: str, default DEFAULT_PATH
+        Arquivo de saída.
+    maxPly: int, default 6
+        Número máximo de fichas das posições incluídas.
+    depth: int, default 10
+        Profundidade da busca de cada posição (mesma convenção de MAX_DEPTH).
+    engine: "alphabeta" | "pvs", default "pvs"
+        Motor de busca.
+    workers: int, optional
+        Número de processos (ver batchAnalysis.analyzeBatch).
+    nRows: int, default 6
+        Número de linhas do tabuleiro.
+    nCols: int, default 7
+        Número de colunas do tabuleiro.
+    cachePath: str, optional
+        Tabela de transposição persistente (ver batchAnalysis.analyzeBatch). Uma geração interrompida ou refeita
+        com mais posições reaproveita as buscas já feitas.
+
+    Returns
+    -------
+    int
+        Número de posições gravadas.
+    """
+    import batchAnalysis    # Importado aqui pois batchAnalysis depende de playerAI, que consulta este módulo
+    positions = list(enumeratePositions(maxPly, nRows, nCols))
+    boards = (BitBoard.fromMoves(moves, nRows, nCols) for moves, _ in positions)
+    results = batchAnalysis.analyzeBatch(boards, depth = depth, engine = engine, workers = workers, cachePath = cachePath)
+    records = []
+    for (moves, key), result in zip(positions, results):
+        # A coluna é gravada na orientação da chave canônica
+        column = BitBoard.fromMoves(moves, nRows, nCols).orientMove(result.column)
+        records.append((key, result.score, column, result.depth))
+    records.sort()
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, nRows, nCols, maxPly, len(records)))
+        for record in records:
+            file.write(_RECORD.pack(*record))
+    return len(records)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Gera o livro de aberturas.')
+    parser.add_argument('-out', default = DEFAULT_PATH, help = 'arquivo de saída')
+    parser.add_argument('-ply', type = int, default = 6, help = 'número máximo de fichas das posições do livro')
+    parser.add_argument('-depth', type = int, default = 10, help = 'profundidade da busca de cada posição')
+    parser.add_argument('-workers', type = int, default = None, help = 'número de processos')
+    parser.add_argument('-rows', type = int, default = 6, help = 'número de linhas do tabuleiro')
+    parser.add_argument('-cols', type = int, default = 7, help = 'número de colunas do tabuleiro')
+    parser.add_argument('-cache', default = None, help = 'arquivo da tabela de transposição persistente')
+    args = parser.parse_args(sys.argv[1:])
+    count = buildBook(args.out, args.ply, depth = args.depth, workers = args.workers, nRows = args.rows,
+                      nCols = args.cols, cachePath = args.cache)
+    print(f'{count} posições gravadas em {args.out} ({os.path.getsize(args.out)} bytes)')
@@ -0,0 +1,209 @@
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait
+from math import inf
+import playerAI
+from playerAI import SearchResult, MoveOrdering, MAX_DEPTH, TT_BYTES
+from bitboard import BitBoard
+from transposition import TranspositionTable
+
+MODES = ('root', 'lazySMP')
+_NO_ALPHA = -2**31      # Representa -inf no alfa compartilhado (mp.Value inteiro)
+
+_worker = {}    # Estado de cada processo trabalhador, preenchido por _initWorker
+
+def _initWorker(tableName, ttBytes, policy, sharedAlpha, stopEvent):
+    """Inicializa um processo do pool: abre a tabela compartilhada e guarda os objetos de sincronização."""
+    if tableName is None:
+        _worker['table'] = TranspositionTable(ttBytes, policy)
+    else:
+        _worker['table'] = TranspositionTable.attach(tableName, ttBytes, policy)
+    _worker['alpha'] = sharedAlpha
+    _worker['stop'] = stopEvent
+    _worker['ordering'] = MoveOrdering()    # Killers e histórico são mantidos entre tarefas do mesmo processo
+
+def _scoreRootMove(position, aiChipNum, column, depth, alpha, engine, generation, weights):
+    """Tarefa do modo "root": pontua uma jogada da raiz usando o maior alfa conhecido entre todos os processos.
+
+    Returns
+    -------
+    tuple[int, int, bool, int]
+        Coluna, pontuação, se a pontuação é exata (superou o alfa usado) e nós visitados.
+    """
+    table = _worker['table']
+    table.generation = generation
+    sharedAlpha = _worker['alpha']
+    alpha = max(alpha, sharedAlpha.value)
+    score, nodes = playerAI.scoreMove(position.toBitBoard(), aiChipNum, column, depth, alpha, table = table,
+                                      ordering = _worker['ordering'], engine = engine, weights = weights)
+    exact = score > alpha
+    if exact:
+        with sharedAlpha.get_lock():
+            if score > sharedAlpha.value:
+                sharedAlpha.value = score
+    return column, score, exact, nodes
+
+def _lazySearch(position, aiChipNum, depth, engine, generation, helper, timeLimit, weights):
+    """Tarefa do modo "lazySMP": todos os processos buscam a mesma raiz, compartilhando a tabela de transposição.
+    O processo principal (helper == 0) sempre termina a busca, dentro de 'timeLimit' se fornecido. Os auxiliares
+    usam outra ordenação e, em metade deles, uma profundidade a mais, e param quando o principal termina.
+    """
+    table = _worker['table']
+    table.generation = (generation - 1) & 0xFF     # iterativeDeepening avança a geração ao começar
+    if helper == 0:
+        ordering, stopEvent = _worker['ordering'], None
+    else:
+        ordering, stopEvent = MoveOrdering(center = helper % 2 == 0), _worker['stop']
+        timeLimit = None
+        if depth is not None:
+            depth += helper % 2
+    result = playerAI.iterativeDeepening(position.toBitBoard(), aiChipNum, timeLimit, maxDepth = depth, table = table,
+                                         ordering = ordering, engine = engine, stopEvent = stopEvent, weights = weights)
+    return tuple(result)
+
+class ParallelSearcher:
+    """Busca da melhor jogada distribuída entre os núcleos da máquina por um pool de processos.
+
+    O pool (e a tabela de transposição em memória compartilhada) é criado na primeira busca e reaproveitado
+    entre jogadas e partidas até close() ser chamado. Também pode ser usado como gerenciador de contexto.
+
+    Modos:
+        "root": divide as jogadas da raiz entre os processos (Young Brothers Wait). A primeira jogada é buscada
+            sozinha para estabelecer o alfa; as demais são buscadas em paralelo, e cada processo começa com o
+            maior alfa já encontrado pelos outros. O paralelismo é limitado ao número de colunas livres.
+        "lazySMP": todos os processos buscam a raiz inteira sobre a mesma tabela de transposição compartilhada,
+            com ordenações e profundidades diferentes, de forma que um preenche a tabela para os outros.
+    """
+    def __init__(self, workers = None, *, mode = 'root', ttBytes = TT_BYTES, policy = 'twoTier', shareTable = True):
+        """
+        Parameters
+        ----------
+        workers: int, optional
+            Número de processos. Se não fornecido, usa os.cpu_count().
+        mode: "root" | "lazySMP", default "root"
+            Forma de dividir a busca (ver a documentação da classe).
+        ttBytes: int, default TT_BYTES
+            Orçamento de memória da tabela de transposição.
+        policy: "twoTier" | "depth"
+            Política de substituição da tabela de transposição.
+        shareTable: bool, default True
+            Se True, a tabela fica em memória compartilhada entre os processos. Se False, cada processo tem a sua.
+        """
+        if mode not in MODES:
+            raise ValueError(f'Modo de busca paralela desconhecido: {mode}')
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.ttBytes = ttBytes
+        self.policy = policy
+        self.shareTable = shareTable
+        self._pool = None
+        self._table = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """Cria o pool de processos (se ainda não existir). Chamado automaticamente na primeira busca."""
+        if self._pool is not None:
+            return
+        if self.shareTable:
+            self._table = TranspositionTable.shared(self.ttBytes, self.policy)
+        else:
+            self._table = TranspositionTable(0, self.policy)    # Só para controlar a geração
+        self._alpha = mp.Value('i', _NO_ALPHA)
+        self._stop = mp.Event()
+        self._pool = ProcessPoolExecutor(self.workers, initializer = _initWorker,
+                                         initargs = (self._table.sharedName, self.ttBytes, self.policy, self._alpha, self._stop))
+
+    def close(self):
+        """Encerra o pool e libera a tabela compartilhada."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._table is not None:
+            self._table.unlink()
+            self._table = None
+
+    def minimax(self, board: object, aiChipNum: int, *, depth: int = MAX_DEPTH, engine: str = 'alphabeta'):
+        """Mesma interface de playerAI.minimax, retornando apenas a coluna."""
+        return self.search(board, aiChipNum, depth, engine = engine).column
+
+    def search(self, board: object, aiChipNum: int, depth: int = MAX_DEPTH, *, engine: str = 'alphabeta',
+               timeLimit: float = None, weights: tuple[int, int] = None):
+        """Busca a melhor jogada até a profundidade 'depth' (mesma convenção de MAX_DEPTH).
+
+        Parameters
+        ----------
+        board: object
+            Um objeto da classe Board ou BitBoard.
+        aiChipNum: 1|2
+            Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
+        depth: int, default MAX_DEPTH
+            Profundidade máxima da recursão. No modo "lazySMP" com 'timeLimit', pode ser None (sem limite).
+        engine: "alphabeta" | "pvs", default "alphabeta"
+            Motor de busca usado em cada processo.
+        timeLimit: float, optional
+            Orçamento de tempo em milissegundos (só no modo "lazySMP", em que o processo principal faz
+            aprofundamento iterativo).
+        weights: tuple[int, int], optional
+            Pesos da avaliação, como em playerAI.search().
+
+        Returns
+        -------
+        SearchResult
+            Nós visitados somam todos os processos.
+        """
+        if timeLimit is not None and self.mode != 'lazySMP':
+            raise ValueError('Orçamento de tempo só é suportado no modo "lazySMP"')
+        self.start()
+        if not isinstance(board, BitBoard):
+            board = BitBoard.fromCells(board.cells)
+        freeCols = board.getFreeColumns()
+        if len(freeCols) == 0:
+            return SearchResult(None, board.getScore(True, aiChipNum, draw = True), depth, 0)
+        # Vitória imediata ou bloqueio obrigatório: só essa jogada; nunca uma que entregue a vitória ao adversário
+        forced = board.winningMask(aiChipNum) & board.playableMask() or board.nonLosingMask(aiChipNum)
+        if forced:
+            freeCols = [c for c in freeCols if forced >> board.heights[c] & 1]
+        if board.isSymmetric():     # Jogadas espelhadas têm o mesmo valor: busca só a metade esquerda
+            freeCols = [c for c in freeCols if c <= board.nCols - 1 - c]
+        position = board.toPosition()     # Compacta para enviar aos processos
+        self._table.newSearch()
+        generation = self._table.generation
+        if self.mode == 'lazySMP':
+            return self._searchLazy(position, aiChipNum, depth, engine, generation, timeLimit, weights)
+        return self._searchRoot(position, freeCols, aiChipNum, depth, engine, generation, weights)
+
+    def _searchRoot(self, position, freeCols, aiChipNum, depth, engine, generation, weights):
+        self._alpha.value = _NO_ALPHA
+        # Irmão mais velho primeiro: estabelece o alfa antes de dividir as demais jogadas
+        first = self._pool.submit(_scoreRootMove, position, aiChipNum, freeCols[0], depth, -inf, engine, generation,
+                                  weights)
+        column, bestScore, _, nodes = first.result()
+        bestPlay = column
+        futures = [self._pool.submit(_scoreRootMove, position, aiChipNum, c, depth, bestScore, engine, generation,
+                                     weights) for c in freeCols[1:]]
+        # Percorre na ordem das colunas para desempatar como playerAI._searchRoot. Pontuações que não superaram
+        # o alfa usado são apenas limites superiores e nunca substituem a melhor jogada
+        for future in futures:
+            column, score, exact, taskNodes = future.result()
+            nodes += taskNodes
+            if exact and score > bestScore:
+                bestScore = score
+                bestPlay = column
+        return SearchResult(bestPlay, bestScore, depth, nodes)
+
+    def _searchLazy(self, position, aiChipNum, depth, engine, generation, timeLimit, weights):
+        self._stop.clear()
+        futures = [self._pool.submit(_lazySearch, position, aiChipNum, depth, engine, generation, i, timeLimit, weights)
+                   for i in range(self.workers)]
+        column, score, depth, nodes = futures[0].result()
+        self._stop.set()
+        wait(futures[1:])
+        self._stop.clear()
+        nodes += sum(future.result()[3] for future in futures[1:])
+        return SearchResult(column, score, depth, nodes)
@@ -1,24 +1,598 @@
 from math import inf
-from board import Board
-import random
+from collections import namedtuple
+from bitboard import BitBoard, ALMOST_WIN_SCORE, WIN_SCORE
+from transposition import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+from endgameSolver import EndgameSolver
+from searchStats import SearchStats
+import random, time
 
 MAX_DEPTH = 4
-def minimax(board: object, aiChipNum: int):
+ASPIRATION_WINDOW = 50  # Meia-largura da janela de aspiração na raiz do PVS
+ENGINES = ('alphabeta', 'pvs')
+TT_BYTES = 16 * 2**20   # Orçamento de memória da tabela de transposição padrão
+ENDGAME_THRESHOLD = 16  # Com até essa quantidade de células vazias, a posição é resolvida exatamente (EndgameSolver)
+
+# As pontuações são sempre do ponto de vista da IA, então a chave da tabela também depende de qual ficha é a IA
+_rng = random.Random(0)
+_PERSPECTIVE_KEYS = (0, _rng.getrandbits(63), _rng.getrandbits(63))
+_NEGAMAX_KEY = _rng.getrandbits(63)    # O negamax grava pontuações do ponto de vista de quem joga, separadas das do minimax
+_weightKeys = {(ALMOST_WIN_SCORE, WIN_SCORE): _PERSPECTIVE_KEYS}   # Pesos da avaliação -> chaves de perspectiva
+_defaultTable = None
+_defaultBook = None
+_defaultSolver = None
+_CHECK_INTERVAL = 1024  # A cada quantos nós o relógio é consultado
+
+SearchResult = namedtuple('SearchResult', ['column', 'score', 'depth', 'nodes'])
+SearchResult.__doc__ = """Resultado de uma busca: coluna escolhida, sua pontuação, profundidade completada e nós visitados."""
+
+class SearchTimeout(Exception):
+    """Lançada dentro da recursão quando o orçamento de tempo ou de nós da busca se esgota."""
+
+class MoveOrdering:
+    """Ordenação de jogadas para a poda alfa-beta.
+
+    Ordem usada em cada nó: jogada da tabela de transposição, jogadas killer do nível (jogadas que causaram
+    poda em nós irmãos) e as demais pela tabela de histórico, desempatando pelas colunas centrais.
+    Qualquer objeto com os métodos prepare, orderMoves e onCutoff pode ser usado no lugar desta classe.
+    """
+    def __init__(self, *, center = True, killers = True, history = True):
+        """
+        Parameters
+        ----------
+        center: bool, default True
+            Se True, colunas centrais são tentadas antes. Se False, a ordem base é da esquerda para a direita.
+        killers: bool, default True
+            Se True, usa as jogadas killer (2 por nível).
+        history: bool, default True
+            Se True, usa a tabela de histórico (indexada por jogador e célula).
+        """
+        self.useCenter = center
+        self.useKillers = killers
+        self.useHistory = history
+        self._shape = None
+        self.cutoffs = 0            # Nós em que houve poda
+        self.firstMoveCutoffs = 0   # Nós em que a poda ocorreu já na primeira jogada
+
+    def prepare(self, board):
+        """Ajusta as tabelas para as dimensões de 'board'. Killers e histórico são mantidos entre buscas no mesmo tamanho."""
+        shape = (board.nRows, board.nCols)
+        if shape == self._shape:
+            return
+        self._shape = shape
+        self._baseOrder = list(board.centerOrder) if self.useCenter else list(range(board.nCols))
+        nPlies = board.nRows * board.nCols + 2
+        self._killers = [[NO_MOVE, NO_MOVE] for _ in range(nPlies)]
+        nBits = board.nCols * (board.nRows + 1)
+        self._history = [None, [0] * nBits, [0] * nBits]
+
+    def orderMoves(self, board, chipNum, ply, ttMove = NO_MOVE):
+        """Retorna as colunas livres na ordem em que devem ser buscadas.
+
+        Parameters
+        ----------
+        board: BitBoard
+            Tabuleiro atual.
+        chipNum: 1|2
+            Ficha do jogador que fará a jogada.
+        ply: int
+            Nível do nó na árvore (0 na raiz).
+        ttMove: int, optional
+            Melhor jogada armazenada na tabela de transposição (NO_MOVE se nenhuma).
+        """
+        moves = [c for c in self._baseOrder if board.canPlay(c)]
+        if self.useHistory:
+            history = self._history[chipNum]
+            heights = board.heights
+            moves.sort(key = lambda c: history[heights[c]], reverse = True)    # Ordenação estável: mantém o centro no empate
+        front = []
+        if ttMove in moves:
+            front.append(ttMove)
+        if self.useKillers:
+            for killer in self._killers[ply]:
+                if killer != NO_MOVE and killer not in front and killer in moves:
+                    front.append(killer)
+        if front:
+            moves = front + [c for c in moves if c not in front]
+        return moves
+
+    def onCutoff(self, board, chipNum, ply, column, moveIndex, remaining):
+        """Registra que a jogada 'column' (a 'moveIndex'-ésima tentada) causou uma poda no nível 'ply'."""
+        self.cutoffs += 1
+        if moveIndex == 0:
+            self.firstMoveCutoffs += 1
+        if self.useKillers:
+            killers = self._killers[ply]
+            if killers[0] != column:
+                killers[1] = killers[0]
+                killers[0] = column
+        if self.useHistory:
+            self._history[chipNum][board.heights[column]] += remaining * remaining
+
+    def firstMoveCutoffRate(self):
+        """Fração das podas que ocorreram na primeira jogada tentada (quanto mais perto de 1, melhor a ordenação)."""
+        return self.firstMoveCutoffs / self.cutoffs if self.cutoffs else 0.0
+
+class _SearchContext:
+    """Estado compartilhado por todos os nós de uma busca."""
+    def __init__(self, table, maxDepth, deadline = None, maxNodes = None, ordering = None, stopEvent = None, onProgress = None,
+                 perspectiveKeys = _PERSPECTIVE_KEYS):
+        self.table = table
+        self.perspectiveKeys = perspectiveKeys  # Somadas (xor) às chaves da tabela; ver _perspectiveKeys
+        self.ordering = ordering
+        self.stopEvent = stopEvent  # Evento (threading/multiprocessing) que, quando ativado, interrompe a busca
+        self.onProgress = onProgress    # Chamada com (profundidade, nós) a cada verificação de orçamento
+        self.maxDepth = maxDepth
+        self.deadline = deadline    # Instante (time.perf_counter) em que a busca deve ser interrompida
+        self.maxNodes = maxNodes
+        self.nodes = 0
+        self.nextCheck = _CHECK_INTERVAL
+
+    def checkBudget(self):
+        """Verifica os orçamentos de tempo e de nós, lançando SearchTimeout caso algum tenha se esgotado."""
+        if self.maxNodes is not None and self.nodes >= self.maxNodes:
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.stopEvent is not None and self.stopEvent.is_set():
+            raise SearchTimeout()
+        if self.onProgress is not None:
+            self.onProgress(self.maxDepth, self.nodes)
+        self.nextCheck = self.nodes + _CHECK_INTERVAL
+        if self.maxNodes is not None:
+            self.nextCheck = min(self.nextCheck, self.maxNodes)
+
+def _perspectiveKeys(board):
+    """Chaves de perspectiva das buscas sobre 'board'. As pontuações gravadas também dependem dos pesos da avaliação,
+    então pesos diferentes dos padrões (ALMOST_WIN_SCORE, WIN_SCORE) recebem outras chaves, e buscas com pesos
+    diferentes podem compartilhar uma tabela sem ler as pontuações umas das outras.
+    """
+    weights = (board.almostWinScore, board.winScore)
+    keys = _weightKeys.get(weights)
+    if keys is None:
+        # Semente derivada só dos pesos: a mesma em todos os processos (tabelas compartilhadas, ver parallelSearch)
+        extra = random.Random(f'pesos {weights}').getrandbits(63)
+        keys = _weightKeys[weights] = tuple(key ^ extra for key in _PERSPECTIVE_KEYS)
+    return keys
+
+def getDefaultTable():
+    """Retorna a tabela de transposição compartilhada pelas chamadas de minimax (criada no primeiro uso)."""
+    global _defaultTable
+    if _defaultTable is None:
+        _defaultTable = TranspositionTable(TT_BYTES)
+    return _defaultTable
+
+def getDefaultSolver():
+    """Retorna o resolvedor de finais usado pelas buscas (criado no primeiro uso, com tabela própria)."""
+    global _defaultSolver
+    if _defaultSolver is None:
+        _defaultSolver = EndgameSolver()
+    return _defaultSolver
+
+def _solveEndgame(board, aiChipNum, threshold, solver = None, weights = None, deadline = None, stopEvent = None):
+    """Resolve a posição exatamente se restarem até 'threshold' células vazias. Retorna um SearchResult ou None
+    (também se a resolução for abandonada pelo prazo 'deadline', um instante de time.perf_counter, ou por 'stopEvent').
+    A pontuação é a que getScore daria (com os pesos 'weights') ao fim da partida jogada com perfeição pelos dois lados.
+    """
+    if threshold is None:
+        threshold = ENDGAME_THRESHOLD
+    if not isinstance(board, BitBoard):
+        board = BitBoard.fromCells(board.cells)
+    emptyCells = board.nRows * board.nCols - board.getTotalChips()
+    if emptyCells == 0 or emptyCells > threshold or board.nextPlayer() != aiChipNum or board.checkWinner():
+        return None
+    solution = (solver or getDefaultSolver()).solve(board, deadline = deadline, stopEvent = stopEvent)
+    if solution is None:
+        return None
+    finalChips = board.getTotalChips() + solution.distance
+    score = (WIN_SCORE if weights is None else weights[1]) * solution.result - finalChips
+    return SearchResult(solution.column, score, emptyCells - 1, solution.nodes)
+
+def setDefaultBook(book):
+    """Define o livro de aberturas consultado por minimax e iterativeDeepening quando 'book' não é fornecido.
+
+    Parameters
+    ----------
+    book: openingBook.OpeningBook | None
+        Livro de aberturas (ou None para não usar livro).
+    """
+    global _defaultBook
+    _defaultBook = book
+
+def _bookMove(board, aiChipNum, book):
+    """Consulta o livro de aberturas ('book', ou o padrão se None; False desativa). Retorna um SearchResult ou None."""
+    if book is None:
+        book = _defaultBook
+    if not book:
+        return None
+    if not isinstance(board, BitBoard):
+        board = BitBoard.fromCells(board.cells)
+    if board.nextPlayer() != aiChipNum:    # O livro só conhece partidas em que o jogador 1 começou
+        return None
+    entry = book.lookup(board)
+    if entry is None:
+        return None
+    column, score, depth = entry
+    return SearchResult(column, score, depth, 0)
+
+def shortcutMove(board: object, aiChipNum: int, *, book = None, endgameThreshold: int = None,
+                 solver: EndgameSolver = None, weights: tuple[int, int] = None, timeLimit: float = None,
+                 stopEvent = None):
+    """Jogada obtida sem busca: do livro de aberturas ou, perto do fim da partida, do resolvedor exato.
+    Os parâmetros são os de iterativeDeepening(), que faz essa mesma consulta antes de buscar; aqui 'timeLimit' (ms)
+    é o orçamento só do resolvedor.
+
+    Returns
+    -------
+    SearchResult | None
+        None se a posição não estiver no livro nem puder ser resolvida.
+    """
+    deadline = None if timeLimit is None else time.perf_counter() + timeLimit / 1000
+    return _bookMove(board, aiChipNum, book) or _solveEndgame(board, aiChipNum, endgameThreshold, solver, weights,
+                                                              deadline, stopEvent)
+
+def minimax(board: object, aiChipNum: int, table: TranspositionTable = None, *, timeLimit: float = None, maxNodes: int = None,
+            ordering: MoveOrdering = None, engine: str = None, book = None, endgameThreshold: int = None,
+            stats: SearchStats = None, config = None):
     """Função minimax com poda alfa e beta para cálculo da melhor jogada. 
     Refere-se a raíz da árvore. Chama _minimaxRecursio() para cálculo do restante dos ramos.
     
     Parameters
     ----------
     board: object
-        Um objeto da classe Board representando o estado inicial do tabuleiro.
+        Um objeto da classe Board ou BitBoard representando o estado inicial do tabuleiro.
+        A busca é feita sempre sobre um BitBoard (Board é convertido).
     aiChipNum: 1|2
         Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
+    table: TranspositionTable, optional
+        Tabela de transposição usada na busca. Se não fornecida, usa a tabela padrão (getDefaultTable()).
+        Os contadores de acertos/falhas/colisões podem ser lidos na tabela após a busca.
+    timeLimit: float, optional
+        Orçamento de tempo em milissegundos. Se fornecido (ou se maxNodes for), usa aprofundamento iterativo
+        em vez da profundidade fixa MAX_DEPTH. Ver iterativeDeepening().
+    maxNodes: int, optional
+        Orçamento de nós visitados para o aprofundamento iterativo.
+    ordering: MoveOrdering, optional
+        Ordenação de jogadas. Se não fornecida, uma nova MoveOrdering() é usada na busca.
+    engine: "alphabeta" | "pvs", optional
+        Motor de busca: minimax MAX/MIN com poda alfa-beta ou negamax com busca de variante principal (PVS).
+        Se não fornecido, usa o de 'config' ou "alphabeta".
+    book: openingBook.OpeningBook | False, optional
+        Livro de aberturas consultado antes da busca. Se não fornecido, usa o definido por setDefaultBook();
+        False desativa o livro.
+    endgameThreshold: int, optional
+        Com até essa quantidade de células vazias, a jogada é calculada pelo resolvedor exato (EndgameSolver)
+        em vez da busca limitada. Se não fornecido, usa ENDGAME_THRESHOLD; 0 desativa o resolvedor.
+    stats: SearchStats, optional
+        Se fornecido, é preenchido com as estatísticas da busca (nós por nível, podas, tempos, variante principal...).
+    config: engineConfig.EngineConfig, optional
+        Configuração da IA (ver engineConfig.PRESETS). Substitui MAX_DEPTH pela profundidade dela e fornece
+        o orçamento de tempo, o motor, o limite do resolvedor e os pesos da avaliação que não forem passados
+        diretamente. A tabela de transposição continua sendo 'table' ou a padrão; para usar também os tamanhos
+        de tabela, o livro e os processos da configuração, use engineConfig.Engine.
         
     Returns
     -------
     int
         Coluna onde deve ser inserido a ficha para a melhor jogada calculada.
     """
+    depth, maxDepth, weights = MAX_DEPTH, None, None
+    if config is not None:
+        depth = maxDepth = config.depth
+        weights = config.weights
+        engine = engine or config.engine
+        if timeLimit is None:
+            timeLimit = config.timeLimit
+        if endgameThreshold is None:
+            endgameThreshold = config.endgameThreshold
+    engine = engine or 'alphabeta'
+    if timeLimit is not None or maxNodes is not None:
+        return iterativeDeepening(board, aiChipNum, timeLimit, maxNodes = maxNodes, maxDepth = maxDepth, table = table,
+                                  ordering = ordering, engine = engine, book = book, endgameThreshold = endgameThreshold,
+                                  stats = stats, weights = weights).column
+    start = time.perf_counter()
+    bookMove = _bookMove(board, aiChipNum, book)
+    if bookMove is not None:
+        if stats is not None:
+            _shortcutStats(stats, 'livro', start, bookMove)
+        return bookMove.column
+    return search(board, aiChipNum, depth, table, ordering = ordering, engine = engine,
+                  endgameThreshold = endgameThreshold, stats = stats, weights = weights).column
+
+def profileMove(board: object, aiChipNum: int, path: str = None, *, sortBy: str = 'cumulative', limit: int = 30,
+                **options):
+    """Calcula uma jogada com minimax() sob o cProfile, para investigar jogadas lentas.
+
+    Parameters
+    ----------
+    board, aiChipNum
+        Como em minimax().
+    path: str, optional
+        Arquivo onde o perfil é gravado no formato do pstats (pode ser aberto por pstats, snakeviz etc.).
+    sortBy: str, default "cumulative"
+        Critério de ordenação do relatório (ver pstats.Stats.sort_stats).
+    limit: int, default 30
+        Número de funções listadas no relatório.
+    **options
+        Opções repassadas a minimax() (timeLimit, engine, stats...).
+
+    Returns
+    -------
+    tuple[int, str]
+        Coluna escolhida e o relatório do perfil em texto.
+    """
+    import cProfile, pstats, io
+    profiler = cProfile.Profile()
+    column = profiler.runcall(minimax, board, aiChipNum, **options)
+    if path is not None:
+        profiler.dump_stats(path)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream = report).sort_stats(sortBy).print_stats(limit)
+    return column, report.getvalue()
+
+def search(board: object, aiChipNum: int, depth: int = MAX_DEPTH, table: TranspositionTable = None, *,
+           ordering: MoveOrdering = None, engine: str = 'alphabeta', endgameThreshold: int = None,
+           stats: SearchStats = None, solver: EndgameSolver = None, weights: tuple[int, int] = None):
+    """Busca minimax com poda alfa-beta até a profundidade fixa 'depth'.
+
+    Parameters
+    ----------
+    board: object
+        Um objeto da classe Board ou BitBoard representando o estado inicial do tabuleiro.
+    aiChipNum: 1|2
+        Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
+    depth: int, default MAX_DEPTH
+        Profundidade máxima da recursão (mesma convenção de MAX_DEPTH).
+    table: TranspositionTable, optional
+        Tabela de transposição usada na busca.
+    ordering: MoveOrdering, optional
+        Ordenação de jogadas dentro da árvore (no motor "alphabeta" a raiz é sempre buscada da esquerda para a direita).
+    engine: "alphabeta" | "pvs", default "alphabeta"
+        Motor de busca.
+    endgameThreshold: int, optional
+        Como em minimax(). Posições resolvidas retornam a pontuação exata, independentemente de 'depth'.
+    stats: SearchStats, optional
+        Como em minimax().
+    solver: EndgameSolver, optional
+        Resolvedor de finais. Se não fornecido, usa o padrão (getDefaultSolver()).
+    weights: tuple[int, int], optional
+        Pesos da avaliação (quase vitória, vitória) no lugar de ALMOST_WIN_SCORE e WIN_SCORE. As pontuações gravadas
+        na tabela ficam separadas por pesos (ver _perspectiveKeys), então a tabela pode ser compartilhada.
+
+    Returns
+    -------
+    SearchResult
+    """
+    start = time.perf_counter()
+    solved = _solveEndgame(board, aiChipNum, endgameThreshold, solver, weights)
+    if solved is not None:
+        if stats is not None:
+            _shortcutStats(stats, 'resolvedor', start, solved)
+        return solved
+    board, table, ordering = _prepare(board, table, ordering, engine, stats = stats, weights = weights)
+    ctx = _SearchContext(table, depth, ordering = ordering, perspectiveKeys = _perspectiveKeys(board))
+    if engine == 'pvs':
+        column, score = _searchRootPVS(board, aiChipNum, ctx)
+    else:
+        column, score = _searchRoot(board, aiChipNum, ctx)
+    if stats is not None:
+        stats.addPhase(f'profundidade {depth}', start)
+        _finishStats(stats, board, aiChipNum, table, engine, column, depth)
+    return SearchResult(column, score, depth, ctx.nodes)
+
+def scoreMove(board: object, aiChipNum: int, column: int, depth: int = MAX_DEPTH, alpha: float = -inf, *,
+              table: TranspositionTable = None, ordering: MoveOrdering = None, engine: str = 'alphabeta', stopEvent = None,
+              weights: tuple[int, int] = None):
+    """Calcula a pontuação de uma única jogada da raiz, como _searchRoot faria para a coluna 'column'.
+    Usada para dividir a raiz entre vários processos (ver parallelSearch).
+
+    Parameters
+    ----------
+    board: object
+        Um objeto da classe Board ou BitBoard representando o tabuleiro antes da jogada.
+    aiChipNum: 1|2
+        Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
+    column: int
+        Coluna jogada pela IA.
+    depth: int, default MAX_DEPTH
+        Profundidade máxima da recursão.
+    alpha: float, default -inf
+        Melhor pontuação já garantida na raiz. Se a jogada não a superar, a pontuação retornada é apenas um
+        limite superior (<= alpha).
+    table, ordering, engine, stopEvent, weights
+        Como em search() e iterativeDeepening(). A geração da tabela não é avançada: quem divide a raiz
+        é responsável por chamar table.newSearch() uma vez por busca.
+
+    Returns
+    -------
+    tuple[int, int]
+        Pontuação da jogada (do ponto de vista da IA) e nós visitados.
+    """
+    board, table, ordering = _prepare(board, table, ordering, engine, newSearch = False, weights = weights)
+    ctx = _SearchContext(table, depth, ordering = ordering, stopEvent = stopEvent,
+                         perspectiveKeys = _perspectiveKeys(board))
+    if board.pushMove(column, aiChipNum) is None:
+        raise ValueError(f'Coluna cheia: {column}')
+    if engine == 'pvs':
+        score = -_negamaxRecursion(board, 0, -inf, -alpha, -1, aiChipNum, ctx)
+    else:
+        score = _minimaxRecursion(board, 0, True, alpha, inf, aiChipNum, 3 - aiChipNum, ctx)
+    return score, ctx.nodes
+
+def iterativeDeepening(board: object, aiChipNum: int, timeLimit: float = None, *, maxNodes: int = None,
+                       maxDepth: int = None, table: TranspositionTable = None, ordering: MoveOrdering = None,
+                       engine: str = 'alphabeta', stopEvent = None, onProgress = None, book = None,
+                       endgameThreshold: int = None, stats: SearchStats = None, solver: EndgameSolver = None,
+                       weights: tuple[int, int] = None):
+    """Aprofundamento iterativo: busca com profundidade 0, 1, 2... até esgotar o orçamento de tempo ou de nós.
+    Cada iteração começa pela melhor jogada da anterior. Quando o orçamento se esgota no meio de uma iteração,
+    ela é descartada e é retornada a melhor jogada da última iteração completa (a primeira sempre é completada).
+
+    Parameters
+    ----------
+    board: object
+        Um objeto da classe Board ou BitBoard representando o estado inicial do tabuleiro.
+    aiChipNum: 1|2
+        Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
+    timeLimit: float, optional
+        Orçamento de tempo em milissegundos.
+    maxNodes: int, optional
+        Orçamento de nós visitados (somando todas as iterações).
+    maxDepth: int, optional
+        Profundidade máxima. Se não fornecida, aprofunda até preencher o tabuleiro.
+    table: TranspositionTable, optional
+        Tabela de transposição usada na busca.
+    ordering: MoveOrdering, optional
+        Ordenação de jogadas, compartilhada entre as iterações (inclusive na raiz).
+    engine: "alphabeta" | "pvs", default "alphabeta"
+        Motor de busca. No PVS, cada iteração usa uma janela de aspiração centrada na pontuação da anterior.
+    stopEvent: threading.Event | multiprocessing.Event, optional
+        Quando ativado (por outra thread ou processo), a busca para como se o orçamento tivesse se esgotado.
+    onProgress: callable, optional
+        Chamada com (profundidade da iteração atual, nós visitados) a cada 1024 nós e ao fim de cada iteração.
+    book: openingBook.OpeningBook | False, optional
+        Como em minimax(). Se a posição estiver no livro, a jogada dele é retornada sem busca (0 nós).
+    endgameThreshold: int, optional
+        Como em minimax(). O resolvedor usa no máximo metade de 'timeLimit' e para com 'stopEvent'; se não
+        terminar, a jogada é calculada pela busca limitada no tempo restante.
+    stats: SearchStats, optional
+        Como em minimax(). Cada iteração é registrada como uma fase em stats.phases.
+    solver, weights
+        Como em search().
+
+    Returns
+    -------
+    SearchResult
+        Coluna e pontuação da última iteração completa, a profundidade dela e o total de nós visitados.
+    """
+    start = time.perf_counter()
+    bookMove = _bookMove(board, aiChipNum, book)
+    if bookMove is not None:
+        if stats is not None:
+            _shortcutStats(stats, 'livro', start, bookMove)
+        return bookMove
+    solverDeadline = None if timeLimit is None else start + timeLimit / 2000
+    solved = _solveEndgame(board, aiChipNum, endgameThreshold, solver, weights, solverDeadline, stopEvent)
+    if solved is not None:
+        if stats is not None:
+            _shortcutStats(stats, 'resolvedor', start, solved)
+        return solved
+    board, table, ordering = _prepare(board, table, ordering, engine, stats = stats, weights = weights)
+    emptyCells = board.nRows * board.nCols - board.getTotalChips()
+    if maxDepth is None or maxDepth > emptyCells - 1:
+        maxDepth = max(emptyCells - 1, 0)
+
+    ctx = _SearchContext(table, 0, ordering = ordering, stopEvent = stopEvent, onProgress = onProgress,
+                         perspectiveKeys = _perspectiveKeys(board))
+    if engine == 'pvs':
+        column, score = _searchRootPVS(board, aiChipNum, ctx)
+    else:
+        column, score = _searchRoot(board, aiChipNum, ctx)
+    if stats is not None:
+        stats.addPhase('profundidade 0', start)
+    completed = 0
+    # A partir da segunda iteração os orçamentos passam a valer
+    ctx.deadline = None if timeLimit is None else start + timeLimit / 1000
+    ctx.maxNodes = maxNodes
+    rootMoves = len(board.moves)
+    for depth in range(1, maxDepth + 1):
+        ctx.maxDepth = depth
+        iterationStart = time.perf_counter()
+        try:
+            ctx.checkBudget()
+            if engine == 'pvs':
+                column, score = _searchRootPVS(board, aiChipNum, ctx, firstMove = column, guess = score)
+            else:
+                column, score = _searchRoot(board, aiChipNum, ctx, firstMove = column)
+        except SearchTimeout:
+            board.undoTo(rootMoves)
+            if stats is not None:
+                stats.addPhase(f'profundidade {depth} (interrompida)', iterationStart)
+            break
+        completed = depth
+        if stats is not None:
+            stats.addPhase(f'profundidade {depth}', iterationStart)
+        if onProgress is not None:
+            onProgress(depth, ctx.nodes)
+    if stats is not None:
+        _finishStats(stats, board, aiChipNum, table, engine, column, completed)
+    return SearchResult(column, score, completed, ctx.nodes)
+
+def _prepare(board, table, ordering, engine, newSearch = True, stats = None, weights = None):
+    """Copia/converte o tabuleiro para um BitBoard próprio da busca e obtém a tabela de transposição e a ordenação.
+    Com 'weights', a cópia avalia as posições com esses pesos.
+    Com 'stats', o tabuleiro e a ordenação retornados são as versões instrumentadas por SearchStats.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f'Motor de busca desconhecido: {engine}')
+    # Toda a árvore é percorrida sobre um único tabuleiro mutável (pushMove/popMove)
+    if isinstance(board, BitBoard):
+        board = board.copy()
+    else:
+        board = BitBoard.fromCells(board.cells)
+    if weights is not None:
+        board.almostWinScore, board.winScore = weights
+    if table is None:
+        table = getDefaultTable()
+    if newSearch:
+        table.newSearch()
+    if ordering is None:
+        ordering = MoveOrdering()
+    ordering.prepare(board)
+    if stats is not None:
+        board, ordering = stats.instrument(board, ordering, table)
+    return board, table, ordering
+
+def _shortcutStats(stats, phase, start, result):
+    """Registra em 'stats' uma jogada obtida sem busca (livro de aberturas ou resolvedor de finais)."""
+    stats.addPhase(phase, start)
+    stats.pv = [] if result.column is None else [result.column]
+
+def _finishStats(stats, board, aiChipNum, table, engine, column, depth):
+    """Encerra a coleta de 'stats' e reconstrói a variante principal seguindo as melhores jogadas da tabela."""
+    stats.finish()
+    pv = []
+    extraKey = _perspectiveKeys(board)[aiChipNum] ^ (_NEGAMAX_KEY if engine == 'pvs' else 0)
+    rootMoves = len(board.moves)
+    chipNum = aiChipNum
+    while column is not None and column != NO_MOVE and board.canPlay(column) and len(pv) <= depth:
+        board.pushMove(column, chipNum)
+        pv.append(column)
+        if board.isWinner(chipNum) or board.isFull():
+            break
+        entry = table.probe(board.key ^ extraKey)
+        column = NO_MOVE if entry is None else board.orientMove(entry[3])
+        chipNum = 3 - chipNum
+    board.undoTo(rootMoves)
+    stats.pv = pv
+
+def _symmetricRootMoves(board, moves):
+    """Em posições simétricas, as jogadas c e nCols - 1 - c levam a posições espelhadas de mesmo valor:
+    mantém só a da metade esquerda (e a central), na ordem recebida.
+    """
+    if not board.isSymmetric():
+        return moves
+    return [c for c in moves if c <= board.nCols - 1 - c]
+
+def _tacticalMoves(board, chipNum, moves):
+    """Filtra as jogadas de 'chipNum' antes de ramificar: havendo vitória imediata, só ela; senão, só as que não
+    perdem na resposta (o bloqueio de uma ameaça do adversário e nada logo abaixo de uma célula em que ele vence).
+    Se toda jogada perde, mantém todas. A ordem de 'moves' é preservada.
+    """
+    mask = board.winningMask(chipNum) & board.playableMask() or board.nonLosingMask(chipNum)
+    if not mask:
+        return moves
+    heights = board.heights
+    return [c for c in moves if mask >> heights[c] & 1]
+
+def _searchRoot(board: object, aiChipNum: int, ctx: _SearchContext, firstMove: int = None):
+    """Raiz da busca (jogador MAX). Retorna a melhor coluna e sua pontuação.
+
+    Parameters
+    ----------
+    firstMove: int, optional
+        Coluna a ser buscada primeiro (por exemplo, a melhor da iteração anterior). Se fornecida, as demais
+        seguem a ordenação da busca; se não, a raiz é buscada da esquerda para a direita.
+    """
     # Raíz sempre será o jogador MAX
     score = -inf
     alpha = -inf
@@ -31,13 +605,16 @@ def minimax(board: object, aiChipNum: int):
    
     # Empate -> Interrompe a busca
     if len(freeCols) == 0:
-        return board.getScore(True, draw = True)
+        return None, board.getScore(True, aiChipNum, draw = True)
 
+    if firstMove is not None:
+        freeCols = ctx.ordering.orderMoves(board, aiChipNum, 0, firstMove)
+    freeCols = _symmetricRootMoves(board, _tacticalMoves(board, aiChipNum, freeCols))
     bestPlay = random.choice(freeCols)
     for i in freeCols:
-        cells = board.simDropChip(i, aiChipNum)
-        newBoard = Board(cells)
-        newScore = _minimaxRecursion(newBoard, 0, True, alpha, beta, aiChipNum, otherChipNum)    # IA é o player 2
+        board.pushMove(i, aiChipNum)
+        newScore = _minimaxRecursion(board, 0, True, alpha, beta, aiChipNum, otherChipNum, ctx)    # IA é o player 2
+        board.popMove()
         # MAX
         if newScore > score:
             score = newScore
@@ -46,15 +623,17 @@ def minimax(board: object, aiChipNum: int):
         # Poda
         if beta < alpha:
             break
-    return bestPlay
+    return bestPlay, score
 
-def _minimaxRecursion(board: object, depth: int, isAIsTurn: bool, alpha: float, beta: float, aiChipNum: int, otherChipNum: int):
+def _minimaxRecursion(board: object, depth: int, isAIsTurn: bool, alpha: float, beta: float, aiChipNum: int, otherChipNum: int,
+                      ctx: _SearchContext):
     """Função recursiva para o cálculo da melhor jogada
     
     Parameters
     ----------
     board: object
-        Um objeto da classe Board representando o estado inicial do tabuleiro.
+        Um objeto da classe BitBoard representando o estado atual do tabuleiro.
+        As jogadas são feitas e desfeitas sobre ele, que retorna ao estado original ao fim da chamada.
     depth: int
         Profundidade atual da árvore.
     isAIsTurn: bool
@@ -68,42 +647,217 @@ def _minimaxRecursion(board: object, depth: int, isAIsTurn: bool, alpha: float,
         Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
     otherChipNum: 1|2
         Número da ficha do adversário da IA (1 se aiChipNum == 2, 2 se aiChipNum == 1).
+    ctx: _SearchContext
+        Estado da busca (tabela de transposição, profundidade máxima, orçamentos e contagem de nós).
     """
+    ctx.nodes += 1
+    if ctx.nodes >= ctx.nextCheck:
+        ctx.checkBudget()
+
     ## Condições de parada ##########################
     # Vitória de alguém -> Interrompe a busca
     if board.checkWinner():
         return board.getScore(isAIsTurn, aiChipNum, win = True)
 
-    freeCols = board.getFreeColumns()
     # Empate -> Interrompe a busca
-    if len(freeCols) == 0:
+    if board.isFull():
         return board.getScore(isAIsTurn, aiChipNum, draw = True)
+
+    # Posição já buscada com profundidade suficiente -> Usa o resultado da tabela
+    key = board.key ^ ctx.perspectiveKeys[aiChipNum]
+    table = ctx.table
+    remaining = ctx.maxDepth - depth
+    entry = table.probe(key)
+    ttMove = NO_MOVE
+    if entry is not None:
+        ttMove = board.orientMove(entry[3])     # A tabela guarda a jogada na orientação da chave canônica
+    if entry is not None and entry[1] >= remaining:
+        ttScore, _, ttFlag, _ = entry
+        if ttFlag == EXACT:
+            return ttScore
+        if ttFlag == LOWER:
+            alpha = max(alpha, ttScore)
+        else:
+            beta = min(beta, ttScore)
+        if beta < alpha:
+            return ttScore
+
     # Nível máximo de recursão atingido
-    if depth == MAX_DEPTH:
-        return board.getScore(isAIsTurn, aiChipNum)
+    if depth >= ctx.maxDepth:
+        score = board.getScore(isAIsTurn, aiChipNum)
+        table.store(key, score, 0, EXACT)
+        return score
     #################################################
+    alphaOrig, betaOrig = alpha, beta   # Janela efetivamente buscada (após os limites da tabela)
     isAIsTurn = not isAIsTurn   # Troca de jogador para simular a proxima jogada
     if isAIsTurn:   # MAX
         score = -inf
     else:           # MIN
         score = inf
-    for i in freeCols:
-        cells = board.simDropChip(i, aiChipNum if isAIsTurn else otherChipNum)
-        newBoard = Board(cells)
-        newScore = _minimaxRecursion(newBoard, depth + 1, isAIsTurn, alpha, beta, aiChipNum, otherChipNum)    # Alterna entre os jogadores red e yellow
+    chipNum = aiChipNum if isAIsTurn else otherChipNum
+    bestMove = NO_MOVE
+    ordering = ctx.ordering
+    # Jogadas forçadas (vencer ou bloquear) não ramificam; jogadas que entregam a vitória ao adversário são podadas
+    moves = _tacticalMoves(board, chipNum, ordering.orderMoves(board, chipNum, depth + 1, ttMove))
+    for n, i in enumerate(moves):
+        board.pushMove(i, chipNum)
+        newScore = _minimaxRecursion(board, depth + 1, isAIsTurn, alpha, beta, aiChipNum, otherChipNum, ctx)    # Alterna entre os jogadores red e yellow
+        board.popMove()
         
         # Jogador MAX
         if isAIsTurn: 
             if newScore > score:
                 score = newScore
+                bestMove = i
             alpha = max(alpha, score)
         # Jogador MIN
         else:
             if newScore < score:
                 score = newScore
+                bestMove = i
             beta = min(beta, score)
         # Poda
         if beta < alpha:
+            ordering.onCutoff(board, chipNum, depth + 1, i, n, remaining)
             break
 
+    if score <= alphaOrig:
+        flag = UPPER
+    elif score >= betaOrig:
+        flag = LOWER
+    else:
+        flag = EXACT
+    table.store(key, score, remaining, flag, board.orientMove(bestMove))
+    return score
+
+def _searchRootPVS(board: object, aiChipNum: int, ctx: _SearchContext, firstMove: int = None, guess: int = None):
+    """Raiz do motor negamax/PVS. Retorna a melhor coluna e sua pontuação (do ponto de vista da IA).
+
+    Parameters
+    ----------
+    firstMove: int, optional
+        Coluna a ser buscada primeiro (por exemplo, a melhor da iteração anterior).
+    guess: int, optional
+        Estimativa da pontuação (a da iteração anterior). Se fornecida, a busca começa com a janela de aspiração
+        [guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW] e só é refeita com a janela completa se falhar.
+    """
+    if board.isFull():
+        return None, board.getScore(True, aiChipNum, draw = True)
+    if guess is not None:
+        alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+        column, score = _pvsRootWindow(board, aiChipNum, ctx, firstMove, alpha, beta)
+        if alpha < score < beta:
+            return column, score
+        firstMove = column
+    return _pvsRootWindow(board, aiChipNum, ctx, firstMove, -inf, inf)
+
+def _pvsRootWindow(board, aiChipNum, ctx, firstMove, alpha, beta):
+    """Busca a raiz do PVS dentro da janela (alpha, beta)."""
+    moves = ctx.ordering.orderMoves(board, aiChipNum, 0, NO_MOVE if firstMove is None else firstMove)
+    moves = _symmetricRootMoves(board, _tacticalMoves(board, aiChipNum, moves))
+    score = -inf
+    bestPlay = moves[0]
+    for n, i in enumerate(moves):
+        board.pushMove(i, aiChipNum)
+        if n == 0:
+            newScore = -_negamaxRecursion(board, 0, -beta, -alpha, -1, aiChipNum, ctx)
+        else:
+            # Janela nula: só prova que a jogada não é melhor que a atual. Se for, refaz a busca com a janela completa
+            newScore = -_negamaxRecursion(board, 0, -alpha - 1, -alpha, -1, aiChipNum, ctx)
+            if alpha < newScore < beta:
+                newScore = -_negamaxRecursion(board, 0, -beta, -newScore, -1, aiChipNum, ctx)
+        board.popMove()
+        if newScore > score:
+            score = newScore
+            bestPlay = i
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    return bestPlay, score
+
+def _negamaxRecursion(board: object, depth: int, alpha: float, beta: float, color: int, aiChipNum: int, ctx: _SearchContext):
+    """Função recursiva do motor negamax com busca de variante principal (PVS).
+    Retorna a pontuação do ponto de vista do jogador que está na vez (pontuação da IA multiplicada por 'color').
+
+    Parameters
+    ----------
+    board: object
+        Um objeto da classe BitBoard representando o estado atual do tabuleiro.
+    depth: int
+        Profundidade atual da árvore (mesma convenção de _minimaxRecursion).
+    alpha: float
+        Valor de alfa da poda alfa-beta.
+    beta: float
+        Valor de beta da poda alfa-beta.
+    color: 1|-1
+        1 se for a vez da IA, -1 se for a vez do adversário.
+    aiChipNum: 1|2
+        Número da ficha da IA (1 -> vermelho, 2 -> amarelo).
+    ctx: _SearchContext
+        Estado da busca (tabela de transposição, profundidade máxima, orçamentos e contagem de nós).
+    """
+    ctx.nodes += 1
+    if ctx.nodes >= ctx.nextCheck:
+        ctx.checkBudget()
+
+    ## Condições de parada ##########################
+    # Quem fez a última jogada foi a IA se agora é a vez do adversário
+    if board.checkWinner():
+        return color * board.getScore(color == -1, aiChipNum, win = True)
+    if board.isFull():
+        return color * board.getScore(color == -1, aiChipNum, draw = True)
+
+    table = ctx.table
+    key = board.key ^ ctx.perspectiveKeys[aiChipNum] ^ _NEGAMAX_KEY
+    remaining = ctx.maxDepth - depth
+    entry = table.probe(key)
+    ttMove = NO_MOVE
+    if entry is not None:
+        ttMove = board.orientMove(entry[3])     # A tabela guarda a jogada na orientação da chave canônica
+        if entry[1] >= remaining:
+            ttScore, _, ttFlag, _ = entry
+            if ttFlag == EXACT:
+                return ttScore
+            if ttFlag == LOWER:
+                alpha = max(alpha, ttScore)
+            else:
+                beta = min(beta, ttScore)
+            if alpha >= beta:
+                return ttScore
+
+    if depth >= ctx.maxDepth:
+        score = color * board.getScore(color == -1, aiChipNum)
+        table.store(key, score, 0, EXACT)
+        return score
+    #################################################
+    alphaOrig = alpha   # Janela efetivamente buscada (após os limites da tabela)
+    chipNum = aiChipNum if color == 1 else 3 - aiChipNum
+    score = -inf
+    bestMove = NO_MOVE
+    ordering = ctx.ordering
+    moves = _tacticalMoves(board, chipNum, ordering.orderMoves(board, chipNum, depth + 1, ttMove))
+    for n, i in enumerate(moves):
+        board.pushMove(i, chipNum)
+        if n == 0:
+            newScore = -_negamaxRecursion(board, depth + 1, -beta, -alpha, -color, aiChipNum, ctx)
+        else:
+            newScore = -_negamaxRecursion(board, depth + 1, -alpha - 1, -alpha, -color, aiChipNum, ctx)
+            if alpha < newScore < beta:
+                newScore = -_negamaxRecursion(board, depth + 1, -beta, -newScore, -color, aiChipNum, ctx)
+        board.popMove()
+        if newScore > score:
+            score = newScore
+            bestMove = i
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            ordering.onCutoff(board, chipNum, depth + 1, i, n, remaining)
+            break
+
+    if score <= alphaOrig:
+        flag = UPPER
+    elif score >= beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    table.store(key, score, remaining, flag, board.orientMove(bestMove))
     return score
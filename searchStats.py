@@ -0,0 +1,108 @@
+import time
+from bitboard import BitBoard
+from transposition import NO_MOVE
+
+class SearchStats:
+    """Estatísticas de uma busca, preenchidas quando passadas no parâmetro 'stats' de playerAI.minimax, search ou
+    iterativeDeepening. Acumulam entre buscas até reset() ser chamado.
+
+    A coleta não custa nada às buscas sem estatísticas: em vez de testes espalhados pela recursão, a busca
+    instrumentada troca o tabuleiro e a ordenação de jogadas por versões que contam e cronometram as chamadas.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Zera todas as estatísticas."""
+        self.nodesPerDepth = [0]    # Nós visitados por nível (1 = filhos da raiz). A raiz não conta como nó
+        self.cutoffsPerPly = [0]    # Podas alfa/beta por nível
+        self.leafEvals = 0          # Avaliações heurísticas (checkAlmostWin) nas folhas
+        self.terminalEvals = 0      # Pontuações de vitória ou empate
+        self.winChecks = 0          # Chamadas de checkWinner
+        self.ttHits = 0             # Consultas à tabela de transposição que encontraram a posição
+        self.evalTime = 0.0         # Segundos gastos em getScore
+        self.moveGenTime = 0.0      # Segundos gastos gerando e ordenando jogadas
+        self.pv = []                # Variante principal (colunas) da última busca, lida da tabela de transposição
+        self.phases = []            # (fase, ms) de cada etapa das buscas, na ordem em que ocorreram
+        self._ttHitsStart = 0
+
+    @property
+    def nodes(self):
+        """Total de nós visitados."""
+        return sum(self.nodesPerDepth)
+
+    def toDict(self):
+        """Retorna as estatísticas em um dicionário serializável em JSON (tempos em ms)."""
+        return {
+            'nodes': self.nodes, 'nodesPerDepth': self.nodesPerDepth, 'cutoffsPerPly': self.cutoffsPerPly,
+            'leafEvals': self.leafEvals, 'terminalEvals': self.terminalEvals, 'winChecks': self.winChecks,
+            'ttHits': self.ttHits, 'evalMs': round(self.evalTime * 1000, 3),
+            'moveGenMs': round(self.moveGenTime * 1000, 3), 'pv': self.pv,
+            'phases': [[name, round(ms, 3)] for name, ms in self.phases],
+        }
+
+    def addPhase(self, name, start):
+        """Registra a fase 'name', iniciada no instante 'start' (time.perf_counter) e terminada agora."""
+        self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def _grow(self, counts, index):
+        while len(counts) <= index:
+            counts.append(0)
+
+    def instrument(self, board, ordering, table):
+        """Retorna o tabuleiro e a ordenação instrumentados usados pela busca (chamado por playerAI)."""
+        traced = object.__new__(_TracedBitBoard)
+        traced.__dict__.update(board.__dict__)
+        traced._stats = self
+        traced._rootMoves = len(board.moves)
+        self._table = table
+        self._ttHitsStart = table.hits
+        return traced, _TracedOrdering(ordering, self)
+
+    def finish(self):
+        """Encerra a coleta de uma busca (chamado por playerAI antes de ler a variante principal da tabela)."""
+        self.ttHits += self._table.hits - self._ttHitsStart
+        self._ttHitsStart = self._table.hits
+
+class _TracedBitBoard(BitBoard):
+    """BitBoard que registra em um SearchStats as chamadas feitas pela busca."""
+    def checkWinner(self):
+        stats = self._stats
+        stats.winChecks += 1
+        # A busca chama checkWinner exatamente uma vez por nó, logo ao entrar nele
+        ply = len(self.moves) - self._rootMoves
+        stats._grow(stats.nodesPerDepth, ply)
+        stats.nodesPerDepth[ply] += 1
+        return BitBoard.checkWinner(self)
+
+    def getScore(self, isAIsTurn, aiChipNum, *, draw = False, win = False):
+        stats = self._stats
+        if draw or win:
+            stats.terminalEvals += 1
+        else:
+            stats.leafEvals += 1
+        start = time.perf_counter()
+        score = BitBoard.getScore(self, isAIsTurn, aiChipNum, draw = draw, win = win)
+        stats.evalTime += time.perf_counter() - start
+        return score
+
+class _TracedOrdering:
+    """Envolve uma ordenação de jogadas, cronometrando orderMoves e contando as podas por nível."""
+    def __init__(self, ordering, stats):
+        self._ordering = ordering
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._ordering, name)
+
+    def orderMoves(self, board, chipNum, ply, ttMove = NO_MOVE):
+        start = time.perf_counter()
+        moves = self._ordering.orderMoves(board, chipNum, ply, ttMove)
+        self._stats.moveGenTime += time.perf_counter() - start
+        return moves
+
+    def onCutoff(self, board, chipNum, ply, column, moveIndex, remaining):
+        stats = self._stats
+        stats._grow(stats.cutoffsPerPly, ply)
+        stats.cutoffsPerPly[ply] += 1
+        self._ordering.onCutoff(board, chipNum, ply, column, moveIndex, remaining)
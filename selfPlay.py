@@ -0,0 +1,176 @@
+import os, sys, json, time, random, argparse
+from concurrent.futures import ProcessPoolExecutor
+import playerAI
+from bitboard import BitBoard
+from gameRecord import GameWriter
+from engineConfig import Engine, getConfig, presetHelp, DEFAULT_PRESET
+
+_engines = {}   # (configuração, cópia) -> Engine, reaproveitada (com tabelas e processos) entre partidas do mesmo processo
+
+def _toConfig(settings):
+    """Aceita uma EngineConfig, o nome de um perfil (ver engineConfig.getConfig) ou um dicionário de ajustes
+    sobre o perfil padrão (ex.: {'depth': 6, 'engine': 'pvs'})."""
+    if isinstance(settings, dict):
+        return getConfig(DEFAULT_PRESET)._replace(**settings).validate()
+    return getConfig(settings)
+
+def _getEngine(config, copy = 0):
+    """IA da configuração 'config', pronta para uma nova partida. As IAs são guardadas pela configuração (e não
+    pela cor), pois as cores se alternam entre as partidas; 'copy' separa os dois lados quando usam a mesma.
+    """
+    engine = _engines.get((config, copy))
+    if engine is None:
+        engine = _engines[(config, copy)] = Engine(config)
+    engine.newGame()
+    return engine
+
+def playGame(settings1, settings2, *, seed = None, randomOpening = 2, nRows = 6, nCols = 7):
+    """Joga uma partida entre duas configurações de IA, sem interface gráfica.
+
+    Parameters
+    ----------
+    settings1: EngineConfig | str | dict
+        Configuração do jogador 1 (vermelho): EngineConfig, nome de perfil ou dicionário com campos de EngineConfig
+        (depth, timeLimit em ms, engine, ttBytes...) que alteram o perfil padrão.
+    settings2: EngineConfig | str | dict
+        Configuração do jogador 2 (amarelo).
+    seed: int, optional
+        Semente das jogadas aleatórias de abertura.
+    randomOpening: int, default 2
+        Quantidade de jogadas aleatórias no início (como em Game.startAuto, uma para cada IA).
+    nRows: int, default 6
+        Número de linhas do tabuleiro.
+    nCols: int, default 7
+        Número de colunas do tabuleiro.
+
+    Returns
+    -------
+    dict
+        winner (1, 2 ou 0 para empate), moves (lista de colunas a partir de 0, como em BitBoard.moves, o que vale
+        para qualquer número de colunas), nRows e nCols (dimensões do tabuleiro, lidas por gameRecord.convertJsonl)
+        e por jogador (índices 1 e 2) o tempo de cada jogada em ms e os nós visitados.
+    """
+    rng = random.Random(seed)
+    config1, config2 = _toConfig(settings1), _toConfig(settings2)
+    engines = [None, _getEngine(config1), _getEngine(config2, int(config1 == config2))]
+    board = BitBoard(nRows, nCols)
+    times = [None, [], []]
+    nodes = [None, 0, 0]
+    player = 1
+    winner = 0
+    while not board.isFull():
+        if len(board.moves) < randomOpening:
+            column = rng.choice(board.getFreeColumns())
+        else:
+            start = time.perf_counter()
+            result = engines[player].search(board, player)
+            times[player].append(round((time.perf_counter() - start) * 1000, 2))
+            nodes[player] += result.nodes
+            column = result.column
+        board.pushMove(column, player)
+        if board.isWinner(player):
+            winner = player
+            break
+        player = 3 - player
+    return {'winner': winner, 'moves': list(board.moves), 'nRows': nRows, 'nCols': nCols, 'times': times[1:], 'nodes': nodes[1:]}
+
+def _playMatchGame(args):
+    """Tarefa do pool: joga a partida 'index', alternando quem começa entre as configurações A e B."""
+    index, settingsA, settingsB, seed, randomOpening, nRows, nCols = args
+    aIsRed = index % 2 == 0
+    red, yellow = (settingsA, settingsB) if aIsRed else (settingsB, settingsA)
+    game = playGame(red, yellow, seed = seed + index, randomOpening = randomOpening, nRows = nRows, nCols = nCols)
+    if game['winner'] == 0:
+        result = 'draw'
+    else:
+        result = 'A' if (game['winner'] == 1) == aIsRed else 'B'
+    return {'game': index, 'red': 'A' if aIsRed else 'B', 'result': result, **game}
+
+def runMatch(settingsA, settingsB, games, *, workers = None, output = None, seed = 0, randomOpening = 2, nRows = 6,
+             nCols = 7, records = None):
+    """Joga 'games' partidas entre as configurações A e B em paralelo, alternando as cores.
+
+    Parameters
+    ----------
+    settingsA: EngineConfig | str | dict
+        Configuração da IA A (ver playGame).
+    settingsB: EngineConfig | str | dict
+        Configuração da IA B.
+    games: int
+        Número de partidas.
+    workers: int, optional
+        Número de processos. Se não fornecido, usa os.cpu_count().
+    output: str, optional
+        Arquivo onde cada partida é gravada como uma linha JSON, à medida que terminam.
+    seed: int, default 0
+        Semente base das aberturas aleatórias (a partida i usa seed + i), o que torna o torneio reproduzível.
+    randomOpening: int, default 2
+        Quantidade de jogadas aleatórias no início de cada partida.
+    nRows: int, default 6
+        Número de linhas do tabuleiro.
+    nCols: int, default 7
+        Número de colunas do tabuleiro.
+    records: str, optional
+        Arquivo onde as partidas são acrescentadas no formato compacto de gameRecord, à medida que terminam.
+
+    Returns
+    -------
+    dict[str, int]
+        Vitórias de A, vitórias de B e empates.
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = {'A': 0, 'B': 0, 'draw': 0}
+    tasks = ((i, settingsA, settingsB, seed, randomOpening, nRows, nCols) for i in range(games))
+    file = open(output, 'w', encoding = 'utf-8') if output else None
+    writer = GameWriter(records) if records else None
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            for record in pool.map(_playMatchGame, tasks, chunksize = max(1, games // (workers * 8))):
+                summary[record['result']] += 1
+                if file:
+                    file.write(json.dumps(record, separators = (',', ':')) + '\n')
+                if writer:
+                    writer.write(record['moves'], record['winner'], nRows, nCols)
+    finally:
+        if file:
+            file.close()
+        if writer:
+            writer.close()
+    return summary
+
+def _parseArgs(argv):
+    parser = argparse.ArgumentParser(description = 'Torneio de IA contra IA sem interface gráfica.')
+    parser.add_argument('-games', type = int, default = 100, help = 'número de partidas')
+    parser.add_argument('-workers', type = int, default = None, help = 'número de processos')
+    parser.add_argument('-out', default = 'selfplay.jsonl', help = 'arquivo de resultados (uma partida JSON por linha)')
+    parser.add_argument('-records', default = None, help = 'arquivo de partidas no formato compacto (gameRecord)')
+    parser.add_argument('-seed', type = int, default = 0, help = 'semente das aberturas aleatórias')
+    parser.add_argument('-opening', type = int, default = 2, help = 'jogadas aleatórias no início de cada partida')
+    parser.add_argument('-rows', type = int, default = 6, help = 'número de linhas do tabuleiro')
+    parser.add_argument('-cols', type = int, default = 7, help = 'número de colunas do tabuleiro')
+    for side in ('A', 'B'):
+        parser.add_argument(f'-preset{side}', default = DEFAULT_PRESET,
+                            help = f'perfil da IA {side}, com ajustes opcionais ("strong,ttBytes=8388608"). {presetHelp()}')
+        parser.add_argument(f'-depth{side}', type = int, default = None, help = f'profundidade da IA {side} (altera o perfil)')
+        parser.add_argument(f'-time{side}', type = int, default = None, help = f'orçamento de tempo (ms) da IA {side} (altera o perfil)')
+        parser.add_argument(f'-engine{side}', choices = playerAI.ENGINES, default = None, help = f'motor da IA {side} (altera o perfil)')
+    return parser.parse_args(argv)
+
+def _sideConfig(args, side):
+    """Perfil escolhido para o lado 'side', com os ajustes das opções -depth, -time e -engine dele."""
+    config = getConfig(getattr(args, f'preset{side}'))
+    changes = {field: getattr(args, f'{option}{side}') for field, option in
+               (('depth', 'depth'), ('timeLimit', 'time'), ('engine', 'engine'))}
+    return config._replace(**{field: value for field, value in changes.items() if value is not None}).validate()
+
+if __name__ == '__main__':
+    args = _parseArgs(sys.argv[1:])
+    try:
+        settings = {side: _sideConfig(args, side) for side in ('A', 'B')}
+    except ValueError as error:
+        sys.exit(f'Erro: {error}')
+    start = time.perf_counter()
+    summary = runMatch(settings['A'], settings['B'], args.games, workers = args.workers, output = args.out,
+                       seed = args.seed, randomOpening = args.opening, nRows = args.rows, nCols = args.cols,
+                       records = args.records)
+    print(f'A: {summary["A"]}  B: {summary["B"]}  Empates: {summary["draw"]}  ({time.perf_counter() - start:.1f} s)')
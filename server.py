@@ -0,0 +1,312 @@
+import os, sys, json, time, zlib, asyncio, argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import playerAI
+from playerAI import MoveOrdering
+from bitboard import BitBoard, Position
+from transposition import TranspositionTable
+from engineConfig import getConfig, presetHelp, DEFAULT_PRESET
+
+DEFAULT_PORT = 7474
+DEFAULT_DEADLINE = 5000     # Prazo padrão de cada pedido (ms), contando o tempo na fila
+MAX_PENDING = 64            # Pedidos aceitos ao mesmo tempo. Acima disso o servidor responde "ocupado"
+SESSION_TT_BYTES = 4 * 2**20    # Tabela de transposição de cada sessão
+MAX_SESSIONS = 32           # Sessões mantidas por processo (as usadas há mais tempo são descartadas)
+_GRACE = 0.5                # Folga (s) além do prazo para a resposta do processo chegar
+MAX_BOARD_SIDE = 16         # Máximo de linhas e de colunas do tabuleiro de um pedido
+
+_worker = {'sessions': OrderedDict()}   # Sessão -> (tabela de transposição, ordenação, pesos), em cada processo
+
+def _sessionState(session, weights):
+    """Tabela e ordenação da sessão, criadas no primeiro pedido dela e mantidas entre as jogadas da partida.
+    Se a sessão passar a usar outros pesos de avaliação, a tabela é refeita (as pontuações dela não valem mais).
+    """
+    sessions = _worker['sessions']
+    state = sessions.get(session)
+    if state is None or state[2] != weights:
+        if state is None and len(sessions) >= MAX_SESSIONS:
+            sessions.popitem(last = False)
+        state = sessions[session] = (TranspositionTable(SESSION_TT_BYTES), MoveOrdering(), weights)
+    sessions.move_to_end(session)
+    return state
+
+def _closeSession(session):
+    _worker['sessions'].pop(session, None)
+
+def _toBoard(moves, nRows, nCols):
+    """Posição de um pedido: colunas a partir de 1 em uma string ("4453"), lista de colunas a partir de 0 ou
+    o inteiro de Position.pack().
+    """
+    if isinstance(moves, int):
+        return Position.fromPacked(moves, nRows, nCols).toBitBoard()
+    if isinstance(moves, str):
+        return BitBoard.fromMoves(moves, nRows, nCols)
+    board = BitBoard(nRows, nCols)
+    for column in moves:
+        if not isinstance(column, int) or not 0 <= column < nCols or board.pushMove(column, board.nextPlayer()) is None:
+            raise ValueError(f'Jogada inválida: {column}')
+    return board
+
+def _isInt(value, low, high):
+    return isinstance(value, int) and not isinstance(value, bool) and low <= value <= high
+
+def _searchTask(moves, nRows, nCols, session, config, depth, timeLimit, engine, deadlineAt):
+    """Tarefa de um processo: busca a jogada de quem está na vez. Retorna None se o prazo venceu na fila.
+    A profundidade, o tempo e o motor não informados no pedido vêm de 'config' (EngineConfig), assim como os
+    pesos da avaliação e o limite do resolvedor. As tabelas são as da sessão (SESSION_TT_BYTES).
+    """
+    remaining = (deadlineAt - time.time()) * 1000
+    if remaining <= 0:
+        return None
+    board = _toBoard(moves, nRows, nCols)
+    if board.checkWinner() or board.isFull():
+        raise ValueError('A partida já terminou nessa posição')
+    table, ordering, _ = _sessionState(session, config.weights) if session is not None else (None, None, None)
+    if depth is None:
+        depth = config.depth
+    if timeLimit is None:
+        timeLimit = config.timeLimit
+    # O prazo também limita as buscas por profundidade: a resposta é a da última iteração completa
+    timeLimit = remaining if timeLimit is None else min(timeLimit, remaining)
+    result = playerAI.iterativeDeepening(board, board.nextPlayer(), timeLimit, maxDepth = depth, table = table,
+                                         ordering = ordering, engine = engine or config.engine,
+                                         endgameThreshold = config.endgameThreshold, weights = config.weights)
+    return tuple(result)
+
+class GameServer:
+    """Servidor de jogadas da IA para vários clientes ao mesmo tempo, com um pedido JSON por linha.
+
+    Pedido: {"id": ..., "moves": "4453", [3, 3, 4, 2] ou Position.pack(), "rows": 6, "cols": 7, "session": "...",
+    "preset": "blitz", "depth": 6, "timeLimit": 500, "engine": "pvs", "deadline": 2000}. Só "moves" é obrigatório;
+    timeLimit e deadline são em ms; rows e cols vão de 4 a MAX_BOARD_SIDE. "preset" escolhe um perfil de engineConfig (com ajustes, como em getConfig);
+    depth, timeLimit e engine, se informados, substituem os do perfil.
+    Resposta: {"id": ..., "column": 3, "score": ..., "depth": ..., "nodes": ..., "ms": ...} com a coluna a partir
+    de 0, ou {"id": ..., "error": "..."}. Também são aceitos {"op": "close", "session": ...} (descarta o estado
+    da sessão) e {"op": "ping"}. Os pedidos de uma conexão são atendidos em paralelo; o "id" liga cada resposta
+    ao seu pedido.
+
+    As buscas rodam em processos, um executor por processo: os pedidos de uma sessão sempre vão para o mesmo
+    processo, onde a tabela de transposição e a ordenação de jogadas da partida continuam aquecidas entre as
+    jogadas. Pedidos sem sessão vão para o processo com menos pedidos pendentes.
+    """
+    def __init__(self, *, workers = None, maxPending = MAX_PENDING, deadline = DEFAULT_DEADLINE, preset = DEFAULT_PRESET):
+        """
+        Parameters
+        ----------
+        workers: int, optional
+            Número de processos. Se não fornecido, usa os.cpu_count().
+        maxPending: int, default MAX_PENDING
+            Máximo de pedidos em andamento (na fila ou sendo calculados) somando todos os clientes.
+        deadline: float, default DEFAULT_DEADLINE
+            Prazo (ms) dos pedidos que não informam o seu.
+        preset: str | engineConfig.EngineConfig, default DEFAULT_PRESET
+            Perfil dos pedidos que não informam o seu.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.maxPending = maxPending
+        self.deadline = deadline
+        self.config = getConfig(preset)
+        self.pending = 0
+        self._executors = []
+        self._load = []         # Pedidos pendentes em cada processo
+        self._server = None
+        self._connections = {}  # Tarefa que atende cada conexão -> writer da conexão
+
+    async def start(self, host = '127.0.0.1', port = DEFAULT_PORT, *, path = None):
+        """Cria os processos e começa a aceitar conexões TCP em (host, port), ou no socket Unix 'path' se fornecido."""
+        self._executors = [ProcessPoolExecutor(1) for _ in range(self.workers)]
+        self._load = [0] * self.workers
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    @property
+    def address(self):
+        """Endereço em que o servidor escuta (útil com port = 0, quando o sistema escolhe a porta)."""
+        return self._server.sockets[0].getsockname()
+
+    async def serveForever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Para de aceitar conexões, fecha as abertas e encerra os processos."""
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close()
+            if self._connections:
+                await asyncio.wait(list(self._connections))
+            await self._server.wait_closed()
+            self._server = None
+        for executor in self._executors:
+            # As buscas em andamento terminam no prazo delas; a espera não bloqueia o laço de eventos
+            await asyncio.to_thread(executor.shutdown, wait = True, cancel_futures = True)
+        self._executors = []
+
+    def _release(self, slot):
+        self.pending -= 1
+        self._load[slot] -= 1
+
+    def _failure(self, slot, executor, error):
+        """Resposta de uma busca que falhou. Se o processo morreu, o executor dele é recriado (as sessões dele se perdem)."""
+        if isinstance(error, BrokenProcessPool) and self._executors[slot] is executor:
+            self._executors[slot] = ProcessPoolExecutor(1)
+            executor.shutdown(wait = False)
+        return {'error': f'falha na busca: {type(error).__name__}: {error}'}
+
+    def _slot(self, session):
+        if session is None:
+            return min(range(self.workers), key = self._load.__getitem__)
+        return zlib.crc32(str(session).encode()) % self.workers
+
+    async def _handle(self, reader, writer):
+        tasks = set()
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            del self._connections[asyncio.current_task()]
+
+    async def _respond(self, line, writer):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('o pedido deve ser um objeto JSON')
+        except ValueError as error:
+            response = {'error': f'pedido inválido: {error}'}
+        else:
+            response = {'id': request.get('id'), **await self._process(request)}
+        if not writer.is_closing():
+            writer.write(json.dumps(response, separators = (',', ':')).encode() + b'\n')
+            await writer.drain()
+
+    async def _process(self, request):
+        """Atende um pedido já decodificado e retorna os campos da resposta (sem o id)."""
+        start = time.perf_counter()
+        op = request.get('op', 'move')
+        if op == 'ping':
+            return {'pending': self.pending}
+        session = request.get('session')
+        if op == 'close':
+            if session is not None:
+                slot = self._slot(session)
+                executor = self._executors[slot]
+                try:
+                    await asyncio.wrap_future(executor.submit(_closeSession, session))
+                except Exception as error:
+                    return self._failure(slot, executor, error)
+            return {}
+        if op != 'move':
+            return {'error': f'operação desconhecida: {op}'}
+        if 'moves' not in request:
+            return {'error': 'falta o campo "moves"'}
+        engine = request.get('engine')
+        if engine is not None and engine not in playerAI.ENGINES:
+            return {'error': f'motor de busca desconhecido: {engine}'}
+        try:
+            config = self.config if 'preset' not in request else getConfig(str(request['preset']))
+        except ValueError as error:
+            return {'error': str(error)}
+        if self.pending >= self.maxPending:
+            return {'error': 'servidor ocupado'}
+        deadline = request.get('deadline', self.deadline)
+        if not isinstance(deadline, (int, float)) or deadline <= 0:
+            return {'error': 'prazo inválido'}
+        deadline /= 1000
+        nRows, nCols = request.get('rows', 6), request.get('cols', 7)
+        if not _isInt(nRows, 4, MAX_BOARD_SIDE) or not _isInt(nCols, 4, MAX_BOARD_SIDE):
+            return {'error': f'dimensões inválidas (de 4 a {MAX_BOARD_SIDE} linhas e colunas)'}
+        depth, timeLimit = request.get('depth'), request.get('timeLimit')
+        if depth is not None and not _isInt(depth, 0, nRows * nCols):
+            return {'error': 'profundidade inválida'}
+        if timeLimit is not None and (not isinstance(timeLimit, (int, float)) or isinstance(timeLimit, bool)
+                                      or timeLimit <= 0):
+            return {'error': 'orçamento de tempo inválido'}
+        slot = self._slot(session)
+        self.pending += 1
+        self._load[slot] += 1
+        loop = asyncio.get_running_loop()
+        executor = self._executors[slot]
+        try:
+            future = executor.submit(
+                _searchTask, request['moves'], nRows, nCols, session, config, depth, timeLimit, engine,
+                time.time() + deadline)
+        except Exception as error:     # Processo encerrado ou executor quebrado (BrokenProcessPool)
+            self._release(slot)
+            return self._failure(slot, executor, error)
+        # O pedido só libera a vaga quando o processo termina a tarefa, mesmo que a resposta já tenha saído por
+        # prazo esgotado: assim maxPending e _slot refletem o trabalho que os processos ainda estão fazendo
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, slot))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), deadline + _GRACE)
+        except asyncio.TimeoutError:
+            return {'error': 'prazo esgotado'}
+        except (ValueError, TypeError) as error:
+            return {'error': str(error)}
+        except Exception as error:     # Falha do processo (BrokenProcessPool, MemoryError...): o cliente ainda recebe resposta
+            return self._failure(slot, executor, error)
+        if result is None:
+            return {'error': 'prazo esgotado'}
+        column, score, depth, nodes = result
+        return {'column': column, 'score': score, 'depth': depth, 'nodes': nodes,
+                'ms': round((time.perf_counter() - start) * 1000, 2)}
+
+class Client:
+    """Cliente mínimo do GameServer, que envia um pedido por vez e espera a resposta."""
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host = '127.0.0.1', port = DEFAULT_PORT, *, path = None):
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, **fields):
+        """Envia um pedido (os campos descritos em GameServer) e retorna a resposta decodificada."""
+        self._writer.write(json.dumps(fields).encode() + b'\n')
+        await self._writer.drain()
+        return json.loads(await self._reader.readline())
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+async def _main(args):
+    server = GameServer(workers = args.workers, maxPending = args.pending, deadline = args.deadline, preset = args.preset)
+    await server.start(args.host, args.port, path = args.unix)
+    print(f'Servindo em {args.unix or server.address}')
+    try:
+        await server.serveForever()
+    finally:
+        await server.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Servidor de jogadas da IA (um pedido JSON por linha).')
+    parser.add_argument('-host', default = '127.0.0.1', help = 'endereço TCP')
+    parser.add_argument('-port', type = int, default = DEFAULT_PORT, help = 'porta TCP')
+    parser.add_argument('-unix', default = None, help = 'caminho de um socket Unix (no lugar de TCP)')
+    parser.add_argument('-workers', type = int, default = None, help = 'número de processos')
+    parser.add_argument('-pending', type = int, default = MAX_PENDING, help = 'máximo de pedidos em andamento')
+    parser.add_argument('-deadline', type = float, default = DEFAULT_DEADLINE, help = 'prazo padrão dos pedidos (ms)')
+    parser.add_argument('-preset', default = DEFAULT_PRESET, help = f'perfil padrão dos pedidos. {presetHelp()}')
+    args = parser.parse_args(sys.argv[1:])
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
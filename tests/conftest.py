@@ -0,0 +1,42 @@
+import os, sys, random
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitboard import BitBoard
+
+def playRandom(rng, nMoves, nRows = 6, nCols = 7):
+    """Joga até 'nMoves' jogadas aleatórias, parando antes de uma vitória ou do tabuleiro cheio."""
+    board = BitBoard(nRows, nCols)
+    for _ in range(nMoves):
+        free = board.getFreeColumns()
+        if not free:
+            break
+        column = rng.choice(free)
+        player = board.nextPlayer()
+        board.pushMove(column, player)
+        if board.isWinner(player) or board.isFull():
+            board.popMove()
+            break
+    return board
+
+@pytest.fixture
+def randomBoards():
+    """Gera 'count' posições aleatórias (reproduzíveis) sem vencedor: randomBoards(count, minMoves, maxMoves, ...)."""
+    def generate(count, minMoves = 0, maxMoves = 30, nRows = 6, nCols = 7, seed = 0):
+        rng = random.Random(seed)
+        return [playRandom(rng, rng.randint(minMoves, maxMoves), nRows, nCols) for _ in range(count)]
+    return generate
+
+@pytest.fixture
+def gamePositions():
+    """Posições sucessivas de uma partida aleatória (como as buscas de uma partida de verdade): gamePositions(seed)."""
+    def generate(seed = 0, nRows = 6, nCols = 7):
+        final = playRandom(random.Random(seed), nRows * nCols, nRows, nCols)
+        positions = []
+        board = BitBoard(nRows, nCols)
+        for column in final.moves:
+            positions.append(board.copy())
+            board.pushMove(column, board.nextPlayer())
+        return positions
+    return generate
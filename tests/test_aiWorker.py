@@ -0,0 +1,78 @@
+import time
+import playerAI
+from bitboard import BitBoard
+from transposition import TranspositionTable
+from aiWorker import AIWorker
+
+def _wait(worker, timeout = 30):
+    """Espera a busca terminar, como o laço de eventos da interface (chamando poll() até ter a coluna)."""
+    deadline = time.monotonic() + timeout
+    while (column := worker.poll()) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    return column
+
+def test_searchInBackground():
+    worker = AIWorker(maxDepth = 3, engine = 'pvs', book = False, endgameThreshold = 0)
+    try:
+        board = BitBoard.fromMoves('4453')
+        future = worker.start(board, 1)
+        board.pushMove(0, 1)        # O worker busca sobre uma cópia
+        column = _wait(worker)
+        assert not worker.thinking and worker.poll() is None
+        expected = playerAI.search(BitBoard.fromMoves('4453'), 1, 3, TranspositionTable(2**18), engine = 'pvs',
+                                   endgameThreshold = 0)
+        assert column == future.result().column and future.result().score == expected.score
+        assert worker.progress[0] == 3
+    finally:
+        worker.shutdown()
+
+def test_cancel():
+    worker = AIWorker(maxDepth = 40, book = False, endgameThreshold = 0)
+    try:
+        future = worker.start(BitBoard(), 1)
+        assert worker.thinking
+        time.sleep(0.05)
+        worker.cancel()
+        assert not worker.thinking and worker.poll() is None
+        assert future.result(timeout = 10).depth < 40     # A busca interrompida termina logo
+        worker.searchOptions['maxDepth'] = 2
+        board = BitBoard.fromMoves('44')
+        worker.start(board, 1)
+        assert board.canPlay(_wait(worker))
+    finally:
+        worker.shutdown()
+
+def test_ponderHit():
+    """Depois de pensar na vez do adversário, a resposta a uma jogada analisada sai sem nova busca."""
+    worker = AIWorker('easy')
+    try:
+        board = BitBoard.fromMoves('445')   # Vez do jogador 2; a IA é o jogador 1
+        worker.ponder(board, 1)
+        worker._ponderFuture.result(timeout = 30)   # Espera analisar todas as respostas
+        board.pushMove(0, 2)    # Jogada pouco provável, mas analisada (todas as colunas são)
+        future = worker.start(board, 1)
+        assert future.done() and worker.ponderHits == 1
+        column = _wait(worker)
+        expected = worker.engine.search(board, 1)
+        assert board.canPlay(column) and future.result().score == expected.score
+        # Sem ponder, a próxima jogada é uma busca normal
+        board.pushMove(column, 1)
+        board.pushMove(3, 2)
+        worker.start(board, 1)
+        assert board.canPlay(_wait(worker)) and worker.ponderHits == 1
+    finally:
+        worker.shutdown()
+
+def test_stopPonderingIsQuick(gamePositions):
+    """Interromper o ponder não espera uma resolução de final inteira (todas as buscas dele recebem o evento)."""
+    worker = AIWorker('default,endgameThreshold=36,depth=8')
+    try:
+        board = gamePositions(seed = 11)[8]      # Grande demais para o resolvedor terminar logo
+        worker.ponder(board, 3 - board.nextPlayer())
+        time.sleep(0.2)
+        start = time.perf_counter()
+        worker.cancel()
+        assert time.perf_counter() - start < 0.5
+    finally:
+        worker.shutdown()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from bitboard import BitBoard
+from board import Board
+from transposition import TranspositionTable
+from batchAnalysis import analyzeBatch, analyzePosition, toBitBoard
+
+def _referenceScores(boards):
+    return [analyzePosition(board, depth = 3, table = TranspositionTable(2**18)).score for board in boards]
+
+def test_positionFormats():
+    board = BitBoard.fromMoves('4453')
+    cells = np.array(board.toCells(), dtype = np.int8)
+    for position in ('4453', board, board.toPosition(), Board(cells.copy()), cells, cells.tolist()):
+        converted = toBitBoard(position)
+        assert (converted.masks[1], converted.masks[2]) == (board.masks[1], board.masks[2])
+
+def test_finishedPosition():
+    assert analyzePosition('1212121').column is None
+    assert analyzePosition(BitBoard.fromMoves('11223344', 2, 4)).column is None
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batchMatchesSinglePositions(gamePositions, workers):
+    """Os resultados saem na ordem de entrada e têm as pontuações da análise de cada posição isolada (com a
+    ordenação aquecida, a escolha entre jogadas empatadas pode mudar). As posições são as de uma partida, em ordem (cada processo mantém a sua tabela entre as posições).
+    """
+    boards = gamePositions(seed = 2)
+    positions = [''.join(str(c + 1) for c in board.moves) if i % 3 == 0 else
+                 np.array(board.toCells(), dtype = np.int8) if i % 3 == 1 else board for i, board in enumerate(boards)]
+    results = list(analyzeBatch(iter(positions), depth = 3, workers = workers, chunkSize = 4, ttBytes = 2**18))
+    assert [result.score for result in results] == _referenceScores(boards)
+    assert all(board.canPlay(result.column) for board, result in zip(boards, results))
+
+def test_persistentCache(gamePositions, tmp_path):
+    boards = gamePositions(seed = 3)[:10]
+    path = tmp_path / 'cache.tt'
+    first = list(analyzeBatch(boards, depth = 3, workers = 1, ttBytes = 2**18, cachePath = path))
+    again = list(analyzeBatch(boards, depth = 3, workers = 2, chunkSize = 3, ttBytes = 2**18, cachePath = path))
+    assert [r.column for r in first] == [r.column for r in again]
+    assert [r.score for r in first] == [r.score for r in again]
+    assert sum(r.nodes for r in again) < sum(r.nodes for r in first)
@@ -0,0 +1,20 @@
+import time
+import benchmark, playerAI
+
+def test_warmupExcludedFromLatencies(monkeypatch):
+    """Só a primeira busca de cada posição é lenta: com uma execução de aquecimento, ela não entra nas latências."""
+    searched = set()
+
+    def search(board, aiChipNum, depth, table, **kwargs):
+        if (board.key, depth) not in searched:
+            searched.add((board.key, depth))
+            time.sleep(0.05)
+        return playerAI.SearchResult(3, 0, depth, 1)
+
+    monkeypatch.setattr(benchmark, 'CORPUS', {'opening': ['', '4']})
+    monkeypatch.setattr(playerAI, 'search', search)
+    stats = benchmark.benchmarkSearch((1,), repeat = 3)['depths']['1']
+    assert stats['p99'] < 25
+    searched.clear()
+    stats = benchmark.benchmarkSearch((1,), repeat = 3, warmup = 0)['depths']['1']
+    assert stats['p99'] >= 50 and stats['p50'] < 25
@@ -0,0 +1,72 @@
+import random
+import numpy as np
+import pytest
+from bitboard import BitBoard
+from board import Board
+
+SIZES = [(6, 7), (4, 4), (5, 6), (7, 9), (6, 12)]
+
+def _reference(board):
+    return Board(np.array(board.toCells(), dtype = np.int8))
+
+@pytest.mark.parametrize('nRows, nCols', SIZES)
+def test_matchesScalarBoard(nRows, nCols):
+    """BitBoard e a implementação escalar de Board concordam em vencedor, avaliação e colunas livres."""
+    rng = random.Random(nRows * 100 + nCols)
+    for _ in range(60):
+        board = BitBoard(nRows, nCols)
+        player = 1
+        while not board.isFull():
+            reference = _reference(board)
+            assert bool(board.checkWinner()) == reference._checkWinnerReference()
+            for chip in (1, 2):
+                assert board.checkAlmostWin(chip) == reference._checkAlmostWinReference(chip)
+            assert board.getFreeColumns() == reference.getFreeColumns()
+            assert board.getTotalChips() == reference.getTotalChips()
+            if board.checkWinner():
+                break
+            board.pushMove(rng.choice(board.getFreeColumns()), player)
+            player = 3 - player
+
+def test_popMoveRestoresState(randomBoards):
+    """pushMove seguido de popMove devolve chaves, máscaras e contagens incrementais ao estado anterior."""
+    for board in randomBoards(200, 0, 35):
+        before = (board.key, board.masks[:], board.heights[:], board.threes[:],
+                  [counts[:] for counts in board.windowCounts[1:]])
+        for column in board.getFreeColumns():
+            board.pushMove(column, board.nextPlayer())
+            board.popMove()
+            assert (board.key, board.masks, board.heights, board.threes,
+                    [counts[:] for counts in board.windowCounts[1:]]) == before
+
+def test_fromCellsMatchesMoves(randomBoards):
+    for board in randomBoards(200, 0, 40):
+        rebuilt = BitBoard.fromCells(board.toCells())
+        assert (rebuilt.key, rebuilt.masks, rebuilt.threes) == (board.key, board.masks, board.threes)
+
+def test_fromMovesFormats():
+    assert BitBoard.fromMoves('4453').moves == BitBoard.fromMoves([3, 3, 4, 2]).moves == [3, 3, 4, 2]
+    assert BitBoard.fromMoves(range(10), 6, 10).moves == list(range(10))
+    for moves, nCols in (('8', 7), ('4a', 7), ([7], 7), ([3, True], 7), ('11', 10)):
+        with pytest.raises(ValueError):
+            BitBoard.fromMoves(moves, 6, nCols)
+
+def test_mirroredPositionsShareKey(randomBoards):
+    """A chave é canônica: a posição espelhada tem a mesma chave, e orientMove leva as colunas de uma para a outra."""
+    for board in randomBoards(200, 0, 30):
+        mirror = BitBoard(board.nRows, board.nCols)
+        for column in board.moves:
+            mirror.pushMove(board.nCols - 1 - column, mirror.nextPlayer())
+        assert mirror.key == board.key
+        assert mirror.isSymmetric() == board.isSymmetric() == (mirror.masks == board.masks)
+        if not board.isSymmetric():
+            assert mirror.orientMove(board.orientMove(0)) == board.nCols - 1
+
+def test_getScore():
+    board = BitBoard.fromMoves('44556')     # Jogador 1 com 3 em linha na base: dois grupos de 4 com 3 fichas
+    assert board.checkAlmostWin(1) == 60
+    assert board.checkAlmostWin(2) == -60
+    assert board.getScore(True, 1) == 60 - 5
+    assert board.getScore(True, 1, win = True) == 1000 - 5
+    assert board.getScore(False, 1, win = True) == -1000 - 5
+    assert board.getScore(True, 1, draw = True) == -5
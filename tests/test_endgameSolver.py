@@ -0,0 +1,84 @@
+import time, threading
+import pytest
+import playerAI
+from bitboard import BitBoard
+from endgameSolver import EndgameSolver
+
+def _bruteForce(board, player, memo):
+    """Negamax exato sem poda, com a mesma convenção de pontuação do resolvedor."""
+    key = (board.key, player)
+    if key not in memo:
+        size = board.nRows * board.nCols
+        best = None
+        for column in board.getFreeColumns():
+            board.pushMove(column, player)
+            if board.isWinner(player):
+                score = (size + 2 - board.nChips) // 2
+            elif board.isFull():
+                score = 0
+            else:
+                score = -_bruteForce(board, 3 - player, memo)
+            board.popMove()
+            best = score if best is None else max(best, score)
+        memo[key] = best
+    return memo[key]
+
+def _endgames(randomBoards, count, empties, nRows = 6, nCols = 7, seed = 0):
+    size = nRows * nCols
+    boards = randomBoards(count * 4, size - empties[1], size - empties[0], nRows, nCols, seed)
+    return [b for b in boards if empties[0] <= size - b.nChips <= empties[1]][:count]
+
+@pytest.mark.parametrize('nRows, nCols, empties', [(6, 7, (10, 14)), (4, 4, (11, 14)), (4, 5, (10, 13))])
+def test_solveMatchesBruteForce(randomBoards, nRows, nCols, empties):
+    solver = EndgameSolver(2**20)      # Mesma tabela em todas as posições, como na partida
+    boards = _endgames(randomBoards, 12, empties, nRows, nCols)
+    assert boards
+    memo = {}
+    for board in boards:
+        player = board.nextPlayer()
+        expected = _bruteForce(board.copy(), player, memo)
+        solution = solver.solve(board)
+        assert solution.score == expected
+        assert solution.result == (expected > 0) - (expected < 0)
+        # A jogada indicada garante o valor calculado
+        board.pushMove(solution.column, player)
+        if board.isWinner(player):
+            score = (nRows * nCols + 1 - board.nChips + 1) // 2
+        else:
+            score = 0 if board.isFull() else -_bruteForce(board, 3 - player, memo)
+        assert score == expected
+
+def test_solveFullAndEmptySmallBoard():
+    board = BitBoard.fromMoves('11223344', 2, 4)
+    assert board.isFull()
+    assert EndgameSolver().solve(board) == (None, 0, 0, 0, 0)
+    # 4x4 vazio: empate com jogo perfeito
+    assert EndgameSolver().solve(BitBoard(4, 4)).score == _bruteForce(BitBoard(4, 4), 1, {})
+
+def test_immediateWin():
+    """Com vitória imediata, a partida termina na própria jogada."""
+    board = BitBoard.fromMoves('1212124')     # 2 está na vez e completa a coluna 2
+    solution = EndgameSolver().solve(board)
+    assert (solution.column, solution.result, solution.distance) == (1, 1, 1)
+    assert solution.score == (6 * 7 + 1 - board.nChips) // 2
+
+def test_interruptedSolve():
+    """Com o prazo vencido ou o evento ativado, a resolução é abandonada (retorna None) em poucos nós."""
+    board = BitBoard.fromMoves('4455')      # 38 células vazias: não termina em tempo razoável
+    solver = EndgameSolver(2**20)
+    start = time.perf_counter()
+    assert solver.solve(board, deadline = start + 0.05) is None
+    assert time.perf_counter() - start < 1
+    stopEvent = threading.Event()
+    stopEvent.set()
+    assert solver.solve(board, stopEvent = stopEvent) is None
+    assert solver.nodes <= 4096
+
+def test_searchFallsBackWhenSolverTimesOut():
+    """Com o resolvedor habilitado em uma posição grande demais, a busca ainda respeita o orçamento de tempo."""
+    board = BitBoard.fromMoves('4455')
+    start = time.perf_counter()
+    result = playerAI.iterativeDeepening(board, 1, 200, endgameThreshold = 42, book = False,
+                                         solver = EndgameSolver(2**20))
+    assert time.perf_counter() - start < 1
+    assert board.canPlay(result.column) and result.depth < 38
@@ -0,0 +1,56 @@
+import pytest
+import playerAI
+from bitboard import BitBoard
+from transposition import TranspositionTable
+from engineConfig import EngineConfig, PRESETS, DEFAULT_PRESET, Engine, getConfig, presetHelp
+
+def test_presetsAreValid():
+    for name, config in PRESETS.items():
+        assert getConfig(name) == config
+        assert name in presetHelp()
+    assert getConfig() == PRESETS[DEFAULT_PRESET] == EngineConfig()
+    assert EngineConfig().weights == (BitBoard.almostWinScore, BitBoard.winScore)
+
+def test_overrides():
+    config = getConfig('blitz,timeLimit=50,engine=alphabeta,depth=6,almostWinScore=40,book=none')
+    assert config == PRESETS['blitz']._replace(timeLimit = 50, engine = 'alphabeta', depth = 6, almostWinScore = 40,
+                                               book = None)
+    assert config.weights == (40, BitBoard.winScore)
+    assert getConfig('analysis,workers=none,timeLimit=2500').workers is None
+    assert getConfig(config) is config
+
+@pytest.mark.parametrize('spec', ['unknown', 'default,depht=3', 'default,depth', 'default,engine=mcts',
+                                  'default,depth=none', 'default,almostWinScore=1000', 'default,almostWinScore=-1',
+                                  'default,almostWinScore=30.5', 'default,depth=3.5', 'default,timeLimit=2.5',
+                                  'default,winScore=2147483648', 'default,workers=0', 'default,ttBytes=-1',
+                                  'default,endgameThreshold=none', 'default,book=3', 'default,depth=true'])
+def test_invalidConfigRaises(spec):
+    with pytest.raises(ValueError):
+        getConfig(spec)
+
+def test_weightsDoNotLeakThroughSharedTable(randomBoards):
+    """Pontuações calculadas com outros pesos na mesma tabela não alteram a busca com os pesos padrão."""
+    boards = randomBoards(20, 0, 20, seed = 5)
+    fresh = [playerAI.search(b, b.nextPlayer(), 3, TranspositionTable(2**18), endgameThreshold = 0).score
+             for b in boards]
+    table = TranspositionTable(2**18)
+    for board in boards:
+        for weights in [(0, 1000), (100, 200)]:
+            playerAI.search(board, board.nextPlayer(), 3, table, endgameThreshold = 0, weights = weights)
+    shared = [playerAI.search(b, b.nextPlayer(), 3, table, endgameThreshold = 0).score for b in boards]
+    assert shared == fresh
+
+def test_minimaxWithConfigUsesItsWeights():
+    board = BitBoard.fromMoves('4455')
+    column = playerAI.minimax(board, 1, TranspositionTable(2**18), config = getConfig('easy,almostWinScore=0'))
+    assert board.canPlay(column)
+    # A IA de sempre continua com os pesos da classe (a configuração só vale na cópia da busca)
+    assert board.almostWinScore == BitBoard.almostWinScore
+
+def test_engine():
+    with Engine('easy') as engine:
+        board = BitBoard.fromMoves('445')
+        result = engine.search(board, board.nextPlayer())
+        assert board.canPlay(result.column) and result.depth == 2
+        engine.newGame()
+        assert engine.table.usage() == 0
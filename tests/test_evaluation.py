@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from bitboard import BitBoard
+from board import Board
+from evaluation import almostWinScores, selfCheck
+
+SIZES = [(6, 7), (4, 4), (5, 9), (7, 8)]
+
+@pytest.mark.parametrize('nRows, nCols', SIZES)
+def test_batchMatchesBoards(randomBoards, nRows, nCols):
+    """A avaliação em lote concorda com a incremental de BitBoard e com a escalar de referência de Board."""
+    boards = randomBoards(150, 0, nRows * nCols, nRows, nCols, seed = nCols)
+    stack = np.array([board.toCells() for board in boards], dtype = np.int8)
+    for aiChipNum in (1, 2):
+        scores = almostWinScores(stack, aiChipNum)
+        assert scores.shape == (len(boards),)
+        assert scores.tolist() == [board.checkAlmostWin(aiChipNum) for board in boards]
+        assert selfCheck(stack, aiChipNum) == []
+        # Um único tabuleiro retorna um inteiro
+        assert almostWinScores(stack[-1], aiChipNum) == Board(stack[-1])._checkAlmostWinReference(aiChipNum)
+
+def test_selfCheckReportsDivergence(randomBoards, monkeypatch):
+    boards = randomBoards(20, 10, 30, seed = 2)
+    stack = np.array([board.toCells() for board in boards], dtype = np.int8)
+    expected = [i for i, board in enumerate(boards) if board.checkAlmostWin(1) != 0]
+    assert expected
+    monkeypatch.setattr(Board, '_checkAlmostWinReference', lambda self, aiChipNum: 0)
+    assert selfCheck(stack, 1) == expected
+
+def test_groupsCountedSeparately():
+    """Cada grupo de 4 células é contado separadamente (a versão original somava as contagens entre os grupos
+    e dava -90 a esta posição, sem nenhuma quase vitória)."""
+    board = BitBoard.fromMoves('1747')
+    cells = np.array(board.toCells(), dtype = np.int8)
+    assert board.checkAlmostWin(1) == Board(cells)._checkAlmostWinReference(1) == almostWinScores(cells, 1) == 0
+    board = BitBoard.fromMoves('17273')       # Três fichas do jogador 1 na linha de baixo
+    cells = np.array(board.toCells(), dtype = np.int8)
+    assert board.checkAlmostWin(1) == Board(cells)._checkAlmostWinReference(1) == almostWinScores(cells, 1) == 30
@@ -0,0 +1,94 @@
+import json, random
+import pytest
+import gameRecord, selfPlay
+from gameRecord import GameWriter, GameRecord, readGames, replay, DRAW, UNFINISHED
+from conftest import playRandom
+
+def _randomGames(count, nRows = 6, nCols = 7, seed = 0):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        moves = playRandom(rng, rng.randint(0, nRows * nCols), nRows, nCols).moves
+        games.append(bytes(moves))
+    return games
+
+@pytest.mark.parametrize('nRows, nCols', [(6, 7), (4, 15), (5, 16), (9, 20)])
+def test_writeAndReadBack(tmp_path, nRows, nCols):
+    """Partidas de tamanho par e ímpar, nos dois formatos (duas jogadas por byte e uma por byte)."""
+    path = tmp_path / 'games.c4gr'
+    games = _randomGames(40, nRows, nCols)
+    with GameWriter(path) as writer:
+        for moves in games:
+            writer.write(moves, nRows = nRows, nCols = nCols)
+    records = list(readGames(path))
+    assert [r.moves for r in records] == games
+    assert {(r.nRows, r.nCols) for r in records} == {(nRows, nCols)}
+    assert all(r.result in (DRAW, UNFINISHED) for r in records)     # playRandom para antes da vitória
+
+def test_resultAndAppend(tmp_path):
+    path = tmp_path / 'games.c4gr'
+    with GameWriter(path, append = False) as writer:
+        writer.write('1212121')                 # Vitória do jogador 1 na coluna 1
+        writer.write('4', result = UNFINISHED)
+    with GameWriter(path) as writer:            # Acrescenta ao arquivo existente
+        writer.write([0, 1, 0, 1, 0, 1, 2, 1])  # Vitória do jogador 2 na coluna 2
+        assert writer.count == 1
+    records = list(readGames(path))
+    assert records == [GameRecord(bytes([0, 1, 0, 1, 0, 1, 0]), 1, 6, 7), GameRecord(b'\3', UNFINISHED, 6, 7),
+                       GameRecord(bytes([0, 1, 0, 1, 0, 1, 2, 1]), 2, 6, 7)]
+
+@pytest.mark.parametrize('moves', ['1238', '1111111', '12a', [0, 7], [0, -1], '12121212'])
+def test_invalidMovesRaise(tmp_path, moves):
+    """Colunas fora do tabuleiro, coluna cheia, texto inválido e jogadas depois da vitória."""
+    with GameWriter(tmp_path / 'games.c4gr') as writer:
+        with pytest.raises(ValueError):
+            writer.write(moves)
+        with pytest.raises(ValueError):
+            writer.write([3, 9], result = UNFINISHED)
+        with pytest.raises(ValueError):     # Uma string não representa tabuleiros com mais de 9 colunas
+            writer.write('11', nCols = 10)
+        assert writer.count == 0
+
+def test_rejectsOtherFiles(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'nope!')
+    with pytest.raises(ValueError):
+        list(readGames(path))
+    with pytest.raises(ValueError):
+        GameWriter(path)
+
+def test_truncatedFile(tmp_path):
+    path = tmp_path / 'games.c4gr'
+    with GameWriter(path) as writer:
+        writer.write('4455')
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        list(readGames(path))
+
+def test_replay():
+    record = GameRecord(bytes([3, 3, 4, 2]), UNFINISHED, 6, 7)
+    positions = [(board.copy(), column) for board, column in replay(record)]
+    assert [column for _, column in positions] == [3, 3, 4, 2]
+    assert [board.nChips for board, _ in positions] == [0, 1, 2, 3]
+    assert positions[2][0].moves == [3, 3]
+
+def test_convertJsonl(tmp_path):
+    source = tmp_path / 'games.jsonl'
+    # Jogadas em lista (selfPlay atual, com as dimensões) e em texto sem dimensões (versões antigas)
+    games = [{'moves': '1212121', 'winner': 1}, {'moves': [3, 3], 'winner': 3, 'nRows': 4, 'nCols': 5},
+             {'moves': [11, 10], 'winner': 3, 'nRows': 4, 'nCols': 12}]
+    source.write_text('\n'.join(json.dumps(game) for game in games))
+    assert gameRecord.convertJsonl(source, tmp_path / 'games.c4gr') == 3
+    assert list(readGames(tmp_path / 'games.c4gr')) == [GameRecord(bytes([0, 1, 0, 1, 0, 1, 0]), 1, 6, 7),
+                                                         GameRecord(b'\3\3', 3, 4, 5), GameRecord(b'\13\12', 3, 4, 12)]
+    # Arquivos antigos de outro tamanho de tabuleiro informam as dimensões na conversão
+    source.write_text(json.dumps({'moves': '55', 'winner': 3}))
+    assert gameRecord.convertJsonl(source, tmp_path / 'games.c4gr', 5, 5) == 1
+    assert list(readGames(tmp_path / 'games.c4gr')) == [GameRecord(b'\4\4', 3, 5, 5)]
+
+def test_selfPlayRecordsConvert(tmp_path):
+    source = tmp_path / 'games.jsonl'
+    game = selfPlay.playGame('easy', 'easy', seed = 7, nRows = 4, nCols = 10)
+    source.write_text(json.dumps(game))
+    assert gameRecord.convertJsonl(source, tmp_path / 'games.c4gr') == 1
+    assert list(readGames(tmp_path / 'games.c4gr')) == [GameRecord(bytes(game['moves']), game['winner'], 4, 10)]
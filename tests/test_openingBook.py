@@ -0,0 +1,63 @@
+import pytest
+import playerAI
+from bitboard import BitBoard
+from openingBook import OpeningBook, buildBook, enumeratePositions
+
+def _distinctPositions(maxPly, nRows, nCols):
+    """Chaves canônicas de todas as posições em andamento com até 'maxPly' fichas, por força bruta."""
+    keys = set()
+    frontier = [BitBoard(nRows, nCols)]
+    for _ in range(maxPly + 1):
+        following = []
+        for board in frontier:
+            if board.key in keys:
+                continue
+            keys.add(board.key)
+            for column in board.getFreeColumns():
+                child = board.copy()
+                child.pushMove(column, child.nextPlayer())
+                if not child.checkWinner() and not child.isFull():
+                    following.append(child)
+        frontier = following
+    return keys
+
+@pytest.mark.parametrize('maxPly, nRows, nCols', [(4, 6, 7), (5, 4, 5)])
+def test_enumeratePositions(maxPly, nRows, nCols):
+    positions = list(enumeratePositions(maxPly, nRows, nCols))
+    keys = [key for _, key in positions]
+    assert len(keys) == len(set(keys))
+    assert set(keys) == _distinctPositions(maxPly, nRows, nCols)
+    for moves, key in positions[::7]:
+        assert BitBoard.fromMoves(moves, nRows, nCols).key == key
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / 'book.bin'
+    count = buildBook(path, 3, depth = 3, workers = 1)
+    book = OpeningBook(path)
+    assert len(book) == count
+    yield book
+    book.close()
+
+def test_lookup(book):
+    for moves, _ in enumeratePositions(3):
+        board = BitBoard.fromMoves(moves)
+        column, score, depth = book.lookup(board)
+        assert board.canPlay(column) and depth == 3
+        # A posição espelhada está no mesmo registro, com a jogada espelhada
+        mirrored = BitBoard.fromMoves(''.join(str(8 - int(c)) for c in moves))
+        assert book.lookup(mirrored) == (column if board.isSymmetric() else 6 - column, score, depth)
+    assert book.lookup(BitBoard.fromMoves('4444')) is None     # Mais fichas que o livro
+    assert book.lookup(BitBoard(5, 6)) is None                  # Outro tamanho de tabuleiro
+
+def test_searchUsesBook(book):
+    board = BitBoard.fromMoves('43')
+    column, score, depth = book.lookup(board)
+    result = playerAI.iterativeDeepening(board, 1, maxDepth = 6, table = None, book = book)
+    assert (result.column, result.score, result.depth) == (column, score, depth)
+
+def test_invalidFile(tmp_path):
+    path = tmp_path / 'book.bin'
+    path.write_bytes(bytes(16))
+    with pytest.raises(ValueError):
+        OpeningBook(path)
@@ -0,0 +1,41 @@
+import pytest
+import playerAI
+from transposition import TranspositionTable
+from parallelSearch import ParallelSearcher
+
+def _serialScore(board, depth, engine):
+    return playerAI.search(board, board.nextPlayer(), depth, TranspositionTable(2**18), engine = engine,
+                           endgameThreshold = 0).score
+
+@pytest.mark.parametrize('shareTable', [True, False])
+def test_rootModeMatchesSerialSearch(gamePositions, shareTable):
+    """Dividir as jogadas da raiz entre os processos não muda o valor encontrado.
+    As tabelas dos processos são mantidas entre as buscas, por isso as posições são as de uma mesma partida:
+    em posições sem relação, uma entrada buscada mais fundo em uma delas pode ser usada na outra.
+    """
+    boards = gamePositions(seed = 4)[:20]
+    for engine in playerAI.ENGINES:
+        with ParallelSearcher(2, mode = 'root', ttBytes = 2**18, shareTable = shareTable) as searcher:
+            for board in boards:
+                result = searcher.search(board, board.nextPlayer(), 3, engine = engine)
+                assert result.score == _serialScore(board, 3, engine)
+                assert board.canPlay(result.column)
+
+def test_lazySMP(gamePositions):
+    boards = gamePositions(seed = 6)[:12:2]
+    with ParallelSearcher(1, mode = 'lazySMP', ttBytes = 2**18) as searcher:
+        for board in boards:     # Só o processo principal: a mesma busca de playerAI.iterativeDeepening
+            assert searcher.search(board, board.nextPlayer(), 3).score == _serialScore(board, 3, 'alphabeta')
+    with ParallelSearcher(2, mode = 'lazySMP', ttBytes = 2**18) as searcher:
+        for board in boards:
+            result = searcher.search(board, board.nextPlayer(), 3, engine = 'pvs')
+            assert board.canPlay(result.column) and result.depth == 3
+        result = searcher.search(boards[0], boards[0].nextPlayer(), None, timeLimit = 100)
+        assert boards[0].canPlay(result.column)
+
+def test_invalidOptions(randomBoards):
+    with pytest.raises(ValueError):
+        ParallelSearcher(1, mode = 'tree')
+    with ParallelSearcher(1, mode = 'root', ttBytes = 2**16) as searcher:
+        with pytest.raises(ValueError):
+            searcher.search(randomBoards(1)[0], 1, 3, timeLimit = 100)
@@ -0,0 +1,44 @@
+import pickle
+import pytest
+from bitboard import BitBoard, Position
+
+SIZES = [(6, 7), (4, 4), (5, 9), (7, 8), (6, 12)]
+
+def _state(board):
+    return (board.masks[1], board.masks[2], board.key, board.nChips, board.checkAlmostWin(1), board.getFreeColumns())
+
+@pytest.mark.parametrize('nRows, nCols', SIZES)
+def test_packRoundTrip(randomBoards, nRows, nCols):
+    for board in randomBoards(80, 0, nRows * nCols, nRows, nCols, seed = nCols):
+        position = board.toPosition()
+        assert position == Position.fromMoves(board.moves, nRows, nCols)
+        packed = position.pack()
+        assert packed < 1 << nCols * (nRows + 1)
+        restored = Position.fromPacked(packed, nRows, nCols)
+        assert restored == position and hash(restored) == hash(position)
+        assert restored.nChips == board.nChips and restored.nextPlayer() == board.nextPlayer()
+        assert _state(restored.toBitBoard()) == _state(board)
+        assert pickle.loads(pickle.dumps(position)) == position
+        assert eval(repr(position)) == position
+
+def test_packIsUnique(randomBoards):
+    """O inteiro de pack() identifica a posição (sem as simetrias, ao contrário de BitBoard.key)."""
+    boards = randomBoards(300, 0, 12, seed = 1)
+    positions = {board.toPosition() for board in boards}
+    assert len({position.pack() for position in positions}) == len(positions)
+    assert Position().pack() == Position.fromMoves('').pack()
+    assert Position.fromMoves('1').pack() != Position.fromMoves('7').pack()
+
+def test_fromMovesFormats():
+    assert Position.fromMoves('4453') == Position.fromMoves([3, 3, 4, 2])
+    assert Position.fromMoves('4453', 6, 7).toBitBoard().moves == []    # Sem histórico
+    for moves in ('8', '1111111', '4a', [0, -1], [7], [3, True]):
+        with pytest.raises(ValueError):
+            Position.fromMoves(moves)
+
+def test_fromMovesWideBoard():
+    # Acima de 9 colunas só há a lista de inteiros: uma string com um caractere por jogada seria ambígua
+    position = Position.fromMoves([9, 9, 11, 0], 6, 12)
+    assert position == BitBoard.fromMoves([9, 9, 11, 0], 6, 12).toPosition()
+    with pytest.raises(ValueError):
+        Position.fromMoves('11', 6, 10)
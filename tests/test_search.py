@@ -0,0 +1,71 @@
+import pytest
+import playerAI
+from playerAI import MoveOrdering
+from transposition import TranspositionTable
+
+def _tactical(board, chipNum, moves):
+    """Mesma poda tática da busca: só a vitória imediata, senão só as jogadas que não perdem (se houver)."""
+    mask = board.winningMask(chipNum) & board.playableMask() or board.nonLosingMask(chipNum)
+    return [c for c in moves if not mask or mask >> board.heights[c] & 1]
+
+def _minimax(board, depth, maxDepth, isAIsTurn, aiChipNum):
+    """Minimax sem poda, sem tabela e sem ordenação, com as mesmas condições de parada de playerAI."""
+    if board.checkWinner():
+        return board.getScore(isAIsTurn, aiChipNum, win = True)
+    if board.isFull():
+        return board.getScore(isAIsTurn, aiChipNum, draw = True)
+    if depth >= maxDepth:
+        return board.getScore(isAIsTurn, aiChipNum)
+    isAIsTurn = not isAIsTurn
+    chipNum = aiChipNum if isAIsTurn else 3 - aiChipNum
+    scores = []
+    for column in _tactical(board, chipNum, board.getFreeColumns()):
+        board.pushMove(column, chipNum)
+        scores.append(_minimax(board, depth + 1, maxDepth, isAIsTurn, aiChipNum))
+        board.popMove()
+    return max(scores) if isAIsTurn else min(scores)
+
+def _rootScores(board, aiChipNum, depth):
+    scores = {}
+    for column in _tactical(board, aiChipNum, board.getFreeColumns()):
+        board.pushMove(column, aiChipNum)
+        scores[column] = _minimax(board, 0, depth, True, aiChipNum)
+        board.popMove()
+    return scores
+
+@pytest.mark.parametrize('engine', playerAI.ENGINES)
+@pytest.mark.parametrize('depth', [2, 3])
+def test_searchMatchesPlainMinimax(randomBoards, engine, depth):
+    """Com poda, tabela de transposição e ordenação, a busca encontra o mesmo valor que o minimax simples."""
+    for board in randomBoards(25, 0, 24, seed = depth):
+        aiChipNum = board.nextPlayer()
+        scores = _rootScores(board, aiChipNum, depth)
+        result = playerAI.search(board, aiChipNum, depth, TranspositionTable(2**18), engine = engine,
+                                 endgameThreshold = 0)
+        assert result.score == max(scores.values())
+        assert scores[result.column] == result.score
+
+def test_sharedTableAcrossSearches(gamePositions):
+    """Reaproveitar a tabela entre as jogadas de uma partida não altera os valores encontrados."""
+    table = TranspositionTable(2**18)
+    for board in gamePositions(seed = 7)[:24]:
+        aiChipNum = board.nextPlayer()
+        result = playerAI.search(board, aiChipNum, 3, table, endgameThreshold = 0)
+        assert result.score == max(_rootScores(board, aiChipNum, 3).values())
+
+def test_iterativeDeepeningReachesDepth(randomBoards):
+    for board in randomBoards(10, 0, 20, seed = 3):
+        aiChipNum = board.nextPlayer()
+        result = playerAI.iterativeDeepening(board, aiChipNum, maxDepth = 3, table = TranspositionTable(2**18),
+                                             engine = 'pvs', endgameThreshold = 0, book = False)
+        assert result.depth == min(3, board.nRows * board.nCols - board.nChips - 1)
+        assert result.score == max(_rootScores(board, aiChipNum, result.depth).values())
+
+@pytest.mark.parametrize('options', [{}, {'center': False}, {'killers': False, 'history': False}])
+def test_orderingOnlyChangesEffort(randomBoards, options):
+    """Qualquer ordenação de jogadas leva ao mesmo valor; só muda a quantidade de nós visitados."""
+    for board in randomBoards(10, 0, 20, seed = 9):
+        aiChipNum = board.nextPlayer()
+        scores = {playerAI.search(board, aiChipNum, 3, TranspositionTable(2**18), ordering = ordering,
+                                  endgameThreshold = 0).score for ordering in (MoveOrdering(), MoveOrdering(**options))}
+        assert len(scores) == 1
@@ -0,0 +1,22 @@
+import json
+import pytest
+import playerAI
+from searchStats import SearchStats
+from transposition import TranspositionTable
+
+@pytest.mark.parametrize('engine', playerAI.ENGINES)
+def test_statsDoNotChangeSearch(randomBoards, engine):
+    """A busca instrumentada encontra a mesma jogada com os mesmos nós da busca sem estatísticas."""
+    for board in randomBoards(10, 0, 20, seed = 8):
+        aiChipNum = board.nextPlayer()
+        plain = playerAI.search(board, aiChipNum, 3, TranspositionTable(2**18), engine = engine, endgameThreshold = 0)
+        stats = SearchStats()
+        traced = playerAI.search(board, aiChipNum, 3, TranspositionTable(2**18), engine = engine, endgameThreshold = 0,
+                                 stats = stats)
+        assert traced == plain
+        assert stats.nodes == plain.nodes and len(stats.nodesPerDepth) <= 5
+        assert stats.pv and stats.pv[0] == plain.column
+        assert stats.winChecks == stats.nodes and stats.leafEvals + stats.terminalEvals > 0
+        json.dumps(stats.toDict())
+        stats.reset()
+        assert stats.nodes == 0 and stats.pv == []
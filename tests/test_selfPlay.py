@@ -0,0 +1,50 @@
+import json
+import selfPlay
+from bitboard import BitBoard
+from gameRecord import readGames
+
+def _checkGame(game, nRows = 6, nCols = 7):
+    board = BitBoard.fromMoves(game['moves'], nRows, nCols)
+    lastPlayer = 2 - len(game['moves']) % 2
+    assert game['winner'] == (lastPlayer if board.isWinner(lastPlayer) else 0)
+    assert game['winner'] or board.isFull()
+
+def test_playGame():
+    game = selfPlay.playGame('easy', {'depth': 1, 'bookPly': 0, 'endgameThreshold': 0}, seed = 1)
+    _checkGame(game)
+    assert len(game['times'][0]) + len(game['times'][1]) == len(game['moves']) - 2
+    small = selfPlay.playGame('easy', 'easy', seed = 2, randomOpening = 0, nRows = 5, nCols = 6)
+    _checkGame(small, 5, 6)
+    # Sem aberturas aleatórias, as mesmas configurações jogam sempre a mesma partida
+    again = selfPlay.playGame('easy', 'easy', seed = 9, randomOpening = 0, nRows = 5, nCols = 6)
+    assert (again['moves'], again['winner'], again['nodes']) == (small['moves'], small['winner'], small['nodes'])
+
+def test_playGameWideBoard():
+    # As jogadas são uma lista de inteiros: colunas de 10 em diante não se confundem com duas jogadas
+    game = selfPlay.playGame('easy', 'easy', seed = 6, nRows = 4, nCols = 12)
+    assert all(isinstance(column, int) and 0 <= column < 12 for column in game['moves'])
+    _checkGame(game, 4, 12)
+
+def test_enginesReusedWhenColoursSwap(monkeypatch):
+    """As IAs são guardadas pela configuração: trocar as cores entre as partidas não cria IAs novas."""
+    monkeypatch.setattr(selfPlay, '_engines', {})
+    fast = {'depth': 1, 'bookPly': 0, 'endgameThreshold': 0}
+    selfPlay.playGame('easy', fast, seed = 3)
+    engines = dict(selfPlay._engines)
+    selfPlay.playGame(fast, 'easy', seed = 4)
+    assert selfPlay._engines == engines and len(engines) == 2
+    selfPlay.playGame('easy', 'easy', seed = 5)     # Mesma configuração nos dois lados: uma IA para cada
+    assert len(selfPlay._engines) == 3
+
+def test_runMatch(tmp_path):
+    output, records = tmp_path / 'games.jsonl', tmp_path / 'games.c4gr'
+    summary = selfPlay.runMatch('easy', {'depth': 1, 'bookPly': 0, 'endgameThreshold': 0}, 4, workers = 2,
+                                output = output, records = records, seed = 10)
+    assert sum(summary.values()) == 4
+    games = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [game['game'] for game in games] == [0, 1, 2, 3]
+    assert [game['red'] for game in games] == ['A', 'B', 'A', 'B']
+    for game in games:
+        _checkGame(game)
+    assert [(bytes(game['moves']), game['winner']) for game in games] == \
+        [(record.moves, record.result) for record in readGames(records)]
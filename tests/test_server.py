@@ -0,0 +1,111 @@
+import json, asyncio
+import pytest
+from bitboard import Position
+from server import GameServer, Client
+
+def _serve(test, **options):
+    """Roda 'test(server, client)' com um servidor de um processo em uma porta livre."""
+    async def main():
+        server = GameServer(workers = 1, **options)
+        await server.start(port = 0)
+        client = await Client.connect(*server.address[:2])
+        try:
+            return await test(server, client)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+def test_invalidRequests():
+    async def test(server, client):
+        responses = {}
+        for name, fields in {
+                'op': {'op': 'resign'},
+                'moves': {'depth': 2},
+                'engine': {'moves': '44', 'engine': 'mcts'},
+                'preset': {'moves': '44', 'preset': 'impossible'},
+                'deadline': {'moves': '44', 'deadline': 0},
+                'deadlineText': {'moves': '44', 'deadline': '1s'},
+                'column': {'moves': '48'},
+                'full': {'moves': '1111111'},
+                'listColumn': {'moves': [3, 7]},
+                'listType': {'moves': [3, 'a']},
+                'finished': {'moves': '1212121'},
+                'rows': {'moves': '44', 'rows': 10**6},
+                'cols': {'moves': '44', 'cols': 3},
+                'colsType': {'moves': '44', 'cols': 7.0},
+                'depth': {'moves': '44', 'depth': -1},
+                'depthType': {'moves': '44', 'depth': '3'},
+                'timeLimit': {'moves': '44', 'timeLimit': 0},
+                'timeLimitType': {'moves': '44', 'timeLimit': True},
+                'movesType': {'moves': {'a': 1}},
+                }.items():
+            responses[name] = await client.request(id = name, **fields)
+        # Linhas que não são um objeto JSON
+        for line in (b'{"moves": \n', b'[1, 2]\n'):
+            client._writer.write(line)
+            await client._writer.drain()
+            responses[line] = json.loads(await client._reader.readline())
+        # A conexão continua atendendo depois dos erros
+        responses['ok'] = await client.request(id = 'ok', moves = '44', depth = 2)
+        return server.pending, responses
+    pending, responses = _serve(test)
+    ok = responses.pop('ok')
+    assert ok['id'] == 'ok' and 0 <= ok['column'] < 7 and 'error' not in ok
+    for key, response in responses.items():
+        assert 'error' in response, key
+        assert 'column' not in response
+        if isinstance(key, str):
+            assert response['id'] == key
+    assert responses['op']['error'] == 'operação desconhecida: resign'
+    assert responses['moves']['error'] == 'falta o campo "moves"'
+    assert responses['deadline']['error'] == responses['deadlineText']['error'] == 'prazo inválido'
+    assert all(response['error'].startswith('pedido inválido') for key, response in responses.items()
+               if isinstance(key, bytes))
+    assert pending == 0
+
+def test_moveFormatsAgree():
+    """A mesma posição como string, lista de colunas ou Position.pack() recebe a mesma resposta."""
+    async def test(server, client):
+        packed = Position.fromMoves('4453').pack()
+        return [await client.request(moves = moves, depth = 3, engine = 'pvs') for moves in
+                ('4453', [3, 3, 4, 2], packed)]
+    responses = _serve(test)
+    assert len({(r['column'], r['score'], r['depth']) for r in responses}) == 1
+
+def test_sessionsAndPing():
+    async def test(server, client):
+        first = await client.request(moves = '44', session = 'a', depth = 3)
+        second = await client.request(moves = '44', session = 'a', depth = 3)
+        closed = await client.request(op = 'close', session = 'a', id = 1)
+        ping = await client.request(op = 'ping')
+        return first, second, closed, ping
+    first, second, closed, ping = _serve(test)
+    assert first['score'] == second['score']    # Com a tabela aquecida, só a escolha entre jogadas empatadas pode mudar
+    assert closed == {'id': 1}
+    assert ping == {'id': None, 'pending': 0}
+
+def test_busyAndDeadline():
+    async def test(server, client):
+        slow = asyncio.create_task(client.request(moves = '', depth = 40, deadline = 300))
+        await asyncio.sleep(0.05)
+        # O outro pedido chega enquanto o único lugar está ocupado (em outra conexão, pois Client espera cada resposta)
+        other = await Client.connect(*server.address[:2])
+        busy = await other.request(moves = '44', depth = 2)
+        await other.close()
+        return busy, await slow
+    busy, slow = _serve(test, maxPending = 1)
+    assert busy['error'] == 'servidor ocupado'
+    assert 'column' in slow     # O prazo limita a busca por profundidade: responde com a última iteração completa
+
+def test_brokenWorkerStillAnswers():
+    """Se o processo da busca morre, o pedido recebe uma resposta de erro em vez de ficar sem resposta."""
+    async def test(server, client):
+        await client.request(moves = '44', depth = 1)     # O processo só é criado no primeiro pedido
+        for process in list(server._executors[0]._processes.values()):
+            process.kill()
+        failed = await client.request(id = 1, moves = '44', depth = 2)
+        return failed, await client.request(id = 2, moves = '44', depth = 2)
+    failed, recovered = _serve(test)
+    assert failed['id'] == 1 and failed['error'].startswith('falha na busca')
+    assert recovered['id'] == 2 and 'column' in recovered     # O processo é recriado
@@ -0,0 +1,55 @@
+import pytest
+from bitboard import BitBoard
+
+SIZES = [(6, 7), (4, 4), (4, 5), (5, 9), (7, 8), (6, 12)]
+
+def _cellWins(board, player, column, row):
+    """Coloca a ficha diretamente na célula (sem a gravidade) e confere se forma 4 em linha."""
+    bit = 1 << (column * (board.nRows + 1) + row)
+    board.masks[player] |= bit
+    wins = board.isWinner(player)
+    board.masks[player] ^= bit
+    return wins
+
+def _wins(board, player, column):
+    board.pushMove(column, player)
+    wins = board.isWinner(player)
+    board.popMove()
+    return wins
+
+@pytest.mark.parametrize('nRows, nCols', SIZES)
+def test_threatsMatchBruteForce(randomBoards, nRows, nCols):
+    for board in randomBoards(40, 0, nRows * nCols, nRows, nCols, seed = nCols):
+        for player in (1, 2):
+            expected = [[r + 1 for r in range(board.heights[c] - c * (nRows + 1), nRows)
+                         if _cellWins(board, player, c, r)] for c in range(nCols)]
+            assert board.threats(player) == expected
+            assert board.immediateWins(player) == [c for c in board.getFreeColumns() if _wins(board, player, c)]
+            assert board.mustBlock(3 - player) == board.immediateWins(player)
+
+@pytest.mark.parametrize('nRows, nCols', SIZES)
+def test_nonLosingMaskMatchesBruteForce(randomBoards, nRows, nCols):
+    """Sem vitória imediata, as jogadas da máscara são exatamente as que não dão a vitória ao adversário."""
+    checked = 0
+    for board in randomBoards(60, 0, nRows * nCols, nRows, nCols, seed = nRows):
+        player = board.nextPlayer()
+        if board.immediateWins(player):
+            continue
+        mask = board.nonLosingMask(player)
+        for column in board.getFreeColumns():
+            board.pushMove(column, player)
+            safe = not board.immediateWins(3 - player)
+            board.popMove()
+            assert bool(mask >> board.heights[column] & 1) == safe
+        assert mask & ~board.playableMask() == 0
+        checked += 1
+    assert checked
+
+def test_threatRows():
+    # Jogador 1 com 3 fichas na linha de baixo (colunas 1 a 3): ameaça na linha 1 da coluna 4
+    board = BitBoard.fromMoves('112233')
+    assert board.threats(1) == [[], [], [], [1], [], [], []]
+    assert board.threats(2) == [[], [], [], [2], [], [], []]
+    assert board.immediateWins(1) == [3]
+    board.pushMove(5, 1)
+    assert board.nonLosingMask(2) == 1 << 3 * 7     # Só o bloqueio na coluna 4
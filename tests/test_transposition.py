@@ -0,0 +1,59 @@
+import random
+import pytest
+from transposition import TranspositionTable, EXACT, LOWER, UPPER, NO_MOVE
+
+@pytest.mark.parametrize('policy', ['twoTier', 'depth'])
+def test_storeAndProbe(policy):
+    table = TranspositionTable(2**16, policy)
+    table.store(12345, -77, 5, LOWER, 3)
+    table.store(67890, 2**20, 0, EXACT)
+    assert table.probe(12345) == (-77, 5, LOWER, 3)
+    assert table.probe(67890) == (2**20, 0, EXACT, NO_MOVE)
+    assert table.probe(11111) is None
+    table.clear()
+    assert table.probe(12345) is None
+
+def test_depthPreferredAndAlwaysReplace():
+    """No balde "twoTier", a entrada mais profunda fica e a nova vai para a entrada sempre substituída."""
+    table = TranspositionTable(32, 'twoTier')    # Um único balde
+    table.newSearch()
+    table.store(1, 10, 8, EXACT)
+    table.store(2, 20, 1, UPPER)
+    table.store(3, 30, 2, UPPER)
+    assert table.probe(1) == (10, 8, EXACT, NO_MOVE)
+    assert table.probe(2) is None
+    assert table.probe(3) == (30, 2, UPPER, NO_MOVE)
+    table.newSearch()    # Entradas de buscas anteriores podem ser substituídas
+    table.store(4, 40, 0, EXACT)
+    assert table.probe(4) == (40, 0, EXACT, NO_MOVE)
+
+def test_manyKeysNeverReturnWrongEntry():
+    rng = random.Random(0)
+    table = TranspositionTable(2**12)
+    stored = {}
+    for _ in range(5000):
+        key = rng.getrandbits(63)
+        stored[key] = (rng.randrange(-5000, 5000), rng.randrange(40), rng.choice((EXACT, LOWER, UPPER)), rng.randrange(-1, 7))
+        table.store(key, *stored[key])
+    for key, entry in stored.items():
+        assert table.probe(key) in (None, entry)
+
+def test_persistentFile(tmp_path):
+    """A tabela em arquivo mantém entradas e geração entre aberturas, e compact remove as entradas rasas."""
+    path = str(tmp_path / 'tt.bin')
+    table = TranspositionTable.open(path, 2**16)
+    table.newSearch()
+    table.store(111, 5, 1, EXACT)
+    table.store(222, 6, 9, EXACT)
+    table.close()
+    table = TranspositionTable.open(path)
+    assert table.generation == 1
+    assert table.probe(222) == (6, 9, EXACT, NO_MOVE)
+    assert table.compact(minDepth = 2) == 1
+    assert table.probe(111) is None and table.probe(222) is not None
+    assert table.usage() == 1
+    table.close()
+    with open(path, 'r+b') as file:
+        file.write(b'XXXX')
+    with pytest.raises(ValueError):
+        TranspositionTable.open(path)
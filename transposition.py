@@ -0,0 +1,301 @@
+import os, sys, mmap, struct
+
+# Tipos de limite armazenados em cada entrada
+EXACT = 0   # Valor exato
+LOWER = 1   # Limite inferior (houve corte beta)
+UPPER = 2   # Limite superior (nenhuma jogada superou alfa)
+
+NO_MOVE = -1
+_ENTRY_BYTES = 16   # 8 (chave ^ dados) + 8 (dados empacotados)
+_SCORE_OFFSET = 1 << 30
+_MAGIC = b'C4TT'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBBxQ')     # Assinatura, versão, política, geração, número de entradas (16 bytes)
+_GENERATION_OFFSET = 6
+_POLICIES = ('twoTier', 'depth')
+
+class TranspositionTable:
+    """Tabela de transposição de tamanho fixo, indexada pela chave de Zobrist da posição.
+
+    Cada entrada ocupa duas palavras de 64 bits: os dados empacotados (pontuação, profundidade, tipo de limite,
+    jogada e geração) e a chave combinada com os dados por XOR. Assim nenhum objeto é criado por entrada, a memória
+    ocupada é definida apenas pelo orçamento passado na criação, e a tabela pode ficar em memória compartilhada
+    entre processos sem travas: uma entrada escrita pela metade por outro processo simplesmente não confere na leitura.
+    """
+    def __init__(self, maxBytes = 16 * 2**20, policy = 'twoTier', *, buffer = None):
+        """
+        Parameters
+        ----------
+        maxBytes: int, default 16 MiB
+            Orçamento de memória da tabela. O número de entradas é maxBytes // 16.
+        policy: "twoTier" | "depth"
+            Política de substituição. "depth" mantém uma entrada por índice, preferindo a de maior profundidade
+            (entradas de buscas anteriores sempre podem ser substituídas). "twoTier" usa baldes de 2 entradas:
+            uma preferida por profundidade e outra que é sempre substituída.
+        buffer: buffer, optional
+            Memória (por exemplo de um SharedMemory) onde as entradas são guardadas. Deve ter ao menos maxBytes bytes.
+            Se não fornecida, a tabela aloca a própria memória.
+        """
+        if policy not in _POLICIES:
+            raise ValueError(f'Política de substituição desconhecida: {policy}')
+        self.policy = policy
+        self.maxBytes = maxBytes
+        self._bucketSize = 2 if policy == 'twoTier' else 1
+        self.nBuckets = max(1, maxBytes // (_ENTRY_BYTES * self._bucketSize))
+        size = self.nBuckets * self._bucketSize
+        if buffer is None:
+            # Mapeamento anônimo: as páginas são zeradas pelo sistema no primeiro acesso, então criar a tabela é imediato
+            self._raw = memoryview(mmap.mmap(-1, _ENTRY_BYTES * size))
+        else:
+            self._raw = memoryview(buffer)[:_ENTRY_BYTES * size]
+        words = self._raw.cast('q')
+        self._keys = words[:size]
+        self._data = words[size:]
+        self._shm = None
+        self._mmap = None
+        self.path = None
+        self.generation = 0
+        self.resetCounters()
+
+    @classmethod
+    def shared(cls, maxBytes = 16 * 2**20, policy = 'twoTier'):
+        """Cria uma tabela em memória compartilhada. Outros processos a acessam com attach(table.sharedName, ...).
+        O criador deve chamar unlink() quando a tabela não for mais usada.
+        """
+        from multiprocessing import shared_memory     # Importado só aqui: o módulo é lento de importar
+        shm = shared_memory.SharedMemory(create = True, size = max(maxBytes, _ENTRY_BYTES * 2))
+        table = cls(maxBytes, policy, buffer = shm.buf)
+        table._shm = shm
+        return table
+
+    @classmethod
+    def attach(cls, name, maxBytes, policy = 'twoTier'):
+        """Abre uma tabela criada por shared() em outro processo."""
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name = name)
+        table = cls(maxBytes, policy, buffer = shm.buf)
+        table._shm = shm
+        return table
+
+    @classmethod
+    def open(cls, path, maxBytes = 64 * 2**20, policy = 'twoTier'):
+        """Abre (ou cria) uma tabela persistente guardada no arquivo 'path' e mapeada em memória.
+
+        Vários processos podem abrir o mesmo arquivo ao mesmo tempo: todos leem e escrevem diretamente no
+        mapeamento, sem travas, como na tabela em memória compartilhada. O conteúdo continua no arquivo depois
+        que os processos terminam, então uma nova execução começa com as posições já analisadas.
+        maxBytes e policy só são usados ao criar o arquivo; um arquivo existente mantém os seus.
+        A geração também fica no arquivo, para que entradas antigas continuem valendo menos que as da busca atual.
+        """
+        if not os.path.exists(path):
+            cls._createFile(path, maxBytes, policy)
+        with open(path, 'r+b') as file:
+            mm = mmap.mmap(file.fileno(), 0)
+        magic, version, policyIndex, generation, size = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != _VERSION or policyIndex >= len(_POLICIES) or len(mm) < _HEADER.size + size * _ENTRY_BYTES:
+            mm.close()
+            raise ValueError(f'{path} não é uma tabela de transposição válida')
+        table = cls(size * _ENTRY_BYTES, _POLICIES[policyIndex], buffer = memoryview(mm)[_HEADER.size:])
+        table._mmap = mm
+        table.path = path
+        table.generation = generation
+        return table
+
+    @staticmethod
+    def _createFile(path, maxBytes, policy):
+        """Cria o arquivo da tabela vazia. O arquivo é montado com outro nome e ligado a 'path' só quando está pronto,
+        então um processo que o abra ao mesmo tempo nunca vê um cabeçalho incompleto (se dois processos criarem o
+        arquivo juntos, vale o primeiro).
+        """
+        if policy not in _POLICIES:
+            raise ValueError(f'Política de substituição desconhecida: {policy}')
+        bucketSize = 2 if policy == 'twoTier' else 1
+        size = max(1, maxBytes // (_ENTRY_BYTES * bucketSize)) * bucketSize
+        temp = f'{path}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, _POLICIES.index(policy), 0, size))
+            file.truncate(_HEADER.size + size * _ENTRY_BYTES)
+        try:
+            os.link(temp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temp)
+
+    @property
+    def sharedName(self):
+        """Nome do bloco de memória compartilhada (None se a tabela não for compartilhada)."""
+        return None if self._shm is None else self._shm.name
+
+    def close(self):
+        """Libera o acesso à memória compartilhada ou ao arquivo neste processo."""
+        if self._shm is not None or self._mmap is not None:
+            self._keys.release()
+            self._data.release()
+            self._raw.release()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def unlink(self):
+        """Fecha e remove o bloco de memória compartilhada (apenas o processo criador deve chamar)."""
+        if self._shm is not None:
+            shm = self._shm
+            self.close()
+            shm.unlink()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def resetCounters(self):
+        """Zera os contadores de acertos, falhas, colisões e escritas."""
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0     # Sondagens que encontraram o balde ocupado por outra posição
+        self.stores = 0
+
+    def getCounters(self):
+        """Retorna os contadores da tabela.
+
+        Returns
+        -------
+        dict[str, int]
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'collisions': self.collisions, 'stores': self.stores}
+
+    def clear(self):
+        """Esvazia a tabela (mantendo a memória alocada) e zera os contadores."""
+        self._raw[:] = bytes(len(self._raw))
+        self.generation = 0
+        self._saveGeneration()
+        self.resetCounters()
+
+    def newSearch(self):
+        """Avança a geração da tabela. Entradas de gerações anteriores passam a ser substituíveis."""
+        if self._mmap is not None:     # Continua a partir da geração mais recente entre os processos que usam o arquivo
+            self.generation = self._mmap[_GENERATION_OFFSET]
+        self.generation = (self.generation + 1) & 0xFF
+        self._saveGeneration()
+
+    def _saveGeneration(self):
+        if self._mmap is not None:
+            self._mmap[_GENERATION_OFFSET] = self.generation
+
+    def usage(self):
+        """Retorna quantas entradas da tabela estão ocupadas."""
+        return sum(1 for data in self._data if data)
+
+    def compact(self, minDepth = 0, maxAge = None):
+        """Descarta entradas pouco úteis, liberando espaço para as novas sem esperar a substituição.
+
+        Parameters
+        ----------
+        minDepth: int, default 0
+            Entradas com profundidade menor que essa são removidas.
+        maxAge: int, optional
+            Se fornecido, remove as entradas gravadas há mais de 'maxAge' gerações.
+
+        Returns
+        -------
+        int
+            Número de entradas removidas.
+        """
+        keys, data = self._keys, self._data
+        removed = 0
+        for slot in range(len(data)):
+            entry = data[slot]
+            if not entry:
+                continue
+            age = (self.generation - (entry >> 24)) & 0xFF
+            if (entry & 0xFF) - 1 < minDepth or (maxAge is not None and age > maxAge):
+                data[slot] = 0     # Sem os dados a entrada fica vazia, mesmo que outro processo a leia agora
+                keys[slot] = 0
+                removed += 1
+        if self._bucketSize == 2:
+            # Sobe para a entrada preferida as que ficaram sozinhas na entrada sempre substituída
+            for index in range(0, len(data), 2):
+                if not data[index] and data[index + 1]:
+                    keys[index], data[index] = keys[index + 1], data[index + 1]
+                    keys[index + 1] = data[index + 1] = 0
+        return removed
+
+    def probe(self, key):
+        """Procura a posição 'key' na tabela.
+
+        Returns
+        -------
+        tuple[int, int, int, int] | None
+            (pontuação, profundidade, tipo de limite, melhor jogada) ou None caso a posição não esteja na tabela.
+        """
+        index = (key % self.nBuckets) * self._bucketSize
+        occupied = False
+        for slot in range(index, index + self._bucketSize):
+            data = self._data[slot]
+            if data:
+                if self._keys[slot] ^ data == key:
+                    self.hits += 1
+                    return ((data >> 32) - _SCORE_OFFSET, (data & 0xFF) - 1, (data >> 8) & 0xFF,
+                            ((data >> 16) & 0xFF) - 1)
+                occupied = True
+        if occupied:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(self, key, score, depth, flag, move = NO_MOVE):
+        """Grava uma entrada na tabela seguindo a política de substituição.
+
+        Parameters
+        ----------
+        key: int
+            Chave de Zobrist da posição (63 bits).
+        score: int
+            Pontuação encontrada.
+        depth: int
+            Profundidade restante da busca que gerou a pontuação.
+        flag: EXACT | LOWER | UPPER
+            Tipo de limite da pontuação.
+        move: int, optional
+            Melhor jogada encontrada (NO_MOVE se nenhuma).
+        """
+        data = ((score + _SCORE_OFFSET) << 32 | self.generation << 24 | (move + 1) << 16 | flag << 8 | (depth + 1))
+        index = (key % self.nBuckets) * self._bucketSize
+        keys = self._keys
+        old = self._data[index]
+        sameKey = old and keys[index] ^ old == key
+        if self._bucketSize == 2:
+            # Primeira entrada: preferida por profundidade. A antiga é rebaixada para a segunda entrada (sempre substituída)
+            if sameKey or (old & 0xFF) - 1 <= depth or (old >> 24) & 0xFF != self.generation:
+                if old and not sameKey:
+                    keys[index + 1] = keys[index]
+                    self._data[index + 1] = old
+            else:
+                index += 1
+        elif old and not sameKey and (old & 0xFF) - 1 > depth and (old >> 24) & 0xFF == self.generation:
+            return
+        keys[index] = key ^ data
+        self._data[index] = data
+        self.stores += 1
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description = 'Mostra, esvazia ou compacta uma tabela de transposição persistente.')
+    parser.add_argument('path', help = 'arquivo da tabela (criado se não existir)')
+    parser.add_argument('-mb', type = int, default = 64, help = 'tamanho em MiB ao criar o arquivo')
+    parser.add_argument('-policy', choices = _POLICIES, default = 'twoTier', help = 'política de substituição ao criar o arquivo')
+    parser.add_argument('-reset', action = 'store_true', help = 'esvazia a tabela')
+    parser.add_argument('-compact', action = 'store_true', help = 'remove entradas rasas ou antigas (ver -mindepth e -maxage)')
+    parser.add_argument('-mindepth', type = int, default = 0, help = 'profundidade mínima mantida por -compact')
+    parser.add_argument('-maxage', type = int, default = None, help = 'idade máxima (em gerações) mantida por -compact')
+    args = parser.parse_args(sys.argv[1:])
+    table = TranspositionTable.open(args.path, args.mb * 2**20, args.policy)
+    if args.reset:
+        table.clear()
+    if args.compact:
+        print(f'{table.compact(args.mindepth, args.maxage)} entradas removidas')
+    print(f'{args.path}: {table.usage()} de {len(table)} entradas ocupadas ({table.policy}, geração {table.generation})')
+    table.close()